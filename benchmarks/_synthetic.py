@@ -0,0 +1,168 @@
+"""Synthetic FusionFlow specs for benchmarks.
+
+The generated text is a valid specification: every pipeline reads a declared
+dataset and every experiment binds a declared pipeline and model, so the same
+source can drive lexer, parser, interpreter and IR benchmarks.
+"""
+
+from __future__ import annotations
+
+from typing import List
+
+_HEADER_DATASETS = 8
+_HEADER_MODELS = 8
+
+
+def _header(pipelines: int) -> List[str]:
+    parts: List[str] = []
+    for index in range(_HEADER_DATASETS):
+        parts.append(
+            f"""dataset customers_{index} v1
+    description "Customer snapshot {index}"
+    source "data/customers_{index}.csv"
+    schema {{
+        id: int
+        amount: float
+        days: int
+        age: int
+        churned: bool
+    }}
+end
+"""
+        )
+    for index in range(pipelines):
+        parts.append(
+            f"""pipeline churn_features_{index}
+    from customers_{index % _HEADER_DATASETS} v1
+    derive spend_per_day = amount / days
+    derive age_spend = age * spend_per_day + {index}.5
+    derive is_loyal = days > 365 and not churned
+    select [spend_per_day, age_spend, is_loyal, age]
+    target churned
+end
+"""
+        )
+    for index in range(_HEADER_MODELS):
+        parts.append(
+            f"""model rf_{index}
+    type random_forest
+    params {{ trees: {100 + index}, depth: 8, criterion: "gini" }}
+end
+"""
+        )
+    return parts
+
+
+def _experiment(name: str, pipeline: int, model: int, indent: str = "") -> str:
+    return (
+        f"{indent}experiment {name}\n"
+        f"{indent}    description \"Sweep entry {name}\"\n"
+        f"{indent}    uses pipeline churn_features_{pipeline}\n"
+        f"{indent}    uses model rf_{model}\n"
+        f"{indent}    metrics [accuracy, f1, roc_auc]\n"
+        f"{indent}    extend {{\n"
+        f"{indent}        derive bonus = spend_per_day * 0.1  # sweep knob\n"
+        f"{indent}    }}\n"
+        f"{indent}end\n"
+    )
+
+
+def generate_spec(experiments: int, pipelines: int = 16, timeline_size: int = 1000) -> str:
+    """Return a spec with ``experiments`` experiments spread over timelines."""
+    parts = _header(pipelines)
+    timeline_index = 0
+    remaining = experiments
+    while remaining > 0:
+        batch = min(timeline_size, remaining)
+        body = "".join(
+            _experiment(f"exp_{timeline_index}_{i}", i % pipelines, i % _HEADER_MODELS, "    ")
+            for i in range(batch)
+        )
+        parts.append(f'timeline sweep_{timeline_index} "Generated sweep {timeline_index}"\n{body}end\n')
+        remaining -= batch
+        timeline_index += 1
+    if timeline_index:
+        parts.append(
+            "merge sweep_0 into main\n"
+            "    because \"Best sweep\"\n"
+            "    strategy prefer_metrics f1\n"
+            "end\n"
+        )
+    return "\n".join(parts)
+
+
+def generate_spec_of_size(target_bytes: int) -> str:
+    """Return a spec of roughly ``target_bytes`` characters."""
+    header = len(generate_spec(0))
+    per_experiment = max(1, (len(generate_spec(100)) - header) // 100)
+    return generate_spec(max(1, (target_bytes - header) // per_experiment))
+
+
+def generate_runtime(experiments: int, pipelines: int = 16, timeline_size: int = 1000):
+    """Build the registry for ``generate_spec`` directly, skipping lex/parse.
+
+    Used by benchmarks that only care about what happens after interpretation.
+    """
+    from fusionflow.ast_nodes import (
+        BinaryOp,
+        DatasetDeclaration,
+        DatasetReference,
+        DeriveStep,
+        ExperimentDefinition,
+        Identifier,
+        Literal,
+        ModelDefinition,
+        PipelineDefinition,
+        PipelineExtension,
+        SchemaField,
+        SelectStep,
+        TargetStep,
+    )
+    from fusionflow.runtime import Runtime
+
+    runtime = Runtime()
+    schema = [SchemaField(name, kind) for name, kind in (("id", "int"), ("amount", "float"), ("days", "int"))]
+    for index in range(_HEADER_DATASETS):
+        runtime.register_dataset(
+            DatasetDeclaration(f"customers_{index}", "v1", f"data/customers_{index}.csv", list(schema))
+        )
+    for index in range(pipelines):
+        spend = BinaryOp(Identifier("amount"), "/", Identifier("days"))
+        runtime.register_pipeline(
+            PipelineDefinition(
+                f"churn_features_{index}",
+                DatasetReference(f"customers_{index % _HEADER_DATASETS}", "v1"),
+                [
+                    DeriveStep("spend_per_day", spend),
+                    DeriveStep("age_spend", BinaryOp(Identifier("age"), "*", Literal(index + 0.5))),
+                    SelectStep(["spend_per_day", "age_spend"]),
+                    TargetStep("churned"),
+                ],
+            )
+        )
+    for index in range(_HEADER_MODELS):
+        runtime.register_model(ModelDefinition(f"rf_{index}", "random_forest", {"trees": 100 + index}))
+
+    remaining = experiments
+    timeline_index = 0
+    while remaining > 0:
+        name = f"sweep_{timeline_index}"
+        runtime.create_timeline(name, f"Generated sweep {timeline_index}", parent="main")
+        for i in range(min(timeline_size, remaining)):
+            extension = PipelineExtension(
+                [DeriveStep("bonus", BinaryOp(Identifier("spend_per_day"), "*", Literal(0.1)))]
+            )
+            runtime.register_experiment(
+                name,
+                ExperimentDefinition(
+                    f"exp_{timeline_index}_{i}",
+                    f"churn_features_{i % pipelines}",
+                    f"rf_{i % _HEADER_MODELS}",
+                    ["accuracy", "f1", "roc_auc"],
+                    f"Sweep entry {i}",
+                    extension,
+                ),
+            )
+        remaining -= min(timeline_size, remaining)
+        timeline_index += 1
+    return runtime
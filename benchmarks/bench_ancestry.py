@@ -0,0 +1,86 @@
+"""Ancestor/LCA checks and reverse lookups: registry scans vs. maintained indexes.
+
+Usage::
+
+    python benchmarks/bench_ancestry.py --timelines 100000 --queries 10000
+
+Timelines branch from the newest timeline, or 1% of the time from a random
+earlier one, so the tree has long chains; the scans walk ``TimelineSpec.parent``
+and every registered experiment.
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks._synthetic import generate_runtime  # noqa: E402
+
+
+def _walk_is_ancestor(runtime, ancestor, timeline):
+    while timeline is not None:
+        if timeline == ancestor:
+            return True
+        timeline = runtime.timelines[timeline].parent
+    return False
+
+
+def _walk_lca(runtime, first, second):
+    seen = set()
+    while first is not None:
+        seen.add(first)
+        first = runtime.timelines[first].parent
+    while second is not None and second not in seen:
+        second = runtime.timelines[second].parent
+    return second
+
+
+def _timed(label, function, queries):
+    started = time.perf_counter()
+    for query in queries:
+        function(*query)
+    elapsed = time.perf_counter() - started
+    print(f"  {label:<34} {elapsed * 1e6 / len(queries):10.1f} us/query")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--timelines", type=int, default=100000)
+    parser.add_argument("--queries", type=int, default=10000)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    runtime = generate_runtime(20000)
+    names = [name for name in runtime.timelines]
+    started = time.perf_counter()
+    for index in range(args.timelines):
+        parent = names[-1] if rng.random() < 0.99 else rng.choice(names)
+        name = f"branch_{index}"
+        runtime.create_timeline(name, None, parent=parent)
+        names.append(name)
+    print(f"{len(names)} timelines, created in {time.perf_counter() - started:.2f} s (index maintained)")
+
+    pairs = [(rng.choice(names), rng.choice(names)) for _ in range(args.queries)]
+    scan_pairs = pairs[: max(1, args.queries // 100)]
+    _timed("is_ancestor, parent walk", lambda a, b: _walk_is_ancestor(runtime, a, b), scan_pairs)
+    _timed("is_ancestor, binary lifting", runtime.is_ancestor, pairs)
+    _timed("LCA, parent walk", lambda a, b: _walk_lca(runtime, a, b), scan_pairs)
+    _timed("LCA, binary lifting", runtime.lowest_common_ancestor, pairs)
+
+    models = sorted(runtime.models)
+    lookups = [(rng.choice(models),) for _ in range(100)]
+    _timed(
+        "experiments by model, scan",
+        lambda model: [key for key, experiment in runtime.experiments_index.items() if experiment.model == model],
+        lookups[:10],
+    )
+    _timed("experiments by model, index", runtime.experiments_using_model, lookups)
+
+
+if __name__ == "__main__":
+    main()
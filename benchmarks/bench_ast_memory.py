@@ -0,0 +1,92 @@
+"""Measure per-node AST memory for slotted, interned nodes vs. plain dataclasses.
+
+Usage::
+
+    python benchmarks/bench_ast_memory.py --experiments 100000
+
+The parsed tree is mirrored into ``__dict__``-based dataclasses with one string
+object per occurrence (what the parser produced before slots and interning),
+and both trees are measured with ``tracemalloc``.
+"""
+
+from __future__ import annotations
+
+import argparse
+import dataclasses
+import os
+import sys
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks._synthetic import generate_spec  # noqa: E402
+from fusionflow import ast_nodes  # noqa: E402
+from fusionflow.lexer import Lexer  # noqa: E402
+from fusionflow.parser import StreamingParser  # noqa: E402
+
+_PLAIN_CLASSES = {}
+
+
+def _plain_class(cls):
+    if cls not in _PLAIN_CLASSES:
+        _PLAIN_CLASSES[cls] = dataclasses.make_dataclass(
+            f"Plain{cls.__name__}", [field.name for field in dataclasses.fields(cls)]
+        )
+    return _PLAIN_CLASSES[cls]
+
+
+def _fresh(text: str) -> str:
+    return "".join([text[:1], text[1:]]) if len(text) > 1 else text
+
+
+def _plain_copy(value, counter):
+    if isinstance(value, ast_nodes.ASTNode):
+        counter[0] += 1
+        plain = _plain_class(type(value))
+        return plain(*(_plain_copy(getattr(value, f.name), counter) for f in dataclasses.fields(value)))
+    if isinstance(value, list):
+        return [_plain_copy(item, counter) for item in value]
+    if isinstance(value, dict):
+        return {_fresh(key): _plain_copy(item, counter) for key, item in value.items()}
+    if isinstance(value, str):
+        return _fresh(value)
+    return value
+
+
+def _count(value) -> int:
+    if isinstance(value, ast_nodes.ASTNode):
+        return 1 + sum(_count(getattr(value, f.name)) for f in dataclasses.fields(value))
+    if isinstance(value, list):
+        return sum(_count(item) for item in value)
+    if isinstance(value, dict):
+        return sum(_count(item) for item in value.values())
+    return 0
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--experiments", type=int, default=100000)
+    args = parser.parse_args()
+
+    source = generate_spec(args.experiments)
+    tracemalloc.start()
+    ast = StreamingParser(Lexer(source).iter_tokens()).parse()
+    slotted_bytes, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    nodes = _count(ast)
+
+    tracemalloc.start()
+    counter = [0]
+    plain = _plain_copy(ast, counter)
+    plain_bytes, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    print(f"{args.experiments} experiments, {nodes} AST nodes")
+    print(f"slotted + interned: {slotted_bytes / 1e6:8.1f} MB  {slotted_bytes / nodes:6.1f} B/node")
+    print(f"plain dataclasses : {plain_bytes / 1e6:8.1f} MB  {plain_bytes / nodes:6.1f} B/node")
+    print(f"reduction         : {1 - slotted_bytes / plain_bytes:.0%}")
+    del plain
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+"""Peak RSS of in-memory vs. chunked pipeline execution as the input grows.
+
+Usage::
+
+    python benchmarks/bench_chunked.py --rows 500000 2000000 --memory-budget-mb 64
+
+Each run happens in a fresh interpreter so ``ru_maxrss`` measures only that
+run. In-memory execution grows with the input; chunked execution should
+stay flat at roughly the memory budget plus interpreter overhead.
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+SPEC = """dataset events v1
+    source "events.csv"
+    schema {
+        id: int
+        amount: float
+        days: int
+        age: int
+        score: float
+        churned: bool
+    }
+end
+
+pipeline features
+    from events v1
+    derive spend_per_day = amount / (days + 1)
+    derive age_spend = age * spend_per_day
+    derive risk = score * 2 - 1
+    select [spend_per_day, age_spend, risk]
+    target churned
+end
+"""
+
+
+def _child(mode: str, workdir: str, budget: int) -> None:
+    from fusionflow.backend_adapters import CSVSink, PandasBackend
+    from fusionflow.compiler import build_runtime
+
+    runtime, _, _ = build_runtime(SPEC)
+    pipeline = runtime.pipelines["features"]
+    dataset = runtime.get_dataset(pipeline.source)
+    backend = PandasBackend(workdir)
+    out = os.path.join(workdir, f"out_{mode}.csv")
+    started = time.perf_counter()
+    if mode == "chunked":
+        backend.execute_pipeline_chunked(pipeline, dataset, out, memory_budget=budget)
+    else:
+        CSVSink(out)(backend.execute_pipeline(pipeline, dataset))
+    elapsed = time.perf_counter() - started
+    print(f"{elapsed:.2f} {resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024:.0f}")
+
+
+def _write_input(path: str, rows: int) -> None:
+    import numpy as np
+    import pandas as pd
+
+    rng = np.random.default_rng(0)
+    block = 1_000_000
+    for start in range(0, rows, block):
+        count = min(block, rows - start)
+        pd.DataFrame(
+            {
+                "id": np.arange(start, start + count),
+                "amount": rng.random(count).round(3) * 100,
+                "days": rng.integers(0, 400, count),
+                "age": rng.integers(18, 90, count),
+                "score": rng.random(count).round(4),
+                "churned": rng.random(count) < 0.3,
+            }
+        ).to_csv(path, mode="a" if start else "w", header=not start, index=False)
+
+
+def main() -> None:
+    if len(sys.argv) > 1 and sys.argv[1] == "--child":
+        _child(sys.argv[2], sys.argv[3], int(sys.argv[4]))
+        return
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, nargs="+", default=[500_000, 2_000_000])
+    parser.add_argument("--memory-budget-mb", type=int, default=64)
+    args = parser.parse_args()
+    budget = args.memory_budget_mb * 1024 * 1024
+
+    print(f"memory budget {args.memory_budget_mb} MB")
+    for rows in args.rows:
+        with tempfile.TemporaryDirectory() as workdir:
+            _write_input(os.path.join(workdir, "events.csv"), rows)
+            size = os.path.getsize(os.path.join(workdir, "events.csv")) / 1e6
+            print(f"  {rows:,} rows ({size:.0f} MB CSV)")
+            for mode in ("in-memory", "chunked"):
+                output = subprocess.run(
+                    [sys.executable, os.path.abspath(__file__), "--child", mode, workdir, str(budget)],
+                    check=True,
+                    capture_output=True,
+                    text=True,
+                ).stdout.split()
+                print(f"    {mode:10} {float(output[0]):6.2f} s   peak RSS {int(output[1]):6d} MB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""End-to-end latency of ``fusionflow compile`` with and without ``fusionflow serve``.
+
+Usage::
+
+    python benchmarks/bench_daemon.py --experiments 20000 --calls 10
+
+Each call is a fresh ``python -m fusionflow`` process, as an editor or
+pre-commit hook would spawn; only the daemon run reuses warm caches.
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks._synthetic import generate_spec  # noqa: E402
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _time_calls(argv, env, calls):
+    timings = []
+    for _ in range(calls):
+        started = time.perf_counter()
+        subprocess.run([sys.executable, "-m", "fusionflow", *argv], env=env, check=True, stdout=subprocess.DEVNULL)
+        timings.append(time.perf_counter() - started)
+    return min(timings), sum(timings) / len(timings)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--experiments", type=int, default=20000)
+    parser.add_argument("--calls", type=int, default=10)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as workdir:
+        spec_path = os.path.join(workdir, "spec.ff")
+        with open(spec_path, "w", encoding="utf-8") as handle:
+            handle.write(generate_spec(args.experiments))
+        out_path = os.path.join(workdir, "spec.tir.json")
+        argv = ["compile", spec_path, "--out", out_path, "--cache-dir", os.path.join(workdir, "cache")]
+
+        env = dict(os.environ, PYTHONPATH=ROOT, FUSIONFLOW_SOCKET=os.path.join(workdir, "ff.sock"))
+        direct_env = dict(env, FUSIONFLOW_NO_DAEMON="1")
+        subprocess.run([sys.executable, "-m", "fusionflow", *argv], env=direct_env, check=True)
+        print(f"{args.experiments} experiments, {args.calls} calls each")
+        best, mean = _time_calls(argv, direct_env, args.calls)
+        print(f"  in-process (disk cache)   best {best * 1000:7.1f} ms  mean {mean * 1000:7.1f} ms")
+
+        server = subprocess.Popen(
+            [sys.executable, "-m", "fusionflow", "serve"], env=env, stdout=subprocess.PIPE, text=True
+        )
+        try:
+            server.stdout.readline()
+            subprocess.run([sys.executable, "-m", "fusionflow", *argv], env=env, check=True)
+            best, mean = _time_calls(argv, env, args.calls)
+            print(f"  forwarded to daemon       best {best * 1000:7.1f} ms  mean {mean * 1000:7.1f} ms")
+        finally:
+            server.terminate()
+            server.wait()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""``fusionflow diff`` on large IRs: hash-guided diff vs. loading and comparing the JSON.
+
+Usage::
+
+    python benchmarks/bench_diff.py --experiments 200000
+
+The new registry differs from the old one in a single experiment. The
+baseline loads both JSON files and compares them entry by entry, which is
+what reviewing a JSON diff amounts to.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks._synthetic import generate_runtime  # noqa: E402
+from fusionflow.compiler import write_ir_file  # noqa: E402
+from fusionflow.ir_diff import diff_files  # noqa: E402
+
+
+def _json_diff(old_path: str, new_path: str) -> int:
+    with open(old_path, encoding="utf-8") as handle:
+        old = json.load(handle)
+    with open(new_path, encoding="utf-8") as handle:
+        new = json.load(handle)
+
+    def walk(before, after) -> int:
+        if isinstance(before, dict) and isinstance(after, dict):
+            return sum(walk(before.get(key), after.get(key)) for key in before.keys() | after.keys())
+        return int(before != after)
+
+    return walk(old, new)
+
+
+def _timed(function):
+    started = time.perf_counter()
+    result = function()
+    return result, time.perf_counter() - started
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--experiments", type=int, default=200_000)
+    args = parser.parse_args()
+
+    runtime = generate_runtime(args.experiments)
+    with tempfile.TemporaryDirectory() as workdir:
+        paths = {}
+        for ir_format, suffix in (("json", "tir.json"), ("binary", "tir.bin")):
+            paths["old", ir_format] = os.path.join(workdir, f"old.{suffix}")
+            write_ir_file(runtime, paths["old", ir_format], compact=True, ir_format=ir_format)
+
+        timeline = runtime.timelines[sorted(runtime.timelines)[len(runtime.timelines) // 2]]
+        experiment = next(iter(timeline.experiments.values()))
+        experiment.metrics = experiment.metrics + ["recall"]
+        for ir_format, suffix in (("json", "tir.json"), ("binary", "tir.bin")):
+            paths["new", ir_format] = os.path.join(workdir, f"new.{suffix}")
+            write_ir_file(runtime, paths["new", ir_format], compact=True, ir_format=ir_format)
+
+        size = os.path.getsize(paths["old", "json"]) / 1e6
+        print(f"{args.experiments} experiments, {size:.0f} MB of JSON IR per side, 1 changed experiment")
+        differences, elapsed = _timed(lambda: _json_diff(paths["old", "json"], paths["new", "json"]))
+        print(f"  load + compare JSON       {elapsed:7.2f} s  ({differences} differing leaves)")
+        for ir_format in ("json", "binary"):
+            changes, elapsed = _timed(lambda: diff_files(paths["old", ir_format], paths["new", ir_format]))
+            print(f"  fusionflow diff ({ir_format:6})  {elapsed:7.2f} s  ({len(changes)} change)")
+        print(f"  {changes[0]}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""Effective timeline views: copying dicts down the branch chain vs. persistent maps.
+
+Usage::
+
+    python benchmarks/bench_effective.py --depth 1000 --per-timeline 50
+
+Builds a chain of ``depth`` timelines, each branching from the previous one
+and declaring ``per-timeline`` experiments, then resolves every timeline's
+effective experiments both ways.
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fusionflow.ast_nodes import ExperimentDefinition  # noqa: E402
+from fusionflow.runtime import Runtime  # noqa: E402
+from benchmarks._synthetic import generate_runtime  # noqa: E402
+
+
+def _build(depth: int, per_timeline: int) -> Runtime:
+    runtime = generate_runtime(0)
+    pipeline, model = next(iter(runtime.pipelines)), next(iter(runtime.models))
+    parent = "main"
+    for level in range(depth):
+        name = f"branch_{level}"
+        runtime.create_timeline(name, None, parent=parent)
+        for index in range(per_timeline):
+            # Every tenth experiment overrides an inherited one.
+            experiment_name = f"exp_{level - 1}_{index}" if level and index % 10 == 0 else f"exp_{level}_{index}"
+            runtime.register_experiment(name, ExperimentDefinition(experiment_name, pipeline, model, ["f1"]))
+        parent = name
+    return runtime
+
+
+def _copied_views(runtime: Runtime):
+    views = {}
+    for name, spec in runtime.timelines.items():
+        view = dict(views[spec.parent]) if spec.parent else {}
+        view.update(spec.experiments)
+        views[name] = view
+    return views
+
+
+def _measure(label, function, reset):
+    started = time.perf_counter()
+    views = function()
+    elapsed = time.perf_counter() - started
+    # Memory is traced in a second run; tracemalloc slows allocation-heavy code.
+    reset()
+    tracemalloc.start()
+    function()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"  {label:<22} {elapsed:7.2f} s  peak {peak / 1e6:8.1f} MB")
+    return views
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--depth", type=int, default=1000)
+    parser.add_argument("--per-timeline", type=int, default=50)
+    args = parser.parse_args()
+
+    runtime = _build(args.depth, args.per_timeline)
+    names = list(runtime.timelines)
+    print(f"{len(names)} timelines, {args.per_timeline} experiments each")
+    _measure(
+        "persistent maps",
+        lambda: [runtime.effective_experiments(name) for name in names],
+        runtime.invalidate_indexes,
+    )
+    deepest = names[-1]
+    expected = _measure("dict copy per level", lambda: _copied_views(runtime), lambda: None)[deepest]
+    assert dict(runtime.effective_experiments(deepest).items()) == expected
+    started = time.perf_counter()
+    runtime.create_timeline("one_more", None, parent=deepest)
+    print(f"  branch after build     {(time.perf_counter() - started) * 1e6:7.1f} us")
+
+
+if __name__ == "__main__":
+    main()
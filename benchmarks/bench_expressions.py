@@ -0,0 +1,103 @@
+"""Benchmark precedence-climbing expression parsing against the old call chain.
+
+Usage::
+
+    python benchmarks/bench_expressions.py --pipelines 2000 --terms 40
+
+Each generated pipeline holds derive steps with long mixed-precedence
+expressions, so almost all parse time is spent in expression parsing.
+"""
+
+from __future__ import annotations
+
+import argparse
+import gc
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fusionflow.ast_nodes import BinaryOp  # noqa: E402
+from fusionflow.lexer import Lexer  # noqa: E402
+from fusionflow.parser import Parser  # noqa: E402
+from fusionflow.tokens import TokenType  # noqa: E402
+
+_OPERATORS = ["+", "*", "-", "/", "<", "and", "==", "or"]
+
+
+class RecursiveDescentParser(Parser):
+    """One method per precedence level, as the parser was before precedence climbing."""
+
+    def parse_expression(self):
+        return self._level(0)
+
+    _LEVELS = [
+        (TokenType.OR,),
+        (TokenType.AND,),
+        (
+            TokenType.DOUBLE_EQUALS,
+            TokenType.NOT_EQUALS,
+            TokenType.LESS_THAN,
+            TokenType.GREATER_THAN,
+            TokenType.LESS_EQUAL,
+            TokenType.GREATER_EQUAL,
+        ),
+        (TokenType.PLUS, TokenType.MINUS),
+        (TokenType.MULTIPLY, TokenType.DIVIDE),
+    ]
+
+    def _level(self, depth):
+        if depth == len(self._LEVELS):
+            return self.parse_unary_expression()
+        codes = [token_type.value for token_type in self._LEVELS[depth]]
+        left = self._level(depth + 1)
+        while self.current_type() in codes:
+            op = self.current_token().value
+            self.advance()
+            left = BinaryOp(left, op, self._level(depth + 1))
+        return left
+
+
+def generate(pipelines: int, terms: int) -> str:
+    parts = ['dataset customers v1\n    source "customers.csv"\nend\n']
+    for index in range(pipelines):
+        expression = " ".join(
+            f"{_OPERATORS[(index + term) % len(_OPERATORS)]} c{term}" if term else "c0"
+            for term in range(terms)
+        )
+        parts.append(
+            f"pipeline p{index}\n    from customers v1\n"
+            f"    derive a = {expression}\n"
+            f"    derive b = ((a + {index}) * (c1 - c2)) / (c3 + 1.5)\n"
+            "end\n"
+        )
+    return "\n".join(parts)
+
+
+def _time(parser_cls, tokens, repeat=3):
+    best = float("inf")
+    for _ in range(repeat):
+        gc.collect()
+        started = time.perf_counter()
+        parser_cls(tokens).parse()
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--pipelines", type=int, default=2000)
+    parser.add_argument("--terms", type=int, default=40)
+    args = parser.parse_args()
+
+    tokens = Lexer(generate(args.pipelines, args.terms)).tokenize()
+    legacy = _time(RecursiveDescentParser, tokens)
+    pratt = _time(Parser, tokens)
+    print(f"{len(tokens)} tokens, {args.pipelines} pipelines, {args.terms}-term derives")
+    print(f"recursive descent  : {legacy:6.2f}s (best of 3)")
+    print(f"precedence climbing: {pratt:6.2f}s  ({legacy / pratt:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""Size and load time of the binary Temporal IR vs. JSON.
+
+Usage::
+
+    python benchmarks/bench_ir_binary.py --experiments 100000 10000
+
+``full load`` decodes the whole file with ``load_ir``; ``one entry`` opens the
+file and fetches a single timeline, which JSON can only do by loading it all.
+"""
+
+from __future__ import annotations
+
+import argparse
+import gc
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks._synthetic import generate_runtime  # noqa: E402
+from fusionflow.compiler import write_ir_file  # noqa: E402
+from fusionflow.ir_binary import BinaryIRReader  # noqa: E402
+from fusionflow.ir_export import load_ir  # noqa: E402
+
+
+def _best_of(repeats, func):
+    best = float("inf")
+    for _ in range(repeats):
+        gc.collect()
+        started = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def _one_timeline_binary(path):
+    with open(path, "rb") as handle:
+        reader = BinaryIRReader(handle.read())
+    return reader.entry_at("timelines", 0)
+
+
+def _one_timeline_json(path):
+    return next(iter(load_ir(path)["timelines"].values()))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--experiments", type=int, nargs="+", default=[100000, 10000])
+    parser.add_argument("--repeats", type=int, default=3)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as workdir:
+        for experiments in args.experiments:
+            runtime = generate_runtime(experiments)
+            json_path = os.path.join(workdir, "spec.tir.json")
+            compact_path = os.path.join(workdir, "spec.compact.tir.json")
+            binary_path = os.path.join(workdir, "spec.tir.bin")
+            write_ir_file(runtime, json_path)
+            write_ir_file(runtime, compact_path, compact=True)
+            write_ir_file(runtime, binary_path, ir_format="binary")
+
+            print(f"{experiments} experiments")
+            for label, path in (("json", json_path), ("json --compact", compact_path), ("binary", binary_path)):
+                full = _best_of(args.repeats, lambda: load_ir(path))
+                single = _one_timeline_binary if path == binary_path else _one_timeline_json
+                one = _best_of(args.repeats, lambda: single(path))
+                print(
+                    f"  {label:<15} {os.path.getsize(path) / 1e6:8.2f} MB"
+                    f"  full load {full * 1000:8.1f} ms  one entry {one * 1000:8.1f} ms"
+                )
+
+
+if __name__ == "__main__":
+    main()
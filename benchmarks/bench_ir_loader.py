@@ -0,0 +1,73 @@
+"""Time to get a Runtime back: re-compile the source vs. ``Runtime.from_ir``.
+
+Usage::
+
+    python benchmarks/bench_ir_loader.py --experiments 100000
+
+``open`` is the time until a Runtime is returned, ``one experiment`` adds a
+single lookup in one timeline, and ``everything`` touches every experiment.
+"""
+
+from __future__ import annotations
+
+import argparse
+import gc
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks._synthetic import generate_spec  # noqa: E402
+from fusionflow.compiler import build_runtime, write_ir_file  # noqa: E402
+from fusionflow.runtime import Runtime  # noqa: E402
+
+
+def _timed(func):
+    gc.collect()
+    started = time.perf_counter()
+    result = func()
+    return result, time.perf_counter() - started
+
+
+def _touch_all(runtime):
+    for timeline in runtime.timelines.values():
+        for _ in timeline.experiments.values():
+            pass
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--experiments", type=int, default=100000)
+    args = parser.parse_args()
+
+    source = generate_spec(args.experiments)
+    compiled, _ = _timed(lambda: build_runtime(source)[0])
+    timeline = next(name for name in compiled.timelines if name != "main")
+    experiment = next(iter(compiled.timelines[timeline].experiments))
+
+    with tempfile.TemporaryDirectory() as workdir:
+        json_path = os.path.join(workdir, "spec.tir.json")
+        binary_path = os.path.join(workdir, "spec.tir.bin")
+        write_ir_file(compiled, json_path, compact=True)
+        write_ir_file(compiled, binary_path, ir_format="binary")
+
+        loaders = (
+            ("source", lambda: build_runtime(source)[0]),
+            ("from_ir json", lambda: Runtime.from_ir(json_path)),
+            ("from_ir binary", lambda: Runtime.from_ir(binary_path)),
+        )
+        print(f"{args.experiments} experiments")
+        for label, load in loaders:
+            runtime, opened = _timed(load)
+            _, lookup = _timed(lambda: runtime.timelines[timeline].experiments[experiment])
+            _, rest = _timed(lambda: _touch_all(runtime))
+            print(
+                f"  {label:<15} open {opened * 1000:8.1f} ms"
+                f"  one experiment {lookup * 1000:7.2f} ms  everything {(opened + lookup + rest) * 1000:8.1f} ms"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+"""Peak memory of writing Temporal IR: build dict + json.dumps vs. streaming.
+
+Usage::
+
+    python benchmarks/bench_ir_memory.py --experiments 300000 100000 30000
+
+The registry is built directly (no parsing) before measurement starts, so
+the numbers only cover IR emission.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks._synthetic import generate_runtime  # noqa: E402
+from fusionflow.ir_export import build_temporal_ir, write_temporal_ir  # noqa: E402
+
+
+def _dict_then_dumps(runtime, handle, indent):
+    handle.write(json.dumps(build_temporal_ir(runtime), indent=indent))
+
+
+def _streaming(runtime, handle, indent):
+    write_temporal_ir(runtime, handle, indent=indent)
+
+
+def _measure(writer, runtime, indent):
+    with open(os.devnull, "w", encoding="utf-8") as handle:
+        tracemalloc.start()
+        started = time.perf_counter()
+        writer(runtime, handle, indent)
+        elapsed = time.perf_counter() - started
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+    return peak, elapsed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--experiments", type=int, nargs="+", default=[300000, 100000, 30000])
+    parser.add_argument("--compact", action="store_true")
+    args = parser.parse_args()
+    indent = None if args.compact else 2
+
+    for experiments in args.experiments:
+        runtime = generate_runtime(experiments)
+        dict_peak, dict_time = _measure(_dict_then_dumps, runtime, indent)
+        stream_peak, stream_time = _measure(_streaming, runtime, indent)
+        print(
+            f"{experiments:>8} experiments: dict+dumps peak {dict_peak / 1e6:8.1f} MB ({dict_time:5.1f}s)"
+            f"  streaming peak {stream_peak / 1e6:6.2f} MB ({stream_time:5.1f}s)"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""Derived-feature throughput: compiled NumPy kernels vs. whole-array NumPy and pandas.
+
+Usage::
+
+    python benchmarks/bench_kernels.py --rows 20000000
+
+Whole-array evaluation materializes one full-length temporary per operator;
+the kernel streams blocks of rows through a few cache-sized buffers.
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fusionflow.kernels import DEFAULT_CHUNK_SIZE, compile_expression  # noqa: E402
+from fusionflow.lexer import Lexer  # noqa: E402
+from fusionflow.parser import Parser  # noqa: E402
+
+EXPRESSIONS = [
+    "amount / days",
+    "age * (amount / days) + 3.5",
+    "(amount - 1) * (amount + 1) / (age + 2 * days) - amount * 0.5",
+    "days > 365 and not churned and amount > 50",
+]
+
+
+def _expression(text: str):
+    source = f"pipeline p\n    from d v1\n    derive x = {text}\nend\n"
+    return Parser(Lexer(source).tokenize_compact()).parse().statements[0].steps[0].expression
+
+
+def _best(function, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        function()
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=20_000_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    columns = {
+        "amount": rng.random(args.rows) * 100,
+        "days": rng.integers(1, 400, args.rows),
+        "age": rng.integers(18, 90, args.rows),
+        "churned": rng.random(args.rows) < 0.3,
+    }
+    frame = pd.DataFrame(columns)
+    print(f"{args.rows:,} rows, chunk size {args.chunk_size}")
+    for text in EXPRESSIONS:
+        kernel = compile_expression(_expression(text))
+        numpy_text = text.replace(" and not ", " & ~").replace(" and ", " & ")
+        numpy_text = numpy_text.replace("days > 365", "(days > 365)").replace("amount > 50", "(amount > 50)")
+        expected = eval(numpy_text, {}, dict(columns))
+        np.testing.assert_allclose(kernel(columns, chunk_size=args.chunk_size), expected)
+
+        whole = _best(lambda: eval(numpy_text, {}, dict(columns)), args.repeat)
+        pandas = _best(lambda: frame.eval(numpy_text), args.repeat)
+        fused = _best(lambda: kernel(columns, chunk_size=args.chunk_size), args.repeat)
+        print(f"  {text}")
+        print(
+            f"    whole-array numpy {whole * 1e3:8.1f} ms   pandas eval {pandas * 1e3:8.1f} ms   "
+            f"kernel {fused * 1e3:8.1f} ms   ({args.rows / fused / 1e6:,.0f} M rows/s)"
+        )
+
+
+if __name__ == "__main__":
+    main()
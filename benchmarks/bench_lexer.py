@@ -0,0 +1,147 @@
+"""Benchmark the master-regex lexer against the original per-character loop.
+
+Usage::
+
+    python benchmarks/bench_lexer.py --size-mb 50 --legacy-size-mb 2
+
+The legacy scanner is far too slow to run on the full input, so it is timed on
+a smaller prefix and compared by throughput (MB/s).
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks._synthetic import generate_spec_of_size  # noqa: E402
+from fusionflow.lexer import Lexer  # noqa: E402
+from fusionflow.tokens import Token, TokenType  # noqa: E402
+
+
+class LegacyLexer(Lexer):
+    """The character-at-a-time tokenizer that ``Lexer`` replaced."""
+
+    def current_char(self):
+        if self.pos >= len(self.source):
+            return None
+        return self.source[self.pos]
+
+    def advance(self):
+        if self.pos < len(self.source):
+            if self.source[self.pos] == '\n':
+                self.line += 1
+                self.column = 1
+            else:
+                self.column += 1
+            self.pos += 1
+
+    def tokenize(self):
+        single = {
+            '+': TokenType.PLUS, '-': TokenType.MINUS, '*': TokenType.MULTIPLY,
+            '/': TokenType.DIVIDE, '(': TokenType.LPAREN, ')': TokenType.RPAREN,
+            '[': TokenType.LBRACKET, ']': TokenType.RBRACKET, '{': TokenType.LBRACE,
+            '}': TokenType.RBRACE, ',': TokenType.COMMA, ':': TokenType.COLON,
+            '.': TokenType.DOT,
+        }
+        paired = {
+            '=': (TokenType.EQUALS, TokenType.DOUBLE_EQUALS),
+            '<': (TokenType.LESS_THAN, TokenType.LESS_EQUAL),
+            '>': (TokenType.GREATER_THAN, TokenType.GREATER_EQUAL),
+            '!': (None, TokenType.NOT_EQUALS),
+        }
+        while self.pos < len(self.source):
+            while self.current_char() and self.current_char() in ' \t\r':
+                self.advance()
+            char = self.current_char()
+            if not char:
+                break
+            start_col = self.column
+            if char == '#':
+                while self.current_char() and self.current_char() != '\n':
+                    self.advance()
+            elif char == '\n':
+                self.tokens.append(Token(TokenType.NEWLINE, '\n', self.line, start_col))
+                self.advance()
+            elif char.isdigit():
+                text = ''
+                while self.current_char() and (self.current_char().isdigit() or self.current_char() == '.'):
+                    if self.current_char() == '.' and '.' in text:
+                        break
+                    text += self.current_char()
+                    self.advance()
+                value = float(text) if '.' in text else int(text)
+                self.tokens.append(Token(TokenType.NUMBER, value, self.line, start_col))
+            elif char in '"\'':
+                self.advance()
+                text = ''
+                while self.current_char() and self.current_char() != char:
+                    if self.current_char() == '\\':
+                        self.advance()
+                        if self.current_char():
+                            text += {'n': '\n', 't': '\t', 'r': '\r'}.get(self.current_char(), self.current_char())
+                            self.advance()
+                    else:
+                        text += self.current_char()
+                        self.advance()
+                if self.current_char() == char:
+                    self.advance()
+                self.tokens.append(Token(TokenType.STRING, text, self.line, start_col))
+            elif char.isalpha() or char == '_':
+                text = ''
+                while self.current_char() and (self.current_char().isalnum() or self.current_char() == '_'):
+                    text += self.current_char()
+                    self.advance()
+                token_type = self.keywords.get(text.lower(), TokenType.IDENTIFIER)
+                self.tokens.append(Token(token_type, text, self.line, start_col))
+            elif char in single:
+                self.tokens.append(Token(single[char], char, self.line, start_col))
+                self.advance()
+            elif char in paired:
+                self.advance()
+                plain, with_equals = paired[char]
+                if self.current_char() == '=':
+                    self.tokens.append(Token(with_equals, char + '=', self.line, start_col))
+                    self.advance()
+                elif plain is not None:
+                    self.tokens.append(Token(plain, char, self.line, start_col))
+            else:
+                raise SyntaxError(f"Unexpected character '{char}' at line {self.line}, column {self.column}")
+        self.tokens.append(Token(TokenType.EOF, None, self.line, self.column))
+        return self.tokens
+
+
+def _throughput(lexer_cls, source: str):
+    started = time.perf_counter()
+    tokens = lexer_cls(source).tokenize()
+    elapsed = time.perf_counter() - started
+    return len(tokens), elapsed, len(source) / (1024 * 1024) / elapsed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--size-mb", type=float, default=50.0)
+    parser.add_argument("--legacy-size-mb", type=float, default=2.0)
+    args = parser.parse_args()
+
+    source = generate_spec_of_size(int(args.size_mb * 1024 * 1024))
+    legacy_source = source[: int(args.legacy_size_mb * 1024 * 1024)]
+    legacy_source = legacy_source[: legacy_source.rfind("\nend\n") + 5]
+
+    assert [
+        (t.type, t.value, t.line, t.column) for t in LegacyLexer(legacy_source).tokenize()
+    ] == [(t.type, t.value, t.line, t.column) for t in Lexer(legacy_source).tokenize()]
+
+    count, elapsed, rate = _throughput(Lexer, source)
+    print(f"regex lexer : {len(source) / 1e6:8.1f} MB  {count:>10} tokens  {elapsed:7.2f}s  {rate:7.2f} MB/s")
+    count, elapsed, prefix_rate = _throughput(Lexer, legacy_source)
+    print(f"regex lexer : {len(legacy_source) / 1e6:8.1f} MB  {count:>10} tokens  {elapsed:7.2f}s  {prefix_rate:7.2f} MB/s")
+    count, elapsed, legacy_rate = _throughput(LegacyLexer, legacy_source)
+    print(f"legacy lexer: {len(legacy_source) / 1e6:8.1f} MB  {count:>10} tokens  {elapsed:7.2f}s  {legacy_rate:7.2f} MB/s")
+    print(f"speedup     : {prefix_rate / legacy_rate:.1f}x on the same input, {rate / legacy_rate:.1f}x by throughput")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""Three-way timeline merge vs. the pairwise key-by-key conflict scan.
+
+Usage::
+
+    python benchmarks/bench_merge.py --experiments 50000 --changes 100
+
+Two sibling timelines branch from a ``main`` holding ``experiments``
+experiments, and each overrides ``changes`` of them (half of those the same
+ones, so they conflict).
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fusionflow.ast_nodes import ExperimentDefinition  # noqa: E402
+from fusionflow.merge_algorithm import detect_conflicts, three_way_merge  # noqa: E402
+from fusionflow.runtime import Runtime  # noqa: E402
+from benchmarks._synthetic import generate_runtime  # noqa: E402
+
+
+def _build(experiments: int, changes: int) -> Runtime:
+    runtime = generate_runtime(0)
+    pipeline, model = next(iter(runtime.pipelines)), next(iter(runtime.models))
+    for index in range(experiments):
+        runtime.register_experiment("main", ExperimentDefinition(f"exp_{index}", pipeline, model, ["f1"]))
+    for timeline, offset, metric in (("left", 0, "accuracy"), ("right", changes // 2, "roc_auc")):
+        runtime.create_timeline(timeline, None, parent="main")
+        for index in range(offset, offset + changes):
+            runtime.register_experiment(timeline, ExperimentDefinition(f"exp_{index}", pipeline, model, [metric]))
+    return runtime
+
+
+def _best(function, repeat: int = 5) -> float:
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        function()
+        timings.append(time.perf_counter() - started)
+    return min(timings)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--experiments", type=int, default=50000)
+    parser.add_argument("--changes", type=int, default=100)
+    args = parser.parse_args()
+
+    runtime = _build(args.experiments, args.changes)
+
+    def scan():
+        main_view = dict(runtime.timelines["main"].experiments)
+        left = dict(main_view, **runtime.timelines["left"].experiments)
+        right = dict(main_view, **runtime.timelines["right"].experiments)
+        return detect_conflicts(left, right)
+
+    started = time.perf_counter()
+    runtime.effective_experiments("main")
+    views = time.perf_counter() - started
+    result = three_way_merge(runtime, "left", "right")
+
+    print(f"{args.experiments} experiments, {args.changes} changes per side")
+    print(f"  pairwise scan (copy + compare)   {_best(scan) * 1000:8.1f} ms  ({len(scan())} differing keys)")
+    print(f"  effective views, built once      {views * 1000:8.1f} ms")
+    print(
+        f"  three-way merge                  {_best(lambda: three_way_merge(runtime, 'left', 'right')) * 1000:8.1f} ms"
+        f"  ({len(result.applied)} applied, {len(result.conflicts)} conflicts)"
+    )
+
+
+if __name__ == "__main__":
+    main()
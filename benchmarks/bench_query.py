@@ -0,0 +1,81 @@
+"""``fusionflow query`` answers: registry scans vs. the cached inverted indexes.
+
+Usage::
+
+    python benchmarks/bench_query.py --experiments 500000
+
+Reports the one-off index build, reloading it from the disk tier of the
+compile cache (a cold CLI call), and per-query time on a warm index (a
+call served by ``fusionflow serve``) against scanning every timeline.
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks._synthetic import generate_runtime  # noqa: E402
+from fusionflow.compile_cache import CompileCache  # noqa: E402
+from fusionflow.query import RegistryIndex  # noqa: E402
+
+QUERIES = {
+    "experiments where model = rf_3 and metric = f1 and name = exp_7_3": lambda runtime: [
+        f"{timeline}/{name}"
+        for timeline, spec in runtime.timelines.items()
+        for name, experiment in spec.experiments.items()
+        if experiment.model == "rf_3" and "f1" in experiment.metrics and name == "exp_7_3"
+    ],
+    "timelines where parent = main and model = rf_5": lambda runtime: [
+        timeline
+        for timeline, spec in runtime.timelines.items()
+        if spec.parent == "main" and any(e.model == "rf_5" for e in spec.experiments.values())
+    ],
+    "pipelines where dataset = customers_2": lambda runtime: [
+        name for name, pipeline in runtime.pipelines.items() if pipeline.source.name == "customers_2"
+    ],
+}
+
+
+def _best(function, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        function()
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--experiments", type=int, default=500_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    runtime = generate_runtime(args.experiments)
+    started = time.perf_counter()
+    index = RegistryIndex(runtime)
+    print(f"{args.experiments} experiments in {len(runtime.timelines)} timelines")
+    print(f"  index build (once per spec)     {time.perf_counter() - started:8.2f} s")
+
+    with tempfile.TemporaryDirectory() as workdir:
+        cache = CompileCache(workdir)
+        key = cache.key("bench", "index")
+        cache.put(key, index)
+        reload = _best(lambda: CompileCache(workdir).get(key), args.repeat)
+        print(f"  index reload from disk cache    {reload:8.2f} s")
+
+    for query, scan in QUERIES.items():
+        assert index.query(query) == scan(runtime), query
+        scanned = _best(lambda: scan(runtime), args.repeat)
+        indexed = _best(lambda: index.query(query), args.repeat)
+        print(f"  {query}")
+        print(f"    scan {scanned * 1e3:9.2f} ms   index {indexed * 1e3:8.3f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+"""Compare peak memory of the token storage modes the parser can consume.
+
+Usage::
+
+    python benchmarks/bench_token_memory.py --experiments 20000
+
+Peak memory is measured with ``tracemalloc`` and includes the resulting AST.
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks._synthetic import generate_spec  # noqa: E402
+from fusionflow.lexer import Lexer  # noqa: E402
+from fusionflow.parser import Parser, StreamingParser  # noqa: E402
+
+
+def _token_list(source: str):
+    return Parser(Lexer(source).tokenize()).parse()
+
+
+def _compact(source: str):
+    return Parser(Lexer(source).tokenize_compact()).parse()
+
+
+def _streaming(source: str):
+    return StreamingParser(Lexer(source).iter_tokens()).parse()
+
+
+MODES = {
+    "token list": _token_list,
+    "compact buffer": _compact,
+    "streaming": _streaming,
+}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--experiments", type=int, default=20000)
+    args = parser.parse_args()
+
+    source = generate_spec(args.experiments)
+    print(f"source: {len(source) / 1e6:.1f} MB, {args.experiments} experiments")
+    for label, run in MODES.items():
+        started = time.perf_counter()
+        tracemalloc.start()
+        ast = run(source)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        elapsed = time.perf_counter() - started
+        print(f"{label:<14} peak {peak / 1e6:8.1f} MB  {elapsed:6.2f}s (traced)")
+        del ast
+
+
+if __name__ == "__main__":
+    main()
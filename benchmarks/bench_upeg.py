@@ -0,0 +1,85 @@
+"""Lowering a registry to UPEG: one node chain per experiment vs. hash-consed nodes.
+
+Usage::
+
+    python benchmarks/bench_upeg.py --experiments 100000
+
+The baseline lowers every experiment into its own chain of nodes (read,
+pipeline steps, extension, fit, evaluate), which is what executing each
+experiment independently amounts to. ``lower_runtime`` hash-conses the
+nodes, so experiments that share a pipeline share its nodes.
+"""
+
+from __future__ import annotations
+
+import argparse
+import itertools
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks._synthetic import generate_runtime  # noqa: E402
+from fusionflow.upeg import UPEGNode  # noqa: E402
+from fusionflow.upeg_lowering import UPEGBuilder, _Lowering, lower_runtime  # noqa: E402
+
+
+class _UnsharedBuilder(UPEGBuilder):
+    """Creates a fresh node for every request."""
+
+    def __init__(self):
+        super().__init__()
+        self._ids = itertools.count()
+
+    def node(self, operation, inputs, metadata, outputs=()):
+        node_id = f"n{next(self._ids)}"
+        self.graph.add_node(UPEGNode(node_id, operation, list(inputs), list(outputs), metadata))
+        for source in inputs:
+            self.graph.add_edge(source, node_id)
+        return node_id
+
+
+class _UnsharedLowering(_Lowering):
+    """Lowers each experiment's pipeline again instead of reusing the first lowering."""
+
+    def __init__(self, runtime):
+        super().__init__(runtime)
+        self.builder = _UnsharedBuilder()
+
+    def pipeline(self, name, replay=True):
+        self._pipelines.clear()
+        return super().pipeline(name, replay)
+
+
+def _lower_unshared(runtime):
+    lowering = _UnsharedLowering(runtime)
+    for timeline in runtime.timelines.values():
+        for experiment in timeline.experiments.values():
+            lowering.experiment(experiment)
+    return lowering.builder.graph
+
+
+def _timed(function):
+    started = time.perf_counter()
+    result = function()
+    return result, time.perf_counter() - started
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--experiments", type=int, default=100_000)
+    parser.add_argument("--pipelines", type=int, default=16)
+    args = parser.parse_args()
+
+    runtime = generate_runtime(args.experiments, pipelines=args.pipelines)
+    print(f"{args.experiments} experiments over {args.pipelines} pipelines")
+    graph, elapsed = _timed(lambda: _lower_unshared(runtime))
+    print(f"  one chain per experiment  {elapsed:6.2f} s  {len(graph.nodes):>9} nodes")
+    lowered, elapsed = _timed(lambda: lower_runtime(runtime))
+    print(f"  hash-consed lower_runtime {elapsed:6.2f} s  {len(lowered.graph.nodes):>9} nodes")
+    print(lowered.report.summary())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,161 @@
+"""UPEG optimizer passes: graph size, pass time and pipeline run time, each pass on its own.
+
+Usage::
+
+    python benchmarks/bench_upeg_optimizer.py --pipelines 200 --unused 12 --rows 2000000
+
+Generated pipelines look like sweep output: a few derives that reach the
+``select``, constant subexpressions such as ``60 * 60 * 24``, and
+``--unused`` derives nothing reads. Run time executes one pipeline's
+derive/kernel nodes over ``--rows`` in-memory rows with the NumPy kernels.
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fusionflow.compiler import build_runtime  # noqa: E402
+from fusionflow.kernels import compile_assignments, evaluate  # noqa: E402
+from fusionflow.upeg_lowering import lower_runtime  # noqa: E402
+from fusionflow.upeg_optimizer import optimize, parse_expression  # noqa: E402
+
+CONFIGURATIONS = (
+    ("no passes", dict(constant_folding=False, dead_columns=False, derive_fusion=False)),
+    ("constant_folding", dict(constant_folding=True, dead_columns=False, derive_fusion=False)),
+    ("dead_columns", dict(constant_folding=False, dead_columns=True, derive_fusion=False)),
+    ("derive_fusion", dict(constant_folding=False, dead_columns=False, derive_fusion=True)),
+    ("all passes", dict(constant_folding=True, dead_columns=True, derive_fusion=True)),
+)
+
+
+def generate_spec(pipelines: int, unused: int, experiments: int) -> str:
+    parts = [
+        """dataset customers v1
+    source "customers.csv"
+    schema {
+        amount: float
+        days: int
+        age: int
+        churned: bool
+    }
+end
+
+model rf
+    type random_forest
+    params { trees: 200 }
+end
+"""
+    ]
+    for index in range(pipelines):
+        unused_derives = "".join(
+            f"    derive unused_{k} = amount * {k + 1} + age / (days + {k})\n" for k in range(unused)
+        )
+        parts.append(
+            f"""pipeline features_{index}
+    from customers v1
+    derive per_day = amount / days
+{unused_derives}    derive rate = per_day * (60 * 60 * 24) + {index}
+    derive score = rate / (age + 1) - (1 / 2)
+    derive loyal = days > 365 and not churned
+    select [score, loyal]
+    target churned
+end
+"""
+        )
+    for index in range(experiments):
+        parts.append(
+            f"""experiment exp_{index}
+    uses pipeline features_{index % pipelines}
+    uses model rf
+    metrics [accuracy]
+end
+"""
+        )
+    return "\n".join(parts)
+
+
+def _chain(graph, node_id):
+    nodes = []
+    while node_id is not None:
+        node = graph.get_node(node_id)
+        nodes.append(node)
+        node_id = node.inputs[0] if node.inputs else None
+    return nodes[::-1]
+
+
+def run_pipeline(graph, output, columns):
+    """Execute the column nodes from the read up to ``output`` on a dict of arrays."""
+    frame = {}
+    for node in _chain(graph, output):
+        if node.operation == "read":
+            frame = dict(columns)
+        elif node.operation == "derive":
+            frame[node.metadata["target"]] = evaluate(parse_expression(node.metadata["expression"]), frame)
+        elif node.operation == "kernel":
+            assignments = [
+                (assignment["target"], parse_expression(assignment["expression"]))
+                for assignment in node.metadata["assignments"]
+            ]
+            frame.update(compile_assignments(assignments, node.outputs)(frame))
+        elif node.operation == "select":
+            frame = {name: frame[name] for name in [*node.metadata["fields"], "churned"]}
+    return frame
+
+
+def _timed(function, repeat=1):
+    best = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = function()
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return result, best
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--pipelines", type=int, default=200)
+    parser.add_argument("--unused", type=int, default=12, help="Unused derives per pipeline")
+    parser.add_argument("--experiments", type=int, default=2000)
+    parser.add_argument("--rows", type=int, default=2_000_000)
+    args = parser.parse_args()
+
+    runtime = build_runtime(generate_spec(args.pipelines, args.unused, args.experiments))[0]
+    lowered = lower_runtime(runtime)
+    rng = np.random.default_rng(0)
+    columns = {
+        "amount": rng.random(args.rows) * 100,
+        "days": rng.integers(1, 800, args.rows),
+        "age": rng.integers(18, 90, args.rows),
+        "churned": rng.random(args.rows) < 0.3,
+    }
+    print(
+        f"{args.pipelines} pipelines x {args.unused} unused derives, {args.experiments} experiments; "
+        f"run time over {args.rows} rows"
+    )
+    print(f"  {'':<17} {'nodes':>7} {'derive':>7} {'kernel':>7} {'optimize':>10} {'run':>9}")
+    expected = None
+    for label, options in CONFIGURATIONS:
+        (optimized, _), elapsed = _timed(lambda: optimize(lowered, **options))
+        operations = [node.operation for node in optimized.graph.nodes]
+        output = optimized.pipelines["features_0"]
+        result, run = _timed(lambda: run_pipeline(optimized.graph, output, columns), repeat=3)
+        if expected is None:
+            expected = result
+        for name in ("score", "loyal"):
+            np.testing.assert_array_equal(result[name], expected[name])
+        print(
+            f"  {label:<17} {len(operations):>7} {operations.count('derive'):>7} {operations.count('kernel'):>7} "
+            f"{elapsed * 1000:>8.0f} ms {run * 1000:>6.0f} ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
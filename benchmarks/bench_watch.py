@@ -0,0 +1,71 @@
+"""Rebuild latency of ``fusionflow watch`` after a one-line edit vs. a full compile.
+
+Usage::
+
+    python benchmarks/bench_watch.py --size-mb 20 --edits 5
+
+Each edit changes the description of one experiment in the middle of the
+spec; the full compile re-lexes, re-parses and re-serializes everything.
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks._synthetic import generate_spec_of_size  # noqa: E402
+from fusionflow.compiler import build_runtime, write_ir_file  # noqa: E402
+from fusionflow.incremental import SpecWatcher  # noqa: E402
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--size-mb", type=float, default=20)
+    parser.add_argument("--edits", type=int, default=5)
+    args = parser.parse_args()
+
+    source = generate_spec_of_size(int(args.size_mb * 1024 * 1024))
+    marker = source.index('"Sweep entry', len(source) // 2)
+
+    with tempfile.TemporaryDirectory() as workdir:
+        spec_path = os.path.join(workdir, "spec.ff")
+        out_path = os.path.join(workdir, "spec.tir.json")
+        with open(spec_path, "w", encoding="utf-8") as handle:
+            handle.write(source)
+
+        watcher = SpecWatcher(spec_path, out_path)
+        started = time.perf_counter()
+        watcher.poll()
+        print(f"{len(source) / 1e6:.1f} MB spec, {len(watcher.compiler.blocks)} top-level blocks")
+        print(f"  initial watch build      {time.perf_counter() - started:7.2f} s")
+
+        full, incremental = [], []
+        for edit in range(args.edits):
+            source = f"{source[:marker]}\"Edited {edit}{source[marker + 1:]}"
+            with open(spec_path, "w", encoding="utf-8") as handle:
+                handle.write(source)
+
+            started = time.perf_counter()
+            ok, message = watcher.poll()
+            incremental.append(time.perf_counter() - started)
+            assert ok, message
+
+            started = time.perf_counter()
+            runtime, _, _ = build_runtime(source)
+            write_ir_file(runtime, os.path.join(workdir, "full.tir.json"))
+            full.append(time.perf_counter() - started)
+
+        with open(out_path, "rb") as left, open(os.path.join(workdir, "full.tir.json"), "rb") as right:
+            assert left.read() == right.read(), "incremental output differs from a full compile"
+        print(f"  full compile per edit    {min(full):7.2f} s (best of {args.edits})")
+        print(f"  watch rebuild per edit   {min(incremental):7.2f} s (best of {args.edits})")
+        print(f"  last: {message}")
+
+
+if __name__ == "__main__":
+    main()
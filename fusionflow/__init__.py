@@ -4,9 +4,29 @@ FusionFlow - A temporal ML pipeline DSL
 
 __version__ = "0.1.0"
 
-from .lexer import Lexer
-from .parser import Parser
-from .interpreter import Interpreter
-from .runtime import Runtime
+from importlib import import_module
 
-__all__ = ['Lexer', 'Parser', 'Interpreter', 'Runtime']
+# Resolved on first use so that thin entry points (the CLI forwarding to
+# ``fusionflow serve``) do not pay for importing the whole compiler.
+_EXPORTS = {
+    'Lexer': '.lexer',
+    'Parser': '.parser',
+    'StreamingParser': '.parser',
+    'Interpreter': '.interpreter',
+    'Runtime': '.runtime',
+}
+
+__all__ = ['Lexer', 'Parser', 'StreamingParser', 'Interpreter', 'Runtime']
+
+
+def __getattr__(name):
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(import_module(module, __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(list(globals()) + __all__)
@@ -3,27 +3,31 @@
 from __future__ import annotations
 
 import argparse
-import json
 import sys
+import time
 from pathlib import Path
-from typing import Any, List, Optional, Sequence, Tuple
+from typing import Optional, Sequence
 
-from fusionflow.interpreter import Interpreter
-from fusionflow.ir_export import build_temporal_ir
-from fusionflow.lexer import Lexer
-from fusionflow.parser import Parser
-from fusionflow.runtime import Runtime
+from fusionflow.compile_cache import CompileCache, shared_cache
+from fusionflow.daemon import CompileDaemon, default_socket_path, forward
 
+# The compiler modules are imported by the handlers that need them, so a
+# call that is forwarded to ``fusionflow serve`` starts up without them.
+IR_FORMATS = ("json", "binary")
 
-def _build_runtime(source: str) -> Tuple[Runtime, List[Any], Any]:
-    lexer = Lexer(source)
-    tokens = lexer.tokenize()
-    parser_obj = Parser(tokens)
-    ast = parser_obj.parse()
-    runtime = Runtime()
-    interpreter = Interpreter(runtime)
-    interpreter.execute(ast)
-    return runtime, tokens, ast
+
+def _add_cache_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument("--no-cache", action="store_true", help="Always lex, parse and interpret from scratch")
+    parser.add_argument(
+        "--cache-dir",
+        help="Directory for cached compile results (default: $FUSIONFLOW_CACHE_DIR or ~/.cache/fusionflow)",
+    )
+
+
+def _cache_from_args(args: argparse.Namespace) -> Optional[CompileCache]:
+    if args.no_cache:
+        return None
+    return shared_cache(args.cache_dir)
 
 
 def handle_run(argv: Sequence[str]) -> int:
@@ -33,9 +37,12 @@ def handle_run(argv: Sequence[str]) -> int:
     parser.add_argument("--print-ast", action="store_true", help="Print AST")
     parser.add_argument("--print-state", action="store_true", help="Print runtime state")
     parser.add_argument("--debug", action="store_true", help="Debug mode")
+    _add_cache_arguments(parser)
 
     args = parser.parse_args(list(argv))
 
+    from fusionflow.compiler import build_runtime, load_runtime
+
     if args.version:
         print("FusionFlow v0.1.0")
         return 0
@@ -46,7 +53,10 @@ def handle_run(argv: Sequence[str]) -> int:
 
     try:
         source = Path(args.file).read_text(encoding="utf-8")
-        runtime, tokens, ast = _build_runtime(source)
+        if args.debug:
+            runtime, tokens, ast = build_runtime(source, keep_tokens=True)
+        else:
+            runtime, ast = load_runtime(source, _cache_from_args(args))
 
         if args.debug:
             print("=== TOKENS ===")
@@ -92,27 +102,65 @@ def handle_run(argv: Sequence[str]) -> int:
 
 def handle_compile(argv: Sequence[str]) -> int:
     parser = argparse.ArgumentParser(description="Compile FusionFlow spec to Temporal IR JSON")
-    parser.add_argument("file", help="FusionFlow spec file (.ff)")
-    parser.add_argument("--out", dest="out_path", help="Write JSON output to file")
+    parser.add_argument("file", help="FusionFlow spec file (.ff), directory, or glob pattern")
+    parser.add_argument("--out", dest="out_path", help="Write IR output to file")
+    parser.add_argument(
+        "--out-dir",
+        help="Write one .tir.json (or .tir.bin) per spec under this directory (multi-file mode)",
+    )
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=0,
+        help="Worker processes for multi-file mode (default: one per CPU)",
+    )
     parser.add_argument(
         "--compact",
         action="store_true",
         help="Emit compact JSON without indentation",
     )
+    parser.add_argument(
+        "--format",
+        dest="ir_format",
+        choices=IR_FORMATS,
+        default="json",
+        help="IR encoding: indented/compact JSON or the compact binary format (default: json)",
+    )
+    _add_cache_arguments(parser)
 
     args = parser.parse_args(list(argv))
 
+    from fusionflow.batch_compile import is_batch_target
+    from fusionflow.compiler import load_ir_bytes, load_runtime, write_bytes_file, write_ir, write_ir_file
+    from fusionflow.ir_export import write_temporal_ir_binary
+
+    if args.out_dir or is_batch_target(args.file):
+        if args.out_path:
+            print("Error: --out cannot be combined with multi-file compilation; use --out-dir", file=sys.stderr)
+            return 1
+        return _compile_batch(args)
+
     try:
         source = Path(args.file).read_text(encoding="utf-8")
-        runtime, _, _ = _build_runtime(source)
-        ir_payload = build_temporal_ir(runtime)
-        indent = None if args.compact else 2
-        json_output = json.dumps(ir_payload, indent=indent)
+        cache = _cache_from_args(args)
+        if cache is not None and cache.keep_ir:
+            data = load_ir_bytes(source, cache, args.ir_format, args.compact)
+            if args.out_path:
+                write_bytes_file(args.out_path, data)
+            else:
+                sys.stdout.flush()
+                sys.stdout.buffer.write(data)
+                sys.stdout.buffer.flush()
+            return 0
 
+        runtime, _ = load_runtime(source, cache)
         if args.out_path:
-            Path(args.out_path).write_text(json_output + "\n", encoding="utf-8")
+            write_ir_file(runtime, args.out_path, compact=args.compact, ir_format=args.ir_format)
+        elif args.ir_format == "binary":
+            write_temporal_ir_binary(runtime, sys.stdout.buffer)
+            sys.stdout.buffer.flush()
         else:
-            print(json_output)
+            write_ir(runtime, sys.stdout, compact=args.compact)
 
         return 0
 
@@ -127,15 +175,197 @@ def handle_compile(argv: Sequence[str]) -> int:
         return 1
 
 
-def main(argv: Optional[Sequence[str]] = None) -> int:
-    if argv is None:
-        argv = sys.argv[1:]
+def _compile_batch(args: argparse.Namespace) -> int:
+    from fusionflow.batch_compile import compile_many, discover_specs, format_report
+
+    base, specs = discover_specs(args.file)
+    if not specs:
+        print(f"Error: No .ff files match '{args.file}'", file=sys.stderr)
+        return 1
+
+    started = time.perf_counter()
+    results = compile_many(
+        specs,
+        base,
+        Path(args.out_dir) if args.out_dir else None,
+        jobs=args.jobs,
+        compact=args.compact,
+        cache_dir=args.cache_dir,
+        use_cache=not args.no_cache,
+        ir_format=args.ir_format,
+    )
+    errors, summary = format_report(results, time.perf_counter() - started)
+
+    for line in errors:
+        print(line, file=sys.stderr)
+    for line in summary:
+        print(line)
+    return 1 if errors else 0
+
+
+def handle_serve(argv: Sequence[str]) -> int:
+    parser = argparse.ArgumentParser(description="Run a FusionFlow compile daemon with warm caches")
+    parser.add_argument("--socket", help="Unix socket path (default: $FUSIONFLOW_SOCKET or a per-user path)")
+    parser.add_argument(
+        "--max-entries",
+        type=int,
+        default=256,
+        help="In-memory cache entries (runtimes and encoded IR) to keep",
+    )
+    args = parser.parse_args(list(argv))
+
+    socket_path = Path(args.socket) if args.socket else default_socket_path()
+    try:
+        daemon = CompileDaemon(socket_path, dispatch, max_entries=args.max_entries)
+    except OSError as exc:
+        print(f"Error: {exc}", file=sys.stderr)
+        return 1
+
+    print(f"FusionFlow daemon listening on {socket_path}")
+    sys.stdout.flush()
+    try:
+        daemon.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        daemon.server_close()
+    return 0
+
+
+def handle_watch(argv: Sequence[str]) -> int:
+    parser = argparse.ArgumentParser(description="Recompile a FusionFlow spec to Temporal IR whenever it changes")
+    parser.add_argument("file", help="FusionFlow spec file (.ff)")
+    parser.add_argument("--out", dest="out_path", required=True, help="IR file to keep up to date")
+    parser.add_argument("--interval", type=float, default=0.5, help="Seconds between polls (default: 0.5)")
+    parser.add_argument("--compact", action="store_true", help="Emit compact JSON without indentation")
+    parser.add_argument(
+        "--format",
+        dest="ir_format",
+        choices=IR_FORMATS,
+        default="json",
+        help="IR encoding: indented/compact JSON or the compact binary format (default: json)",
+    )
+    parser.add_argument("--once", action="store_true", help="Build once and exit instead of watching")
+    args = parser.parse_args(list(argv))
+
+    from fusionflow.incremental import SpecWatcher
+
+    watcher = SpecWatcher(args.file, args.out_path, compact=args.compact, ir_format=args.ir_format)
+    if not args.once:
+        print(f"Watching {args.file} (Ctrl+C to stop)")
+    try:
+        while True:
+            result = watcher.poll()
+            if result is not None:
+                ok, message = result
+                print(message, file=sys.stdout if ok else sys.stderr)
+                sys.stdout.flush()
+                if args.once:
+                    return 0 if ok else 1
+            time.sleep(args.interval)
+    except KeyboardInterrupt:
+        return 0
+
+
+def handle_query(argv: Sequence[str]) -> int:
+    parser = argparse.ArgumentParser(description="Query the registry of a FusionFlow spec or compiled IR file")
+    parser.add_argument("file", help="FusionFlow spec file (.ff) or compiled IR (.tir.json / .tir.bin)")
+    parser.add_argument(
+        "query",
+        help="e.g. \"experiments where pipeline = churn_features and metric = f1\" "
+        "or \"datasets where name = customers and version >= v2\"",
+    )
+    parser.add_argument("--count", action="store_true", help="Print only the number of matches")
+    _add_cache_arguments(parser)
+    args = parser.parse_args(list(argv))
+
+    from fusionflow.query import load_index
+
+    try:
+        results = load_index(args.file, _cache_from_args(args)).query(args.query)
+    except FileNotFoundError:
+        print(f"Error: File '{args.file}' not found", file=sys.stderr)
+        return 1
+    except SyntaxError as exc:
+        print(f"Syntax Error: {exc}", file=sys.stderr)
+        return 1
+    except Exception as exc:
+        print(f"Error: {exc}", file=sys.stderr)
+        return 1
+
+    if args.count:
+        print(len(results))
+    elif results:
+        sys.stdout.write("\n".join(results) + "\n")
+    return 0
+
+
+def handle_diff(argv: Sequence[str]) -> int:
+    parser = argparse.ArgumentParser(description="Show semantic differences between two FusionFlow specs or IR files")
+    parser.add_argument("old", help="Old spec (.ff) or compiled IR (.tir.json / .tir.bin)")
+    parser.add_argument("new", help="New spec (.ff) or compiled IR (.tir.json / .tir.bin)")
+    parser.add_argument(
+        "--exit-code",
+        action="store_true",
+        help="Exit with 1 if there are differences and 0 if there are none",
+    )
+    _add_cache_arguments(parser)
+    args = parser.parse_args(list(argv))
+
+    from fusionflow.ir_diff import diff_files
+
+    try:
+        changes = diff_files(args.old, args.new, _cache_from_args(args))
+    except FileNotFoundError as exc:
+        print(f"Error: File '{exc.filename}' not found", file=sys.stderr)
+        return 1
+    except SyntaxError as exc:
+        print(f"Syntax Error: {exc}", file=sys.stderr)
+        return 1
+    except Exception as exc:
+        print(f"Error: {exc}", file=sys.stderr)
+        return 1
 
+    if changes:
+        sys.stdout.write("\n".join(str(change) for change in changes) + "\n")
+    return 1 if args.exit_code and changes else 0
+
+
+def _forwardable(argv: Sequence[str]) -> bool:
+    if not argv:
+        return False
+    if argv[0] in ("compile", "query", "diff"):
+        return True
+    return "--print-state" in argv and "--debug" not in argv
+
+
+def dispatch(argv: Sequence[str]) -> int:
+    """Run a CLI command in this process."""
     if argv and argv[0] == "compile":
         return handle_compile(argv[1:])
+    if argv and argv[0] == "serve":
+        return handle_serve(argv[1:])
+    if argv and argv[0] == "watch":
+        return handle_watch(argv[1:])
+    if argv and argv[0] == "query":
+        return handle_query(argv[1:])
+    if argv and argv[0] == "diff":
+        return handle_diff(argv[1:])
 
     return handle_run(argv)
 
 
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    if argv is None:
+        argv = sys.argv[1:]
+
+    if _forwardable(argv):
+        exit_code = forward(argv)
+        if exit_code is not None:
+            return exit_code
+
+    return dispatch(argv)
+
+
 if __name__ == "__main__":
     sys.exit(main())
@@ -0,0 +1,101 @@
+"""Binary-lifting ancestry index over the timeline tree."""
+
+from __future__ import annotations
+
+from typing import Dict, List, Optional
+
+
+class AncestryIndex:
+    """Ancestor and lowest-common-ancestor queries over a growing forest of named nodes.
+
+    Each node stores its ancestors ``1, 2, 4, ...`` levels up, so a node is
+    added in ``O(log depth)`` and both queries climb in ``O(log depth)``
+    jumps instead of walking parent links one at a time. Nodes are only
+    ever appended, which matches how timelines are registered: a parent
+    always exists before its children.
+    """
+
+    def __init__(self):
+        self._ids: Dict[str, int] = {}
+        self._names: List[str] = []
+        self._depths: List[int] = []
+        # _jumps[node][k] is the ancestor 2**k levels above node.
+        self._jumps: List[List[int]] = []
+
+    def __contains__(self, name: object) -> bool:
+        return name in self._ids
+
+    def __len__(self) -> int:
+        return len(self._names)
+
+    def add(self, name: str, parent: Optional[str] = None) -> None:
+        if name in self._ids:
+            raise ValueError(f"Timeline '{name}' already exists")
+        node = len(self._names)
+        jumps: List[int] = []
+        depth = 0
+        if parent is not None:
+            ancestor = self._id(parent)
+            depth = self._depths[ancestor] + 1
+            level = 0
+            while True:
+                jumps.append(ancestor)
+                ancestor_jumps = self._jumps[ancestor]
+                if level >= len(ancestor_jumps):
+                    break
+                ancestor = ancestor_jumps[level]
+                level += 1
+        self._ids[name] = node
+        self._names.append(name)
+        self._depths.append(depth)
+        self._jumps.append(jumps)
+
+    def depth(self, name: str) -> int:
+        """Number of parent links between ``name`` and its root."""
+        return self._depths[self._id(name)]
+
+    def ancestor(self, name: str, depth: int) -> str:
+        """The ancestor of ``name`` (or ``name`` itself) that sits at ``depth``."""
+        node = self._id(name)
+        if not 0 <= depth <= self._depths[node]:
+            raise ValueError(f"Timeline '{name}' has no ancestor at depth {depth}")
+        return self._names[self._lift(node, self._depths[node] - depth)]
+
+    def is_ancestor(self, ancestor: str, name: str) -> bool:
+        """Whether ``ancestor`` is ``name`` itself or one of its ancestors."""
+        top, node = self._id(ancestor), self._id(name)
+        climb = self._depths[node] - self._depths[top]
+        return climb >= 0 and self._lift(node, climb) == top
+
+    def lowest_common_ancestor(self, first: str, second: str) -> Optional[str]:
+        """Deepest node that is an ancestor of both, or ``None`` if they share no root."""
+        a, b = self._id(first), self._id(second)
+        if self._depths[a] < self._depths[b]:
+            a, b = b, a
+        a = self._lift(a, self._depths[a] - self._depths[b])
+        if a == b:
+            return self._names[a]
+        jumps = self._jumps
+        for level in range(len(jumps[a]) - 1, -1, -1):
+            # Both nodes sit at the same depth, so their jump lists match in length.
+            if level < len(jumps[a]) and jumps[a][level] != jumps[b][level]:
+                a, b = jumps[a][level], jumps[b][level]
+        if not jumps[a]:
+            return None
+        return self._names[jumps[a][0]]
+
+    def _lift(self, node: int, levels: int) -> int:
+        jumps = self._jumps
+        level = 0
+        while levels:
+            if levels & 1:
+                node = jumps[node][level]
+            levels >>= 1
+            level += 1
+        return node
+
+    def _id(self, name: str) -> int:
+        node = self._ids.get(name)
+        if node is None:
+            raise ValueError(f"Timeline '{name}' is not defined")
+        return node
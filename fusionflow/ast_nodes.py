@@ -1,23 +1,44 @@
 """AST node definitions for FusionFlow"""
 
-from dataclasses import dataclass
+from dataclasses import dataclass, fields
 from typing import Any, Dict, List, Optional
 
-@dataclass
+
+def node(cls):
+    """``@dataclass`` whose instances use ``__slots__`` instead of a ``__dict__``.
+
+    Same effect as ``dataclass(slots=True)``, which needs Python 3.10. Large
+    specifications create hundreds of thousands of nodes, so the per-instance
+    dict matters.
+    """
+    cls = dataclass(cls)
+    inherited = {name for base in cls.__mro__[1:] for name in getattr(base, '__slots__', ())}
+    slots = tuple(f.name for f in fields(cls) if f.name not in inherited)
+    namespace = {
+        key: value
+        for key, value in cls.__dict__.items()
+        if key not in slots and key not in ('__dict__', '__weakref__')
+    }
+    namespace['__slots__'] = slots
+    slotted = type(cls)(cls.__name__, cls.__bases__, namespace)
+    slotted.__qualname__ = cls.__qualname__
+    return slotted
+
+@node
 class ASTNode:
     """Base class for all AST nodes"""
     pass
 
-@dataclass
+@node
 class Program(ASTNode):
     statements: List[ASTNode]
 
-@dataclass
+@node
 class SchemaField(ASTNode):
     name: str
     type_name: str
 
-@dataclass
+@node
 class DatasetDeclaration(ASTNode):
     name: str
     version: str
@@ -25,45 +46,45 @@ class DatasetDeclaration(ASTNode):
     schema: List[SchemaField]
     description: Optional[str] = None
 
-@dataclass
+@node
 class DatasetReference(ASTNode):
     name: str
     version: str
 
-@dataclass
+@node
 class PipelineStep(ASTNode):
     pass
 
-@dataclass
+@node
 class DeriveStep(PipelineStep):
     variable: str
     expression: 'Expression'
 
-@dataclass
+@node
 class SelectStep(PipelineStep):
     fields: List[str]
 
-@dataclass
+@node
 class TargetStep(PipelineStep):
     field: str
 
-@dataclass
+@node
 class PipelineDefinition(ASTNode):
     name: str
     source: DatasetReference
     steps: List[PipelineStep]
 
-@dataclass
+@node
 class PipelineExtension(ASTNode):
     steps: List[PipelineStep]
 
-@dataclass
+@node
 class ModelDefinition(ASTNode):
     name: str
     type_name: str
     params: Dict[str, Any]
 
-@dataclass
+@node
 class ExperimentDefinition(ASTNode):
     name: str
     pipeline: str
@@ -72,18 +93,18 @@ class ExperimentDefinition(ASTNode):
     description: Optional[str] = None
     extension: Optional[PipelineExtension] = None
 
-@dataclass
+@node
 class TimelineDefinition(ASTNode):
     name: str
     description: Optional[str]
     experiments: List[ExperimentDefinition]
 
-@dataclass
+@node
 class MergeStrategy(ASTNode):
     name: str
     arguments: List[str]
 
-@dataclass
+@node
 class MergeStatement(ASTNode):
     source_timeline: str
     target_timeline: str
@@ -91,30 +112,30 @@ class MergeStatement(ASTNode):
     strategy: MergeStrategy
 
 # Expression nodes
-@dataclass
+@node
 class Expression(ASTNode):
     pass
 
-@dataclass
+@node
 class BinaryOp(Expression):
     left: Expression
     operator: str
     right: Expression
 
-@dataclass
+@node
 class UnaryOp(Expression):
     operator: str
     operand: Expression
 
-@dataclass
+@node
 class Literal(Expression):
     value: Any
 
-@dataclass
+@node
 class Identifier(Expression):
     name: str
 
-@dataclass
+@node
 class MemberAccess(Expression):
     object: Expression
     member: str
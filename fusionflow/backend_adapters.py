@@ -1,5 +1,89 @@
 """Backend adapters for different execution engines"""
 
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Sequence, Set, Union
+
+from .ast_nodes import DatasetDeclaration, DeriveStep, PipelineDefinition, PipelineStep, SelectStep, TargetStep
+from .column_cache import ColumnCache
+
+# Declared schema types mapped to the dtype pandas should parse them as.
+SCHEMA_DTYPES = {
+    "int": "int64",
+    "float": "float64",
+    "bool": "bool",
+    "str": "string",
+    "string": "string",
+    "category": "category",
+}
+SCHEMA_DATE_TYPES = {"date", "datetime", "timestamp"}
+
+# Default working-set size for chunked execution.
+DEFAULT_MEMORY_BUDGET = 256 * 1024 * 1024
+# While a chunk is parsed, pandas holds raw text and partly converted columns
+# next to the finished frame; a chunk's parsed size is scaled by this much.
+_PARSE_OVERHEAD = 3
+_SAMPLE_ROWS = 1000
+_MIN_CHUNK_ROWS = 1000
+
+
+@dataclass
+class ExecutionPlan:
+    """The steps of a pipeline that affect its output, and the source columns they read.
+
+    ``columns`` is ``None`` when every source column reaches the output
+    (there is no ``select``); otherwise it is the minimal set, in schema
+    order where a schema is declared. Derives whose result is never used
+    are left out of ``steps``.
+    """
+
+    steps: List[PipelineStep]
+    columns: Optional[List[str]]
+    target: Optional[str] = None
+    skipped: List[str] = field(default_factory=list)
+
+
+def plan_pipeline(steps: Sequence[PipelineStep], schema: Sequence[str] = ()) -> ExecutionPlan:
+    """Work backwards from the output to find the columns and derives each step needs."""
+    from .kernels import compile_expression
+
+    target = None
+    for step in steps:
+        if isinstance(step, TargetStep):
+            target = step.field
+
+    live: Optional[Set[str]] = None  # None: every column still reaches the output
+    kept: List[PipelineStep] = []
+    skipped: List[str] = []
+    derived_later: Set[str] = set()
+    for step in reversed(steps):
+        if isinstance(step, SelectStep):
+            live = set(step.fields)
+            # Selects keep the target, unless a later step derives it.
+            if target is not None and target not in derived_later:
+                live.add(target)
+        elif isinstance(step, TargetStep):
+            if live is not None:
+                live.add(step.field)
+        elif isinstance(step, DeriveStep):
+            derived_later.add(step.variable)
+            if live is not None:
+                if step.variable not in live:
+                    skipped.append(step.variable)
+                    continue
+                live.discard(step.variable)
+                live.update(compile_expression(step.expression).columns)
+        kept.append(step)
+    kept.reverse()
+    skipped.reverse()
+
+    columns: Optional[List[str]] = None
+    if live is not None:
+        ordered = [name for name in schema if name in live]
+        columns = ordered + sorted(live.difference(ordered))
+    return ExecutionPlan(kept, columns, target, skipped)
+
+
 class BackendAdapter:
     """Base class for backend adapters"""
     
@@ -12,15 +96,150 @@ class BackendAdapter:
         raise NotImplementedError
 
 class PandasBackend(BackendAdapter):
-    """Pandas execution backend"""
-    
+    """Pandas execution backend
+
+    ``execute_pipeline`` runs a pipeline's derive/select/target steps on
+    its dataset. Only the source columns the output depends on are read
+    (``usecols``), parsed as the dtypes the dataset schema declares.
+    Relative ``source`` paths are resolved against ``base_dir``. With a
+    ``column_cache``, CSV columns are parsed once per dataset version and
+    memory-mapped on later reads.
+    """
+
+    def __init__(self, base_dir: Union[str, Path, None] = None, column_cache: Optional[ColumnCache] = None):
+        self.base_dir = Path(base_dir) if base_dir is not None else None
+        self.column_cache = column_cache
+
     def can_execute(self, operation):
+        if isinstance(operation, (DeriveStep, SelectStep, TargetStep)):
+            return True
         return operation in ['filter', 'transform', 'join', 'aggregate']
-    
+
     def execute(self, operation, data):
+        if isinstance(operation, DeriveStep):
+            # Compiled NumPy kernel; the new column is added to ``data`` in place.
+            from .kernels import compile_expression
+
+            data[operation.variable] = compile_expression(operation.expression)(data)
+            return data
+        if isinstance(operation, SelectStep):
+            fields = list(operation.fields)
+            target = data.attrs.get("target")
+            # A target that does not exist yet is derived by a later step.
+            if target is not None and target not in fields and target in data.columns:
+                fields.append(target)
+            _require_columns(data, fields, "selected")
+            # A shallow copy, so later derives add columns to a frame of its own.
+            result = data[fields].copy(deep=False)
+            result.attrs["target"] = target
+            return result
+        if isinstance(operation, TargetStep):
+            _require_columns(data, [operation.field], "used as target")
+            data.attrs["target"] = operation.field
+            return data
         # Pandas execution logic
         return data
 
+    def execute_pipeline(
+        self,
+        pipeline: PipelineDefinition,
+        dataset: DatasetDeclaration,
+        extension: Sequence[PipelineStep] = (),
+    ):
+        """Read ``dataset`` and apply the pipeline's steps, then ``extension``'s, to it."""
+        steps = [*pipeline.steps, *extension]
+        plan = plan_pipeline(steps, [column.name for column in dataset.schema])
+        data = self.read_source(dataset, plan.columns)
+        return self.run_plan(plan, data)
+
+    def run_plan(self, plan: ExecutionPlan, data):
+        # The target is known before any select runs, so selects keep it.
+        data.attrs["target"] = plan.target
+        for step in plan.steps:
+            data = self.execute(step, data)
+        return data
+
+    def execute_pipeline_chunked(
+        self,
+        pipeline: PipelineDefinition,
+        dataset: DatasetDeclaration,
+        sink: Union[str, Path, Callable[[Any], None]],
+        extension: Sequence[PipelineStep] = (),
+        memory_budget: int = DEFAULT_MEMORY_BUDGET,
+    ) -> int:
+        """Stream ``dataset`` through the pipeline chunk by chunk; returns the rows written.
+
+        Each output chunk goes to ``sink`` (a CSV path, appended to, or a
+        callable) before the next one is read, so memory use depends on
+        ``memory_budget`` (bytes), which sets the chunk size, rather than
+        on the size of the input.
+        """
+        steps = [*pipeline.steps, *extension]
+        plan = plan_pipeline(steps, [column.name for column in dataset.schema])
+        path = self.source_path(dataset)
+        reader, options = _reader_options(path, dataset, plan.columns)
+        if reader != "csv":
+            raise ValueError(f"Chunked execution needs a CSV source; dataset '{dataset.name}' is {reader}")
+
+        write = CSVSink(sink) if isinstance(sink, (str, Path)) else sink
+        rows = 0
+        for chunk in _read_csv(path, options, chunksize=self.chunk_rows(plan, dataset, memory_budget)):
+            result = self.run_plan(plan, chunk)
+            write(result)
+            rows += len(result)
+        return rows
+
+    def chunk_rows(self, plan: ExecutionPlan, dataset: DatasetDeclaration, memory_budget: int) -> int:
+        """Rows per chunk that keep one parsed chunk and its output within ``memory_budget`` bytes.
+
+        Sizes come from running the plan on the first rows of the source.
+        """
+        sample = self.read_source(dataset, plan.columns, nrows=_SAMPLE_ROWS)
+        if not len(sample):
+            return _SAMPLE_ROWS
+        parsed = int(sample.memory_usage(deep=True).sum())
+        output = int(self.run_plan(plan, sample).memory_usage(deep=True).sum())
+        per_row = max(1, (parsed * _PARSE_OVERHEAD + output) // len(sample))
+        return max(_MIN_CHUNK_ROWS, memory_budget // per_row)
+
+    def read_source(self, dataset: DatasetDeclaration, columns: Optional[List[str]] = None, **options: Any):
+        """Load ``dataset.source``, restricted to ``columns`` when given.
+
+        Extra ``options`` (e.g. ``nrows``) are passed to ``pandas.read_csv``.
+        """
+        import pandas as pd
+
+        path = self.source_path(dataset)
+        reader, read_options = _reader_options(path, dataset, columns)
+        if reader == "parquet":
+            return pd.read_parquet(path, columns=columns)
+        if self.column_cache is not None and not options and (columns is None or columns):
+            if columns is None:
+                columns = [column.name for column in dataset.schema] or list(
+                    pd.read_csv(path, nrows=0, sep=read_options["sep"]).columns
+                )
+            return self.column_cache.load(
+                dataset, path, columns, lambda names: _read_csv(path, _reader_options(path, dataset, names)[1])
+            )
+        return _read_csv(path, {**read_options, **options})
+
+    def source_path(self, dataset: DatasetDeclaration) -> str:
+        source = dataset.source
+        if self.base_dir is None or "://" in source or Path(source).is_absolute():
+            return source
+        return str(self.base_dir / source)
+
+class CSVSink:
+    """Write output chunks to one CSV file: the header once, then rows appended."""
+
+    def __init__(self, path: Union[str, Path]):
+        self.path = path
+        self._started = False
+
+    def __call__(self, frame: Any) -> None:
+        frame.to_csv(self.path, mode="a" if self._started else "w", header=not self._started, index=False)
+        self._started = True
+
 class SparkBackend(BackendAdapter):
     """Spark execution backend (future)"""
     
@@ -29,3 +248,58 @@ class SparkBackend(BackendAdapter):
     
     def execute(self, operation, data):
         raise NotImplementedError("Spark backend not implemented")
+
+
+def _require_columns(data: Any, columns: Sequence[str], role: str) -> None:
+    missing = [column for column in columns if column not in data.columns]
+    if missing:
+        raise ValueError(f"Column '{missing[0]}' {role} by the pipeline is not defined")
+
+
+def _read_csv(path: str, options: Dict[str, Any], chunksize: Optional[int] = None):
+    """``pandas.read_csv``, or an iterator of frames with ``chunksize``."""
+    import pandas as pd
+
+    if options.get("usecols") is not None and not options["usecols"]:
+        # Nothing but the row count is needed; read the narrowest possible frame.
+        narrow = {**options, "usecols": [0], "dtype": None}
+        if chunksize is None:
+            frame = pd.read_csv(path, **narrow)
+            return frame.drop(columns=frame.columns)
+        return (chunk.drop(columns=chunk.columns) for chunk in pd.read_csv(path, chunksize=chunksize, **narrow))
+    if chunksize is None:
+        return pd.read_csv(path, **options)
+    return pd.read_csv(path, chunksize=chunksize, **options)
+
+
+def _reader_options(path: str, dataset: DatasetDeclaration, columns: Optional[List[str]]):
+    """``("csv", read_csv keyword arguments)`` or ``("parquet", {})`` for a source path."""
+    suffix = path.lower().rsplit(".", 1)[-1] if "." in path else ""
+    if suffix in ("parquet", "pq"):
+        return "parquet", {}
+    if suffix not in ("csv", "tsv", "txt", "gz", "bz2", "zip", "xz"):
+        raise ValueError(f"Unsupported source format for dataset '{dataset.name}': {dataset.source}")
+
+    wanted = None if columns is None else set(columns)
+    dtypes: Dict[str, str] = {}
+    dates: List[str] = []
+    for column in dataset.schema:
+        if wanted is not None and column.name not in wanted:
+            continue
+        if column.type_name in SCHEMA_DTYPES:
+            dtypes[column.name] = SCHEMA_DTYPES[column.type_name]
+        elif column.type_name in SCHEMA_DATE_TYPES:
+            dates.append(column.name)
+    if columns is not None and dataset.schema:
+        declared = {column.name for column in dataset.schema}
+        undeclared = [name for name in columns if name not in declared]
+        if undeclared:
+            raise ValueError(f"Column '{undeclared[0]}' is not in the schema of dataset '{dataset.name}'")
+    options: Dict[str, Any] = {
+        "sep": "\t" if suffix == "tsv" or path.lower().endswith((".tsv.gz", ".tsv.bz2")) else ",",
+        "usecols": columns,
+        "dtype": dtypes or None,
+    }
+    if dates:
+        options["parse_dates"] = dates
+    return "csv", options
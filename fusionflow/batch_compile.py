@@ -0,0 +1,133 @@
+"""Parallel compilation of many FusionFlow specs into Temporal IR files"""
+
+from __future__ import annotations
+
+import glob
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterable, List, Optional, Sequence, Tuple
+
+from .compile_cache import CompileCache
+from .compiler import load_runtime, write_ir_file
+
+GLOB_CHARACTERS = "*?["
+
+IR_SUFFIX = ".tir.json"
+BINARY_IR_SUFFIX = ".tir.bin"
+
+
+@dataclass
+class CompileResult:
+    path: str
+    out_path: str
+    source_bytes: int
+    seconds: float
+    error: Optional[str] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+def is_batch_target(target: str) -> bool:
+    return os.path.isdir(target) or any(char in target for char in GLOB_CHARACTERS)
+
+
+def discover_specs(target: str) -> Tuple[Path, List[Path]]:
+    """Return ``(base_dir, spec_paths)`` for a directory, glob pattern or single file."""
+    if os.path.isdir(target):
+        base = Path(target)
+        return base, sorted(path for path in base.rglob("*.ff") if path.is_file())
+
+    if any(char in target for char in GLOB_CHARACTERS):
+        paths = sorted(Path(match) for match in glob.glob(target, recursive=True) if os.path.isfile(match))
+        if not paths:
+            return Path("."), []
+        base = Path(os.path.commonpath([str(path.parent) for path in paths]))
+        return base, paths
+
+    path = Path(target)
+    return path.parent, [path]
+
+
+def output_path_for(spec: Path, base: Path, out_dir: Optional[Path], ir_format: str = "json") -> Path:
+    name = spec.name[: -len(spec.suffix)] if spec.suffix else spec.name
+    name += BINARY_IR_SUFFIX if ir_format == "binary" else IR_SUFFIX
+    if out_dir is None:
+        return spec.with_name(name)
+    relative_parent = spec.parent.relative_to(base) if spec.parent != base else Path()
+    return out_dir / relative_parent / name
+
+
+def compile_file(
+    spec_path: str,
+    out_path: str,
+    compact: bool,
+    cache_dir: Optional[str],
+    use_cache: bool,
+    ir_format: str = "json",
+) -> CompileResult:
+    """Compile one spec to ``out_path``; never raises, errors are reported in the result."""
+    started = time.perf_counter()
+    source_bytes = 0
+    try:
+        source = Path(spec_path).read_text(encoding="utf-8")
+        source_bytes = len(source.encode("utf-8"))
+        cache = CompileCache(cache_dir) if use_cache else None
+        runtime, _ = load_runtime(source, cache)
+        write_ir_file(runtime, out_path, compact=compact, ir_format=ir_format)
+        error = None
+    except FileNotFoundError:
+        error = f"File '{spec_path}' not found"
+    except SyntaxError as exc:
+        error = f"Syntax Error: {exc}"
+    except Exception as exc:
+        error = f"Error: {exc}"
+    return CompileResult(spec_path, out_path, source_bytes, time.perf_counter() - started, error)
+
+
+def _compile_task(task: Tuple[str, str, bool, Optional[str], bool, str]) -> CompileResult:
+    return compile_file(*task)
+
+
+def compile_many(
+    specs: Sequence[Path],
+    base: Path,
+    out_dir: Optional[Path],
+    jobs: int = 0,
+    compact: bool = False,
+    cache_dir: Optional[str] = None,
+    use_cache: bool = True,
+    ir_format: str = "json",
+) -> List[CompileResult]:
+    """Compile ``specs`` over a process pool of ``jobs`` workers (0 means one per CPU)."""
+    tasks = [
+        (str(spec), str(output_path_for(spec, base, out_dir, ir_format)), compact, cache_dir, use_cache, ir_format)
+        for spec in specs
+    ]
+    workers = jobs if jobs > 0 else (os.cpu_count() or 1)
+    workers = min(workers, len(tasks))
+
+    if workers <= 1:
+        return [_compile_task(task) for task in tasks]
+
+    chunksize = max(1, len(tasks) // (workers * 4))
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(_compile_task, tasks, chunksize=chunksize))
+
+
+def format_report(results: Iterable[CompileResult], elapsed: float) -> Tuple[List[str], List[str]]:
+    """Return ``(error_lines, summary_lines)`` for a batch compile."""
+    results = list(results)
+    errors = [f"{result.path}: {result.error}" for result in results if not result.ok]
+    compiled = sum(1 for result in results if result.ok)
+    total_bytes = sum(result.source_bytes for result in results)
+    elapsed = max(elapsed, 1e-9)
+    summary = [
+        f"Compiled {compiled}/{len(results)} files ({len(errors)} failed) in {elapsed:.2f}s",
+        f"Throughput: {len(results) / elapsed:.1f} files/s, {total_bytes / (1024 * 1024) / elapsed:.2f} MB/s",
+    ]
+    return errors, summary
@@ -0,0 +1,141 @@
+"""Memory-mapped columnar cache for immutable dataset versions.
+
+A dataset version's columns are parsed from its ``source`` once and stored
+as ``.npy`` files under ``<cache dir>/columns/<name>/<version>/<fingerprint>/``.
+Later reads open them with ``np.load(mmap_mode="r")``, so no text is parsed
+and pages are only read from disk when a kernel touches them.
+"""
+
+from __future__ import annotations
+
+import os
+import shutil
+import tempfile
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Union
+from urllib.parse import quote
+
+import numpy as np
+
+from .ast_nodes import DatasetDeclaration
+from .compile_cache import CACHE_DIR_ENV, default_cache_dir
+
+
+def _quote(name: str) -> str:
+    """A single path component for ``name``: never empty, ``.``, ``..`` or hidden."""
+    quoted = quote(name, safe="")
+    # quote() leaves "." alone and never emits "%2E" or a bare "%" itself,
+    # so these stay unambiguous.
+    if quoted.startswith("."):
+        return "%2E" + quoted[1:]
+    return quoted or "%"
+
+
+def _open(path: Path) -> np.ndarray:
+    # A plain ndarray view, so arithmetic on it does not produce np.memmap results.
+    return np.load(path, mmap_mode="r").view(np.ndarray)
+
+
+class ColumnCache:
+    """Per-column ``.npy`` files for each ``name:version`` and source fingerprint.
+
+    The fingerprint is the source file's size and modification time, so a
+    file rewritten in place gets a new entry (and older entries for the same
+    version are removed) without hashing gigabytes of CSV on every run.
+    Columns are added to an entry as pipelines first ask for them. Columns
+    without a plain NumPy dtype (strings, categories, object columns)
+    cannot be memory-mapped; they are not cached and are re-read from the
+    source each time.
+    """
+
+    def __init__(self, directory: Optional[Union[str, Path]] = None):
+        if directory is None:
+            directory = Path(os.environ.get(CACHE_DIR_ENV) or default_cache_dir()) / "columns"
+        self.directory = Path(directory)
+        # Column reads served from / added to the cache.
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def fingerprint(path: Union[str, Path]) -> Optional[str]:
+        """Identity of a local source file, or ``None`` when it cannot be stat'ed (e.g. a URL)."""
+        try:
+            stat = os.stat(path)
+        except (OSError, ValueError):
+            return None
+        return f"{stat.st_size:x}-{stat.st_mtime_ns:x}"
+
+    def entry(self, dataset: DatasetDeclaration, fingerprint: str) -> Path:
+        return self.directory / _quote(dataset.name) / _quote(dataset.version) / fingerprint
+
+    def load(
+        self,
+        dataset: DatasetDeclaration,
+        path: Union[str, Path],
+        columns: List[str],
+        parse: Callable[[List[str]], Any],
+    ):
+        """``columns`` of ``dataset`` as a DataFrame over memory-mapped arrays.
+
+        ``parse(names)`` must return a DataFrame holding ``names`` read from
+        the source; it is only called for columns not cached yet.
+        """
+        import pandas as pd
+
+        fingerprint = self.fingerprint(path)
+        if fingerprint is None:
+            return parse(columns)
+        entry = self.entry(dataset, fingerprint)
+
+        arrays: Dict[str, Any] = {}
+        missing: List[str] = []
+        for name in columns:
+            try:
+                arrays[name] = _open(entry / f"{_quote(name)}.npy")
+            except (OSError, ValueError):
+                missing.append(name)
+        self.hits += len(arrays)
+        self.misses += len(missing)
+
+        if missing:
+            parsed = parse(missing)
+            if not entry.exists():
+                self._drop_stale(entry)
+            for name in missing:
+                arrays[name] = self._store(entry, name, parsed[name])
+        # copy=False keeps the memory maps instead of consolidating them into new blocks.
+        return pd.DataFrame({name: arrays[name] for name in columns}, copy=False)
+
+    def _store(self, entry: Path, name: str, series: Any) -> Any:
+        """Write one parsed column and return it memory-mapped (or as parsed if it cannot be)."""
+        if not isinstance(series.dtype, np.dtype) or series.dtype.hasobject:
+            return series
+        path = entry / f"{_quote(name)}.npy"
+        try:
+            entry.mkdir(parents=True, exist_ok=True)
+            # Write to a temporary sibling and rename so concurrent readers
+            # never map a partially written file.
+            fd, tmp_name = tempfile.mkstemp(dir=entry, suffix=".tmp")
+            try:
+                with os.fdopen(fd, "wb") as handle:
+                    np.save(handle, series.to_numpy(), allow_pickle=False)
+                os.replace(tmp_name, path)
+            except BaseException:
+                os.unlink(tmp_name)
+                raise
+            return _open(path)
+        except OSError:
+            # Caching is an optimisation; an unwritable directory must not fail the run.
+            return series
+
+    def _drop_stale(self, entry: Path) -> None:
+        """Remove entries for earlier contents of the same dataset version."""
+        try:
+            # Only ever delete inside <cache dir>/<name>/<version>/.
+            if entry.parent.parent.parent.resolve() != self.directory.resolve():
+                return
+            stale = [path for path in entry.parent.iterdir() if path.is_dir() and path != entry]
+        except OSError:
+            return
+        for path in stale:
+            shutil.rmtree(path, ignore_errors=True)
@@ -0,0 +1,220 @@
+"""Content-addressed cache for FusionFlow compile results.
+
+Entries are keyed by a SHA-256 of the FusionFlow version, the cache format, the
+entry kind and the spec source, so an edited file or an upgraded compiler never
+sees a stale entry. A small in-process LRU sits in front of an on-disk store
+of pickled values, by default in the per-user ``$XDG_CACHE_HOME/fusionflow``
+(``~/.cache/fusionflow``).
+
+Every entry on disk carries an HMAC-SHA256 keyed by a per-user secret kept in
+that private directory, and is only unpickled if the MAC matches. A cache
+directory that came from somewhere else (a cloned repository, a shared
+``--cache-dir``) therefore cannot make ``fusionflow compile`` unpickle
+attacker-written data; such entries are dropped and recompiled.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import hmac
+import os
+import pickle
+import secrets
+import stat
+import tempfile
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple, Union
+
+from . import __version__
+
+# Part of every cache key. Any change to what a cached value contains or
+# renders to must bump it: the pickled objects (Runtime, AST nodes, indexes),
+# the parser's output, the IR text and hashes, and the entry file layout.
+CACHE_FORMAT = 4
+
+CACHE_DIR_ENV = "FUSIONFLOW_CACHE_DIR"
+
+_MAC_SIZE = hashlib.sha256().digest_size
+_SECRET_FILE = "key"
+_secrets: Dict[Path, bytes] = {}
+
+
+def default_cache_dir() -> Path:
+    """The per-user cache root: ``$XDG_CACHE_HOME/fusionflow`` or ``~/.cache/fusionflow``."""
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return Path(base) / "fusionflow"
+
+
+def private_directory(path: Union[str, Path]) -> Path:
+    """Create ``path`` with mode 0700 if needed and check nobody else controls it.
+
+    Raises ``PermissionError`` if it is a symlink, is owned by another user,
+    or is writable or readable by group or others.
+    """
+    path = Path(path)
+    path.mkdir(mode=0o700, parents=True, exist_ok=True)
+    info = os.lstat(path)
+    if stat.S_ISLNK(info.st_mode) or not stat.S_ISDIR(info.st_mode):
+        raise PermissionError(f"'{path}' is not a directory")
+    if hasattr(os, "getuid"):
+        if info.st_uid != os.getuid():
+            raise PermissionError(f"'{path}' is owned by another user")
+        if stat.S_IMODE(info.st_mode) != 0o700:
+            raise PermissionError(f"'{path}' must have mode 0700, not {stat.S_IMODE(info.st_mode):04o}")
+    return path
+
+
+def _user_secret() -> bytes:
+    """The per-user HMAC key, created on first use inside the private cache root."""
+    root = default_cache_dir()
+    if root not in _secrets:
+        path = private_directory(root) / _SECRET_FILE
+        nofollow = getattr(os, "O_NOFOLLOW", 0)
+        try:
+            fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_EXCL | nofollow, 0o600)
+        except FileExistsError:
+            fd = os.open(path, os.O_RDONLY | nofollow)
+            with os.fdopen(fd, "rb") as handle:
+                secret = handle.read()
+            if len(secret) < 32:
+                raise PermissionError(f"Cache key '{path}' is truncated")
+        else:
+            secret = secrets.token_bytes(32)
+            with os.fdopen(fd, "wb") as handle:
+                handle.write(secret)
+        _secrets[root] = secret
+    return _secrets[root]
+
+
+class CompileCache:
+    """Two-tier compile cache.
+
+    ``keep_ir`` additionally keeps encoded IR in the memory tier (never on
+    disk, it can be large); long-lived processes such as ``fusionflow serve``
+    turn it on so repeat compiles skip IR serialization too.
+    """
+
+    def __init__(
+        self,
+        directory: Optional[Union[str, Path]] = None,
+        max_entries: int = 64,
+        use_disk: bool = True,
+        keep_ir: bool = False,
+    ):
+        if directory is None:
+            directory = os.environ.get(CACHE_DIR_ENV) or default_cache_dir()
+        self.directory = Path(directory)
+        self.max_entries = max_entries
+        self.use_disk = use_disk
+        self.keep_ir = keep_ir
+        self._memory: "OrderedDict[str, Any]" = OrderedDict()
+        self._secret: Optional[bytes] = None
+        if use_disk:
+            try:
+                self._secret = _user_secret()
+            except OSError:
+                # Without a trustworthy key nothing on disk can be verified;
+                # fall back to the memory tier.
+                self.use_disk = False
+
+    @staticmethod
+    def key(source: str, kind: str) -> str:
+        digest = hashlib.sha256(f"{__version__}\0{CACHE_FORMAT}\0{kind}\0".encode("utf-8"))
+        digest.update(source.encode("utf-8"))
+        return digest.hexdigest()
+
+    def _path(self, key: str) -> Path:
+        return self.directory / key[:2] / f"{key}.pkl"
+
+    def _mac(self, key: str, payload: bytes) -> bytes:
+        # Binding the key stops a valid entry from being replayed under another key.
+        return hmac.new(self._secret, key.encode("ascii") + b"\0" + payload, hashlib.sha256).digest()
+
+    def get(self, key: str) -> Optional[Any]:
+        if key in self._memory:
+            self._memory.move_to_end(key)
+            return self._memory[key]
+        if not self.use_disk:
+            return None
+
+        path = self._path(key)
+        try:
+            with path.open("rb") as handle:
+                data = handle.read()
+        except OSError:
+            return None
+        try:
+            mac, payload = data[:_MAC_SIZE], data[_MAC_SIZE:]
+            if not hmac.compare_digest(mac, self._mac(key, payload)):
+                raise ValueError("Cache entry is not authenticated")
+            value = pickle.loads(payload)
+        except Exception:
+            # Foreign, truncated or incompatible entry: drop it and recompile.
+            try:
+                path.unlink()
+            except OSError:
+                pass
+            return None
+
+        self._remember(key, value)
+        return value
+
+    def put(self, key: str, value: Any, persist: bool = True) -> None:
+        self._remember(key, value)
+        if not self.use_disk or not persist:
+            return
+
+        path = self._path(key)
+        try:
+            payload = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+            path.parent.mkdir(parents=True, exist_ok=True)
+        except (OSError, pickle.PicklingError, RecursionError):
+            # Caching is an optimisation; an unwritable directory or an AST too
+            # deep to pickle must not fail the compile.
+            return
+
+        # Write to a temporary sibling and rename so concurrent readers never
+        # observe a partially written entry.
+        fd, tmp_name = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as handle:
+                handle.write(self._mac(key, payload))
+                handle.write(payload)
+            os.replace(tmp_name, path)
+        except OSError:
+            try:
+                os.unlink(tmp_name)
+            except OSError:
+                pass
+
+    def _remember(self, key: str, value: Any) -> None:
+        self._memory[key] = value
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    def clear_memory(self) -> None:
+        self._memory.clear()
+
+
+_SHARED_CACHES: Dict[Tuple[Path, bool], CompileCache] = {}
+_SHARED_OPTIONS: Dict[str, Any] = {}
+
+
+def configure_shared_caches(**options: Any) -> None:
+    """Set ``CompileCache`` options for caches handed out by ``shared_cache`` from now on."""
+    _SHARED_OPTIONS.clear()
+    _SHARED_OPTIONS.update(options)
+    _SHARED_CACHES.clear()
+
+
+def shared_cache(directory: Optional[Union[str, Path]] = None, use_disk: bool = True) -> CompileCache:
+    """Return the process-wide cache for ``directory``, so its memory tier outlives one call."""
+    if directory is None:
+        directory = os.environ.get(CACHE_DIR_ENV) or default_cache_dir()
+    key = (Path(directory).resolve(), use_disk)
+    cache = _SHARED_CACHES.get(key)
+    if cache is None:
+        cache = _SHARED_CACHES[key] = CompileCache(key[0], use_disk=use_disk, **_SHARED_OPTIONS)
+    return cache
@@ -0,0 +1,136 @@
+"""Compile pipeline shared by the CLI entry points: source -> Runtime -> Temporal IR"""
+
+from __future__ import annotations
+
+import io
+import os
+from pathlib import Path
+from typing import Any, BinaryIO, Callable, List, Optional, TextIO, Tuple, Union
+
+from .compile_cache import CompileCache
+from .interpreter import Interpreter
+from .ir_export import IRReuseCache, write_temporal_ir, write_temporal_ir_binary
+from .lexer import Lexer
+from .parser import Parser, StreamingParser
+from .runtime import Runtime
+
+# Mirrored in ``__main__`` so the CLI can build its parser without importing this module.
+IR_FORMATS = ("json", "binary")
+
+
+def build_runtime(source: str, keep_tokens: bool = False) -> Tuple[Runtime, Optional[List[Any]], Any]:
+    lexer = Lexer(source)
+    if keep_tokens:
+        tokens: Optional[List[Any]] = lexer.tokenize()
+        parser_obj = Parser(tokens)
+    else:
+        tokens = None
+        parser_obj = StreamingParser(lexer.iter_tokens())
+    ast = parser_obj.parse()
+    runtime = Runtime()
+    interpreter = Interpreter(runtime)
+    interpreter.execute(ast)
+    return runtime, tokens, ast
+
+
+def load_runtime(source: str, cache: Optional[CompileCache]) -> Tuple[Runtime, Any]:
+    """Return ``(runtime, ast)`` for ``source``, reusing a cached result when possible.
+
+    Cached objects may be shared with other callers and must not be mutated.
+    """
+    if cache is None:
+        runtime, _, ast = build_runtime(source)
+        return runtime, ast
+
+    key = cache.key(source, "runtime")
+    cached = cache.get(key)
+    if cached is not None:
+        return cached
+
+    runtime, _, ast = build_runtime(source)
+    cache.put(key, (runtime, ast))
+    return runtime, ast
+
+
+def write_ir(runtime: Runtime, fp: TextIO, compact: bool = False, reuse: Optional[IRReuseCache] = None) -> None:
+    """Stream the Temporal IR JSON for ``runtime`` to ``fp``, followed by a newline."""
+    write_temporal_ir(runtime, fp, indent=None if compact else 2, reuse=reuse)
+    fp.write("\n")
+
+
+def _ir_writer(
+    runtime: Runtime, ir_format: str, compact: bool, reuse: Optional[IRReuseCache] = None
+) -> Callable[[BinaryIO], None]:
+    if ir_format not in IR_FORMATS:
+        raise ValueError(f"Unknown IR format '{ir_format}'")
+
+    def write(handle: BinaryIO) -> None:
+        if ir_format == "binary":
+            write_temporal_ir_binary(runtime, handle, reuse)
+            return
+        text = io.TextIOWrapper(handle, encoding="utf-8")
+        write_ir(runtime, text, compact=compact, reuse=reuse)
+        text.flush()
+        text.detach()
+
+    return write
+
+
+def _replace_atomically(path: Union[str, Path], write: Callable[[BinaryIO], None]) -> None:
+    """Run ``write`` against a temporary sibling of ``path`` and rename it into place."""
+    target = Path(path)
+    target.parent.mkdir(parents=True, exist_ok=True)
+    # A plain open (rather than mkstemp) keeps the usual umask-based permissions.
+    tmp_name = target.with_name(f".{target.name}.{os.getpid()}.tmp")
+    try:
+        with open(tmp_name, "wb") as handle:
+            write(handle)
+        os.replace(tmp_name, target)
+    except BaseException:
+        try:
+            os.unlink(tmp_name)
+        except OSError:
+            pass
+        raise
+
+
+def write_ir_file(
+    runtime: Runtime,
+    path: Union[str, Path],
+    compact: bool = False,
+    ir_format: str = "json",
+    reuse: Optional[IRReuseCache] = None,
+) -> None:
+    """Stream the IR into ``path`` via a temporary sibling so a failed compile leaves no partial file.
+
+    ``ir_format`` is ``"json"`` or ``"binary"``; ``compact`` only affects JSON.
+    ``reuse`` carries serialized experiments over from the previous build.
+    """
+    _replace_atomically(path, _ir_writer(runtime, ir_format, compact, reuse))
+
+
+def write_bytes_file(path: Union[str, Path], data: bytes) -> None:
+    """Atomically replace ``path`` with already-encoded IR."""
+    _replace_atomically(path, lambda handle: handle.write(data))
+
+
+def encode_ir(runtime: Runtime, ir_format: str = "json", compact: bool = False) -> bytes:
+    """Return the IR exactly as ``write_ir_file`` would write it."""
+    buffer = io.BytesIO()
+    _ir_writer(runtime, ir_format, compact)(buffer)
+    return buffer.getvalue()
+
+
+def load_ir_bytes(source: str, cache: CompileCache, ir_format: str = "json", compact: bool = False) -> bytes:
+    """Return encoded IR for ``source``, kept in the memory tier of ``cache`` between calls.
+
+    Encoded IR is never written to the disk tier; a miss falls back to the
+    cached Runtime and re-encodes it.
+    """
+    key = cache.key(source, f"ir:{ir_format}:{'compact' if compact else 'indented'}")
+    data = cache.get(key)
+    if data is None:
+        runtime, _ = load_runtime(source, cache)
+        data = encode_ir(runtime, ir_format, compact)
+        cache.put(key, data, persist=False)
+    return data
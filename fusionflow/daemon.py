@@ -0,0 +1,270 @@
+"""``fusionflow serve``: a compile daemon on a Unix socket, and the client that forwards to it.
+
+Protocol: the client sends one JSON line ``{"version", "argv", "cwd", "env"}``.
+The daemon runs the CLI in-process with that working directory and replies
+with one JSON line ``{"exit_code", "stdout", "stderr"}`` (byte counts) followed
+by the raw stdout and stderr bytes. Requests are handled one at a time because
+the CLI writes to the process-wide ``sys.stdout``.
+"""
+
+from __future__ import annotations
+
+import io
+import json
+import os
+import socket
+import socketserver
+import stat
+import sys
+import tempfile
+from contextlib import contextmanager, redirect_stderr, redirect_stdout
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, Optional, Sequence, Union
+
+from . import __version__
+from .compile_cache import CACHE_DIR_ENV, configure_shared_caches, private_directory
+
+SOCKET_ENV = "FUSIONFLOW_SOCKET"
+DISABLE_ENV = "FUSIONFLOW_NO_DAEMON"
+
+# Environment variables the client's value should win for while a request runs.
+FORWARDED_ENV = (CACHE_DIR_ENV,)
+
+CONNECT_TIMEOUT = 0.2
+# How long the client waits on any single read or write before giving up on
+# the daemon and running the command itself.
+REQUEST_TIMEOUT = 60.0
+
+
+def _fallback_dir() -> Path:
+    return Path(tempfile.gettempdir()) / f"fusionflow-{os.getuid()}"
+
+
+def default_socket_path() -> Path:
+    explicit = os.environ.get(SOCKET_ENV)
+    if explicit:
+        return Path(explicit)
+    runtime_dir = os.environ.get("XDG_RUNTIME_DIR")
+    if runtime_dir:
+        return Path(runtime_dir) / "fusionflow.sock"
+    # Anyone can create this name in /tmp first; the daemon and the client
+    # check it is a private directory of ours before using it.
+    return _fallback_dir() / "daemon.sock"
+
+
+def _check_socket_dir(path: Path) -> None:
+    """Create the socket's directory, insisting on a private one under the shared temp dir."""
+    if path.parent == _fallback_dir():
+        private_directory(path.parent)
+    else:
+        path.parent.mkdir(mode=0o700, parents=True, exist_ok=True)
+
+
+def _trusted_socket(path: Path) -> bool:
+    """Whether ``path`` is a socket owned by this user, in a directory only this user controls."""
+    try:
+        info = os.lstat(path)
+        if path.parent == _fallback_dir():
+            private_directory(path.parent)
+    except OSError:
+        return False
+    return stat.S_ISSOCK(info.st_mode) and info.st_uid == os.getuid()
+
+
+def _read_line(stream: Any) -> Dict[str, Any]:
+    line = stream.readline()
+    if not line:
+        raise ConnectionError("Connection closed before a message was received")
+    return json.loads(line)
+
+
+@contextmanager
+def _request_context(cwd: str, env: Dict[str, Optional[str]]) -> Iterator[None]:
+    previous_cwd = os.getcwd()
+    previous_env = {name: os.environ.get(name) for name in FORWARDED_ENV}
+    try:
+        os.chdir(cwd)
+        for name in FORWARDED_ENV:
+            _set_env(name, env.get(name))
+        yield
+    finally:
+        os.chdir(previous_cwd)
+        for name, value in previous_env.items():
+            _set_env(name, value)
+
+
+def _set_env(name: str, value: Optional[str]) -> None:
+    if value is None:
+        os.environ.pop(name, None)
+    else:
+        os.environ[name] = value
+
+
+class _RequestHandler(socketserver.StreamRequestHandler):
+    server: "CompileDaemon"
+
+    def handle(self) -> None:
+        try:
+            request = _read_line(self.rfile)
+        except (ConnectionError, ValueError):
+            return
+        if request.get("version") != __version__:
+            exit_code, stdout, stderr = None, b"", b""
+        else:
+            exit_code, stdout, stderr = self.server.run(request)
+        header = {"exit_code": exit_code, "stdout": len(stdout), "stderr": len(stderr)}
+        try:
+            self.wfile.write(json.dumps(header).encode("utf-8") + b"\n" + stdout + stderr)
+        except (BrokenPipeError, ConnectionResetError):
+            # The client gave up (e.g. was interrupted); nothing to report to.
+            pass
+
+
+class CompileDaemon(socketserver.UnixStreamServer):
+    """Serve CLI requests from one long-lived process so caches stay warm.
+
+    ``dispatch`` is the in-process CLI entry point (``argv -> exit code``).
+    Compile caches created through ``shared_cache`` live as long as the
+    daemon and also keep encoded IR in memory.
+    """
+
+    def __init__(self, socket_path: Union[str, Path], dispatch: Callable[[Sequence[str]], int], max_entries: int = 256):
+        self.socket_path = Path(socket_path)
+        self.dispatch = dispatch
+        self.requests = 0
+        _check_socket_dir(self.socket_path)
+        self._remove_stale_socket()
+        configure_shared_caches(keep_ir=True, max_entries=max_entries)
+        super().__init__(str(self.socket_path), _RequestHandler)
+        os.chmod(self.socket_path, stat.S_IRUSR | stat.S_IWUSR)
+
+    def _remove_stale_socket(self) -> None:
+        try:
+            info = os.lstat(self.socket_path)
+        except FileNotFoundError:
+            return
+        if not stat.S_ISSOCK(info.st_mode) or info.st_uid != os.getuid():
+            raise PermissionError(f"'{self.socket_path}' is not a socket owned by this user")
+        probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            probe.connect(str(self.socket_path))
+        except OSError:
+            self.socket_path.unlink()
+        else:
+            raise OSError(f"A FusionFlow daemon is already listening on {self.socket_path}")
+        finally:
+            probe.close()
+
+    def run(self, request: Dict[str, Any]):
+        stdout = io.TextIOWrapper(io.BytesIO(), encoding="utf-8", write_through=True)
+        stderr = io.TextIOWrapper(io.BytesIO(), encoding="utf-8", write_through=True)
+        self.requests += 1
+        try:
+            with _request_context(request["cwd"], request.get("env", {})):
+                with redirect_stdout(stdout), redirect_stderr(stderr):
+                    exit_code = self.dispatch(list(request["argv"]))
+        except SystemExit as exc:
+            # argparse reports usage errors (and --help) by exiting.
+            exit_code = exc.code if isinstance(exc.code, int) else (0 if exc.code is None else 1)
+        except Exception as exc:
+            stderr.write(f"Error: {exc}\n")
+            exit_code = 1
+        stdout.flush()
+        stderr.flush()
+        return exit_code, stdout.buffer.getvalue(), stderr.buffer.getvalue()
+
+    def server_close(self) -> None:
+        super().server_close()
+        configure_shared_caches()
+        try:
+            self.socket_path.unlink()
+        except OSError:
+            pass
+
+
+def forward(argv: Sequence[str], socket_path: Optional[Union[str, Path]] = None) -> Optional[int]:
+    """Run ``argv`` on a running daemon and replay its output here.
+
+    Returns the exit code, or ``None`` when no compatible daemon took the
+    request (no socket of ours, nothing listening, or a different FusionFlow
+    version), in which case the caller should run the command in-process.
+    Once the daemon has the request it may be running it, so a reply that
+    does not arrive within ``REQUEST_TIMEOUT`` seconds, or arrives broken,
+    is reported as an error instead of running the command a second time.
+    """
+    if os.environ.get(DISABLE_ENV) or not hasattr(socket, "AF_UNIX"):
+        return None
+    path = Path(socket_path) if socket_path else default_socket_path()
+    if not _trusted_socket(path):
+        return None
+    client = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        client.settimeout(CONNECT_TIMEOUT)
+        try:
+            client.connect(str(path))
+        except OSError:
+            return None
+        client.settimeout(REQUEST_TIMEOUT)
+
+        request = {
+            "version": __version__,
+            "argv": list(argv),
+            "cwd": os.getcwd(),
+            "env": {name: os.environ.get(name) for name in FORWARDED_ENV},
+        }
+        with client.makefile("rwb") as stream:
+            try:
+                stream.write(json.dumps(request).encode("utf-8") + b"\n")
+                stream.flush()
+            except OSError:
+                # The request line never arrived whole, so the daemon cannot have run it.
+                return None
+            try:
+                header = _read_line(stream)
+                if "exit_code" in header and header["exit_code"] is None:
+                    # Refused on version mismatch without running anything.
+                    return None
+                stdout = stream.read(header["stdout"])
+                stderr = stream.read(header["stderr"])
+                if (
+                    not isinstance(header.get("exit_code"), int)
+                    or len(stdout) != header["stdout"]
+                    or len(stderr) != header["stderr"]
+                ):
+                    raise ValueError("incomplete reply")
+            except socket.timeout:
+                return _daemon_error(
+                    path, f"no reply within {REQUEST_TIMEOUT:g} s; the command may still be running there"
+                )
+            except (OSError, ValueError, KeyError, TypeError) as exc:
+                return _daemon_error(path, f"broken reply ({exc})")
+    finally:
+        client.close()
+
+    _replay(stdout, _stream_buffer("stdout"))
+    _replay(stderr, _stream_buffer("stderr"))
+    return header["exit_code"]
+
+
+def _daemon_error(path: Path, problem: str) -> int:
+    print(
+        f"Error: FusionFlow daemon at {path}: {problem}. Set {DISABLE_ENV}=1 to compile in-process.",
+        file=sys.stderr,
+    )
+    return 1
+
+
+def _stream_buffer(name: str) -> Any:
+    stream = getattr(sys, name)
+    stream.flush()
+    return getattr(stream, "buffer", None) or stream
+
+
+def _replay(data: bytes, target: Any) -> None:
+    if not data:
+        return
+    if isinstance(target, io.TextIOBase):
+        target.write(data.decode("utf-8", errors="replace"))
+    else:
+        target.write(data)
+    target.flush()
@@ -0,0 +1,233 @@
+"""Incremental recompilation for ``fusionflow watch``: re-parse only the top-level blocks an edit touched."""
+
+from __future__ import annotations
+
+import hashlib
+import os
+import time
+from pathlib import Path
+from typing import Any, List, Optional, Tuple, Union
+
+from .ast_nodes import Program
+from .compiler import write_ir_file
+from .interpreter import Interpreter
+from .ir_export import IRReuseCache
+from .lexer import Lexer
+from .parser import Parser
+from .runtime import Runtime
+from .tokens import TokenType
+
+_EOF_CODE = TokenType.EOF.value
+_STRING_CODE = TokenType.STRING.value
+
+_SCAN_CHUNK = 1 << 16
+
+
+class _Block:
+    """One top-level statement and the ``[start, end)`` source span of its tokens."""
+
+    __slots__ = ("start", "end", "statement")
+
+    def __init__(self, start: int, end: int, statement: Any):
+        self.start = start
+        self.end = end
+        self.statement = statement
+
+
+class IncrementalCompiler:
+    """Compile successive versions of one spec, re-parsing only the blocks that changed.
+
+    Every top-level ``dataset``/``pipeline``/``model``/``experiment``/
+    ``timeline``/``merge`` statement remembers the span it was parsed from.
+    After an edit, the blocks overlapping or touching the changed text are
+    lexed and parsed again in a window between two untouched blocks; every
+    other block keeps its AST node. A window that does not end cleanly (an
+    unterminated string, or a syntax error) falls back to a full parse, so
+    results and error messages always match a from-scratch compile.
+
+    The registry is rebuilt by executing the (mostly reused) statements in
+    order; ``ir_cache`` then lets the IR writer skip re-serializing the
+    experiments whose nodes were reused.
+    """
+
+    def __init__(self):
+        self.source: Optional[str] = None
+        self.blocks: List[_Block] = []
+        self.ir_cache = IRReuseCache()
+        # Blocks parsed by the most recent ``update``.
+        self.reparsed = 0
+
+    def update(self, source: str) -> Program:
+        """Parse ``source`` against the previous version and return its ``Program``.
+
+        Raises ``SyntaxError`` and leaves the previous version in place when
+        ``source`` does not parse.
+        """
+        if self.source is None:
+            blocks = _parse_window(source, 0, len(source))
+            reparsed = len(blocks)
+        else:
+            blocks, reparsed = self._reparse(source)
+        self.source = source
+        self.blocks = blocks
+        self.reparsed = reparsed
+        return Program([block.statement for block in blocks])
+
+    def build(self, source: str) -> Runtime:
+        """Return a fresh ``Runtime`` for ``source``, reusing unchanged statements."""
+        program = self.update(source)
+        runtime = Runtime()
+        Interpreter(runtime).execute(program)
+        return runtime
+
+    def _reparse(self, source: str) -> Tuple[List[_Block], int]:
+        old = self.source
+        blocks = self.blocks
+        if source == old:
+            return blocks, 0
+
+        prefix = _common_prefix(old, source)
+        suffix = _common_suffix(old, source, prefix)
+        changed_end = len(old) - suffix
+        delta = len(source) - len(old)
+
+        # Blocks ending at or after the first changed character, up to those
+        # starting at or before the last one, are affected; touching counts
+        # because an edit next to a token can extend it.
+        first = 0
+        while first < len(blocks) and blocks[first].end < prefix:
+            first += 1
+        last = first
+        while last < len(blocks) and blocks[last].start <= changed_end:
+            last += 1
+        # The window must end where a fresh line starts a block, so no comment
+        # or string opened by the edit can run on into the untouched text.
+        while last < len(blocks) and source[blocks[last].start + delta - 1] != "\n":
+            last += 1
+
+        window_start = blocks[first - 1].end if first else 0
+        window_end = blocks[last].start + delta if last < len(blocks) else len(source)
+        try:
+            window = _parse_window(source, window_start, window_end)
+        except SyntaxError:
+            window = None
+        if window is None:
+            fresh = _parse_window(source, 0, len(source))
+            return fresh, len(fresh)
+
+        tail = [_Block(block.start + delta, block.end + delta, block.statement) for block in blocks[last:]]
+        return blocks[:first] + window + tail, len(window)
+
+
+class SpecWatcher:
+    """Poll one spec file and rewrite its IR whenever the content changes.
+
+    A poll costs one ``stat``; the file is only read when its mtime or size
+    moved, and only rebuilt when its content hash differs from the last
+    build (so touching or re-saving unchanged text is free). A failed build
+    leaves the previous output in place.
+    """
+
+    def __init__(
+        self, path: Union[str, Path], out_path: Union[str, Path], compact: bool = False, ir_format: str = "json"
+    ):
+        self.path = Path(path)
+        self.out_path = Path(out_path)
+        self.compact = compact
+        self.ir_format = ir_format
+        self.compiler = IncrementalCompiler()
+        self._stamp: Optional[Tuple[int, int]] = None
+        self._digest: Optional[bytes] = None
+
+    def poll(self) -> Optional[Tuple[bool, str]]:
+        """Rebuild if the spec changed; return ``(ok, message)``, or ``None`` if nothing changed."""
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            if self._stamp == (-1, -1):
+                return None
+            self._stamp = (-1, -1)
+            return False, f"Error: File '{self.path}' not found"
+        stamp = (stat.st_mtime_ns, stat.st_size)
+        if stamp == self._stamp:
+            return None
+        self._stamp = stamp
+
+        data = self.path.read_bytes()
+        digest = hashlib.blake2b(data, digest_size=16).digest()
+        if digest == self._digest:
+            return None
+        self._digest = digest
+
+        started = time.perf_counter()
+        try:
+            runtime = self.compiler.build(data.decode("utf-8"))
+            write_ir_file(
+                runtime, self.out_path, compact=self.compact, ir_format=self.ir_format, reuse=self.compiler.ir_cache
+            )
+        except SyntaxError as exc:
+            return False, f"Syntax Error: {exc}"
+        except (ValueError, UnicodeDecodeError) as exc:
+            return False, f"Error: {exc}"
+        elapsed = (time.perf_counter() - started) * 1000
+        blocks = len(self.compiler.blocks)
+        return True, (
+            f"Rebuilt {self.out_path} in {elapsed:.0f} ms "
+            f"({self.compiler.reparsed} of {blocks} blocks re-parsed)"
+        )
+
+
+def _parse_window(source: str, start: int, end: int) -> Optional[List[_Block]]:
+    """Parse the top-level statements in ``source[start:end]``.
+
+    Returns ``None`` when the window ends inside a string literal, which only
+    a parse of the rest of the source can settle.
+    """
+    buffer = Lexer(source, start, end).tokenize_compact()
+    count = len(buffer) - 1
+    if end < len(source) and count and buffer.types[count - 1] == _STRING_CODE and buffer.ends[count - 1] == end:
+        return None
+
+    parser = Parser(buffer)
+    starts, ends = buffer.starts, buffer.ends
+    blocks: List[_Block] = []
+    parser.skip_newlines()
+    while parser.current_type() != _EOF_CODE:
+        first = parser.pos
+        statement = parser.parse_statement()
+        if statement is not None:
+            blocks.append(_Block(starts[first], ends[parser.pos - 1], statement))
+        parser.skip_newlines()
+    return blocks
+
+
+def _common_prefix(old: str, new: str) -> int:
+    limit = min(len(old), len(new))
+    pos, step = 0, _SCAN_CHUNK
+    # Compare whole chunks (a C-level memcmp each), halving the chunk on a
+    # mismatch until it pins down the first differing character.
+    while pos < limit:
+        size = min(step, limit - pos)
+        if old[pos:pos + size] == new[pos:pos + size]:
+            pos += size
+        elif size == 1:
+            break
+        else:
+            step = size // 2
+    return pos
+
+
+def _common_suffix(old: str, new: str, prefix: int) -> int:
+    # The suffix may not overlap the prefix in either string.
+    limit = min(len(old), len(new)) - prefix
+    old_end, new_end = len(old), len(new)
+    matched, step = 0, _SCAN_CHUNK
+    while matched < limit:
+        size = min(step, limit - matched)
+        if old[old_end - matched - size:old_end - matched] == new[new_end - matched - size:new_end - matched]:
+            matched += size
+        elif size == 1:
+            break
+        else:
+            step = size // 2
+    return matched
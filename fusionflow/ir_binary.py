@@ -0,0 +1,397 @@
+"""Compact binary encoding of the Temporal IR.
+
+Layout (all integers little-endian)::
+
+    header   "FFIR" u16 version u16 reserved
+    body     one u32 run per section; each entry is a shape id followed by
+             one value id per leaf of that shape
+    table    u32 count, u8[count] kinds, u32[count] text lengths (code points),
+             u64 size, UTF-8 text blob
+    index    u32 sections; per section: u32 name id, u8 kind, u8 nested,
+             u32 entries, u64 span offset, u64 span length (u32 words),
+             u32[entries] key ids (objects only),
+             u64[entries] entry positions (words into the span)
+    footer   u64 table offset, u64 index offset, "FFIR"
+
+The table holds every distinct leaf value once (names, metrics, rendered
+expressions, numbers) together with the distinct entry shapes. A shape is
+the entry with each leaf replaced by ``0``, stored as JSON; the reader
+turns it into nested builder closures once, so decoding an entry never
+walks tagged bytes. Shapes are only ever interpreted, never executed.
+
+Collections whose size grows with the spec (a timeline's experiments) are
+handed to the writer as :class:`Subsection` values. They are written as
+nested sections of their own and referenced from the parent entry by a
+``1`` leaf in its shape, which keeps shapes small and lets a reader decode
+one timeline without its siblings.
+"""
+
+from __future__ import annotations
+
+import json
+import struct
+import sys
+from array import array
+from itertools import accumulate
+from typing import Any, BinaryIO, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+MAGIC = b"FFIR"
+FORMAT_VERSION = 1
+
+_HEADER = struct.Struct("<4sHH")
+_FOOTER = struct.Struct("<QQ4s")
+_SECTION = struct.Struct("<IBBIQQ")
+_COUNT = struct.Struct("<I")
+_SIZE = struct.Struct("<Q")
+
+KIND_OBJECT = 0
+KIND_ARRAY = 1
+KIND_VALUE = 2
+
+_STR = 0
+_INT = 1
+_FLOAT = 2
+_NULL = 3
+_TRUE = 4
+_FALSE = 5
+_SHAPE = 6
+_SECTION_REF = 7
+
+# Builders are generated as nested literals; keep them far below the
+# interpreter's parenthesis nesting limit.
+MAX_DEPTH = 64
+
+_SWAP = sys.byteorder != "little"
+
+Builder = Callable[[List[Any], List[int], int, Callable[[str], Any]], Any]
+
+
+def is_binary_ir(prefix: bytes) -> bool:
+    return prefix[: len(MAGIC)] == MAGIC
+
+
+def _le_bytes(typecode: str, values: Iterable[int]) -> bytes:
+    packed = array(typecode, values)
+    if _SWAP:
+        packed.byteswap()
+    return packed.tobytes()
+
+
+def _read_array(typecode: str, data: bytes, offset: int, count: int) -> Tuple[List[int], int]:
+    packed = array(typecode)
+    end = offset + count * packed.itemsize
+    packed.frombytes(data[offset:end])
+    if _SWAP:
+        packed.byteswap()
+    return packed.tolist(), end
+
+
+def _leaf_entry(value: Any) -> Tuple[int, str]:
+    if isinstance(value, str):
+        return _STR, value
+    if value is None:
+        return _NULL, ""
+    if value is True:
+        return _TRUE, ""
+    if value is False:
+        return _FALSE, ""
+    if isinstance(value, int):
+        return _INT, str(value)
+    if isinstance(value, float):
+        return _FLOAT, repr(value)
+    raise TypeError(f"Object of type {type(value).__name__} is not IR serializable")
+
+
+class Subsection:
+    """A collection written as its own nested section of ``(key, value)`` entries."""
+
+    __slots__ = ("kind", "entries")
+
+    def __init__(self, kind: int, entries: Iterable[Tuple[Optional[str], Any]]):
+        self.kind = kind
+        self.entries = entries
+
+
+class Record:
+    """An object entry whose ``(key, value)`` items are produced on demand.
+
+    Items are pulled one at a time, after everything before them (including
+    subsections) has been written, so later items may depend on earlier ones.
+    """
+
+    __slots__ = ("items",)
+
+    def __init__(self, items: Iterable[Tuple[str, Any]]):
+        self.items = items
+
+
+class BinaryIRWriter:
+    """Stream sections of ``(key, value)`` entries to ``fp`` in the binary IR layout."""
+
+    def __init__(self, fp: BinaryIO):
+        self._fp = fp
+        self._table: Dict[Tuple[int, str], int] = {}
+        self._sections: List[Tuple[int, int, bool, List[int], List[int], int, int]] = []
+        self._offset = 0
+        self._emit(_HEADER.pack(MAGIC, FORMAT_VERSION, 0))
+
+    def _emit(self, data: bytes) -> None:
+        self._fp.write(data)
+        self._offset += len(data)
+
+    def _table_id(self, kind: int, text: str) -> int:
+        key = (kind, text)
+        index = self._table.get(key)
+        if index is None:
+            index = self._table[key] = len(self._table)
+        return index
+
+    def _shape(self, value: Any, leaves: List[int], path: str, depth: int) -> Any:
+        if depth > MAX_DEPTH:
+            raise ValueError(f"IR value nested deeper than {MAX_DEPTH} levels")
+        if isinstance(value, (dict, Record)):
+            items = value.items() if isinstance(value, dict) else value.items
+            return {key: self._shape(item, leaves, f"{path}/{key}", depth + 1) for key, item in items}
+        if isinstance(value, (list, tuple)):
+            return [self._shape(item, leaves, f"{path}/{index}", depth + 1) for index, item in enumerate(value)]
+        if isinstance(value, Subsection):
+            self._write_section(path, value.kind, value.entries, nested=True)
+            leaves.append(self._table_id(_SECTION_REF, path))
+            return 1
+        leaves.append(self._table_id(*_leaf_entry(value)))
+        return 0
+
+    def write_section(self, name: str, kind: int, entries: Iterable[Tuple[Optional[str], Any]]) -> None:
+        self._write_section(name, kind, entries, nested=False)
+
+    def write_value(self, name: str, value: Any) -> None:
+        """Write a top-level entry that is a single value rather than a collection."""
+        self._write_section(name, KIND_VALUE, [(None, value)], nested=False)
+
+    def _write_section(
+        self, name: str, kind: int, entries: Iterable[Tuple[Optional[str], Any]], nested: bool
+    ) -> None:
+        name_id = self._table_id(_STR, name)
+        if any(section[0] == name_id for section in self._sections):
+            raise ValueError(f"Duplicate IR section '{name}'")
+        keys: List[int] = []
+        positions: List[int] = []
+        start = self._offset
+        for position, (key, value) in enumerate(entries):
+            if kind == KIND_OBJECT:
+                keys.append(self._table_id(_STR, key))
+            leaves: List[int] = []
+            # Subsections are written while the shape is taken, so this
+            # entry's own words come after them in the span.
+            shape = self._shape(value, leaves, f"{name}/{key if kind == KIND_OBJECT else position}", 0)
+            positions.append((self._offset - start) // 4)
+            ids = [self._table_id(_SHAPE, json.dumps(shape, separators=(",", ":")))]
+            ids.extend(leaves)
+            self._emit(_le_bytes("I", ids))
+        words = (self._offset - start) // 4
+        self._sections.append((name_id, kind, nested, keys, positions, start, words))
+
+    def close(self) -> None:
+        """Write the value table, section index and footer."""
+        table_offset = self._offset
+        blob = "".join(text for _, text in self._table).encode("utf-8")
+        self._emit(_COUNT.pack(len(self._table)))
+        self._emit(bytes(kind for kind, _ in self._table))
+        self._emit(_le_bytes("I", (len(text) for _, text in self._table)))
+        self._emit(_SIZE.pack(len(blob)))
+        self._emit(blob)
+
+        index_offset = self._offset
+        self._emit(_COUNT.pack(len(self._sections)))
+        for name, kind, nested, keys, positions, start, words in self._sections:
+            self._emit(_SECTION.pack(name, kind, nested, len(positions), start, words))
+            if kind == KIND_OBJECT:
+                self._emit(_le_bytes("I", keys))
+            self._emit(_le_bytes("Q", positions))
+        self._emit(_FOOTER.pack(table_offset, index_offset, MAGIC))
+
+
+def _builder(shape: Any, counter: List[int], depth: int) -> Optional[Builder]:
+    """Builder for a container shape, or ``None`` for a plain leaf (read inline by its parent)."""
+    if depth > MAX_DEPTH:
+        raise ValueError(f"Corrupt binary Temporal IR: shape nested deeper than {MAX_DEPTH} levels")
+    if isinstance(shape, (dict, list)):
+        keys = list(shape) if isinstance(shape, dict) else None
+        if keys is not None and not all(isinstance(key, str) for key in keys):
+            raise ValueError("Corrupt binary Temporal IR: malformed shape")
+        first = counter[0]
+        slots = []
+        for item in shape.values() if keys is not None else shape:
+            offset = counter[0]
+            slots.append((offset, _builder(item, counter, depth + 1)))
+        if all(build is None for _, build in slots):
+            # Plain leaves are contiguous, so the entry is one slice of ids.
+            last = counter[0]
+            if keys is None:
+                return lambda v, i, p, r: [v[x] for x in i[p + first : p + last]]
+            return lambda v, i, p, r: {key: v[x] for key, x in zip(keys, i[p + first : p + last])}
+        if keys is None:
+            return lambda v, i, p, r: [
+                v[i[p + offset]] if build is None else build(v, i, p, r) for offset, build in slots
+            ]
+        items = [(key, offset, build) for key, (offset, build) in zip(keys, slots)]
+        return lambda v, i, p, r: {
+            key: v[i[p + offset]] if build is None else build(v, i, p, r) for key, offset, build in items
+        }
+    if type(shape) is not int or shape not in (0, 1):
+        raise ValueError("Corrupt binary Temporal IR: malformed shape")
+    offset = counter[0]
+    counter[0] += 1
+    if shape == 1:
+        return lambda v, i, p, r: r(v[i[p + offset]])
+    return None
+
+
+def _compile_shape(text: str) -> Tuple[Builder, int]:
+    """Return ``(builder, leaf_count)``; ``builder(values, ids, pos, resolve)`` rebuilds one entry.
+
+    Raises ``ValueError`` for a shape that is not JSON made of objects,
+    arrays and ``0``/``1`` leaves.
+    """
+    try:
+        shape = json.loads(text)
+    except RecursionError:
+        raise ValueError(f"Corrupt binary Temporal IR: shape nested deeper than {MAX_DEPTH} levels") from None
+    except ValueError:
+        raise ValueError("Corrupt binary Temporal IR: malformed shape") from None
+    counter = [0]
+    builder = _builder(shape, counter, 0)
+    if builder is None:
+        builder = lambda v, i, p, r: v[i[p]]  # noqa: E731
+    return builder, counter[0]
+
+
+class _Section:
+    __slots__ = ("kind", "nested", "keys", "positions", "offset", "words")
+
+    def __init__(
+        self, kind: int, nested: bool, keys: Optional[List[str]], positions: List[int], offset: int, words: int
+    ):
+        self.kind = kind
+        self.nested = nested
+        self.keys = keys
+        self.positions = positions
+        self.offset = offset
+        self.words = words
+
+
+class BinaryIRReader:
+    """Random access to the sections and entries of a binary IR buffer.
+
+    Only the value table and section index are decoded up front; entries
+    are decoded when asked for. References to nested sections are passed to
+    ``resolve`` (the section name) when given, and decoded in full otherwise.
+    """
+
+    def __init__(self, data: bytes):
+        if len(data) < _HEADER.size + _FOOTER.size or not is_binary_ir(data):
+            raise ValueError("Not a binary Temporal IR file")
+        _, version, _ = _HEADER.unpack_from(data, 0)
+        table_offset, index_offset, trailer = _FOOTER.unpack_from(data, len(data) - _FOOTER.size)
+        if trailer != MAGIC:
+            raise ValueError("Binary Temporal IR file is truncated")
+        if version != FORMAT_VERSION:
+            raise ValueError(f"Unsupported binary Temporal IR version {version}")
+
+        self._data = data
+        self._values: List[Any] = []
+        self._shapes: Dict[int, Tuple[Builder, int]] = {}
+        self._read_table(table_offset)
+        self.sections: Dict[str, _Section] = self._read_index(index_offset)
+
+    def _read_table(self, offset: int) -> None:
+        data = self._data
+        (count,) = _COUNT.unpack_from(data, offset)
+        offset += _COUNT.size
+        kinds = data[offset : offset + count]
+        lengths, offset = _read_array("I", data, offset + count, count)
+        (size,) = _SIZE.unpack_from(data, offset)
+        offset += _SIZE.size
+        text = data[offset : offset + size].decode("utf-8")
+
+        values = self._values
+        for index, (kind, end, length) in enumerate(zip(kinds, accumulate(lengths), lengths)):
+            if kind == _STR:
+                values.append(text[end - length : end])
+            elif kind == _INT:
+                values.append(int(text[end - length : end]))
+            elif kind == _FLOAT:
+                values.append(float(text[end - length : end]))
+            elif kind == _NULL:
+                values.append(None)
+            elif kind == _TRUE:
+                values.append(True)
+            elif kind == _FALSE:
+                values.append(False)
+            elif kind == _SECTION_REF:
+                values.append(text[end - length : end])
+            elif kind == _SHAPE:
+                values.append(None)
+                self._shapes[index] = _compile_shape(text[end - length : end])
+            else:
+                raise ValueError(f"Corrupt binary Temporal IR: unknown value kind {kind}")
+
+    def _read_index(self, offset: int) -> Dict[str, _Section]:
+        data = self._data
+        values = self._values
+        (count,) = _COUNT.unpack_from(data, offset)
+        offset += _COUNT.size
+        sections: Dict[str, _Section] = {}
+        for _ in range(count):
+            name, kind, nested, entries, run_offset, words = _SECTION.unpack_from(data, offset)
+            offset += _SECTION.size
+            keys = None
+            if kind == KIND_OBJECT:
+                key_ids, offset = _read_array("I", data, offset, entries)
+                keys = [values[key] for key in key_ids]
+            positions, offset = _read_array("Q", data, offset, entries)
+            sections[values[name]] = _Section(kind, bool(nested), keys, positions, run_offset, words)
+        return sections
+
+    def _run(self, section: _Section, start: int, stop: int) -> List[int]:
+        return _read_array("I", self._data, section.offset + start * 4, stop - start)[0]
+
+    def top_level(self) -> List[str]:
+        return [name for name, spec in self.sections.items() if not spec.nested]
+
+    def keys(self, section: str) -> List[str]:
+        return list(self.sections[section].keys or ())
+
+    def entry_count(self, section: str) -> int:
+        return len(self.sections[section].positions)
+
+    def entry_at(self, section: str, position: int, resolve: Optional[Callable[[str], Any]] = None) -> Any:
+        spec = self.sections[section]
+        start = spec.positions[position]
+        builder, leaves = self._shapes[self._run(spec, start, start + 1)[0]]
+        ids = self._run(spec, start, start + 1 + leaves)
+        return builder(self._values, ids, 1, resolve or self.section)
+
+    def iter_entries(
+        self, section: str, resolve: Optional[Callable[[str], Any]] = None
+    ) -> Iterator[Tuple[Optional[str], Any]]:
+        spec = self.sections[section]
+        ids = self._run(spec, 0, spec.words)
+        values = self._values
+        shapes = self._shapes
+        resolve = resolve or self.section
+        keys = spec.keys if spec.keys is not None else [None] * len(spec.positions)
+        for key, position in zip(keys, spec.positions):
+            builder, _ = shapes[ids[position]]
+            yield key, builder(values, ids, position + 1, resolve)
+
+    def section(self, section: str, resolve: Optional[Callable[[str], Any]] = None) -> Any:
+        kind = self.sections[section].kind
+        if kind == KIND_VALUE:
+            return self.entry_at(section, 0, resolve)
+        if kind == KIND_ARRAY:
+            return [value for _, value in self.iter_entries(section, resolve)]
+        return dict(self.iter_entries(section, resolve))
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {name: self.section(name) for name in self.top_level()}
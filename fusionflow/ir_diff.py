@@ -0,0 +1,195 @@
+"""Semantic diff between two registries, driven by the structural hashes in the IR."""
+
+from __future__ import annotations
+
+import json
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Iterator, List, Optional, Tuple, Union
+
+from .compile_cache import CompileCache
+from .ir_binary import BinaryIRReader, is_binary_ir
+from .ir_loader import _BinarySource, _JSONSource
+
+# Sections keyed by entity name, in IR order; ``experiments`` holds main's.
+_ENTITY_SECTIONS = ("datasets", "pipelines", "models", "experiments")
+
+
+@dataclass
+class Change:
+    """One difference: ``kind`` is ``"added"``, ``"removed"`` or ``"changed"``.
+
+    ``path`` names the entity (``pipelines/churn_features``) and, for
+    changes inside it, the field (``pipelines/churn_features/operations[1].expression``).
+    ``old``/``new`` hold the differing values of a ``"changed"`` field.
+    """
+
+    kind: str
+    path: str
+    old: Any = None
+    new: Any = None
+
+    def __str__(self) -> str:
+        if self.kind == "added":
+            return f"+ {self.path}"
+        if self.kind == "removed":
+            return f"- {self.path}"
+        return f"~ {self.path}: {_show(self.old)} -> {_show(self.new)}"
+
+
+def _show(value: Any) -> str:
+    return "(none)" if value is None else json.dumps(value, sort_keys=True)
+
+
+def _field_changes(old: Any, new: Any, path: str, skip: Tuple[str, ...] = ("hash",)) -> Iterator[Change]:
+    """Field-level changes between two payloads of the same entity.
+
+    Objects are compared key by key and lists of objects (pipeline
+    operations, extensions) item by item; other lists and scalars as a whole.
+    """
+    if isinstance(old, dict) and isinstance(new, dict):
+        for key in list(old) + [key for key in new if key not in old]:
+            if key in skip:
+                continue
+            yield from _field_changes(old.get(key), new.get(key), f"{path}.{key}" if path else key, ())
+        return
+    if (
+        isinstance(old, list)
+        and isinstance(new, list)
+        and all(isinstance(item, dict) for item in old + new)
+        and (old or new)
+    ):
+        for index in range(max(len(old), len(new))):
+            item = f"{path}[{index}]"
+            if index >= len(old):
+                yield Change("added", item)
+            elif index >= len(new):
+                yield Change("removed", item)
+            else:
+                yield from _field_changes(old[index], new[index], item, ())
+        return
+    if old != new:
+        yield Change("changed", path, old, new)
+
+
+def _same_hash(before: Any, after: Any) -> bool:
+    # IR written without hashes says nothing about equality; compare it field by field.
+    digest = before.get("hash")
+    return digest is not None and digest == after.get("hash")
+
+
+def _entity_changes(path: str, old: Any, new: Any, skip: Tuple[str, ...] = ("hash",)) -> Iterator[Change]:
+    for change in _field_changes(old, new, "", skip):
+        change.path = f"{path}/{change.path}" if change.path else path
+        yield change
+
+
+def _collection_changes(
+    prefix: str,
+    old: Tuple[List[str], Callable[[str], Any]],
+    new: Tuple[List[str], Callable[[str], Any]],
+    nested: Optional[Callable[[str, Any, Any], Iterator[Change]]] = None,
+) -> Iterator[Change]:
+    """Changes between two keyed collections of hashed entries.
+
+    Entries whose hashes are present and match are skipped without looking inside them, so
+    ``nested`` (which descends into sub-collections) only runs for entries
+    that actually differ.
+    """
+    old_keys, old_entry = old
+    new_keys, new_entry = new
+    new_members = set(new_keys)
+    old_members = set(old_keys)
+    for key in old_keys:
+        path = f"{prefix}/{key}"
+        if key not in new_members:
+            yield Change("removed", path)
+            continue
+        before, after = old_entry(key), new_entry(key)
+        if _same_hash(before, after):
+            continue
+        if nested is None:
+            yield from _entity_changes(path, before, after)
+        else:
+            yield from nested(path, before, after)
+    for key in new_keys:
+        if key not in old_members:
+            yield Change("added", f"{prefix}/{key}")
+
+
+class _Registry:
+    """One side of a diff: IR sections decoded on demand."""
+
+    def __init__(self, source: Union[_JSONSource, _BinarySource]):
+        self.source = source
+
+    def collection(self, ref: Any) -> Tuple[List[str], Callable[[str], Any]]:
+        return self.source.collection(ref)
+
+    def section(self, name: str) -> Tuple[List[str], Callable[[str], Any]]:
+        return self.collection(self.source.top(name))
+
+    def root_hash(self) -> Optional[str]:
+        return self.source.section("hash") or None
+
+    def merges(self) -> List[Any]:
+        return list(self.source.section("merges"))
+
+
+def diff_registries(old: _Registry, new: _Registry) -> List[Change]:
+    """Added, removed and changed entities from ``old`` to ``new``.
+
+    Equal root hashes end the diff immediately. Otherwise datasets,
+    pipelines, models and main's experiments are compared by hash and only
+    differing ones are opened field by field; a timeline whose hash matches
+    is skipped without decoding any of its experiments.
+    """
+    changes: List[Change] = []
+    if old.root_hash() is not None and old.root_hash() == new.root_hash():
+        return changes
+
+    for section in _ENTITY_SECTIONS:
+        changes.extend(_collection_changes(section, old.section(section), new.section(section)))
+
+    def timeline(path: str, before: Any, after: Any) -> Iterator[Change]:
+        yield from _entity_changes(path, before, after, ("hash", "experiments"))
+        yield from _collection_changes(
+            f"{path}/experiments", old.collection(before["experiments"]), new.collection(after["experiments"])
+        )
+
+    changes.extend(_collection_changes("timelines", old.section("timelines"), new.section("timelines"), timeline))
+
+    old_merges, new_merges = old.merges(), new.merges()
+    for index in range(max(len(old_merges), len(new_merges))):
+        path = f"merges[{index}]"
+        if index >= len(old_merges):
+            changes.append(Change("added", path))
+        elif index >= len(new_merges):
+            changes.append(Change("removed", path))
+        elif not _same_hash(old_merges[index], new_merges[index]):
+            changes.extend(_entity_changes(path, old_merges[index], new_merges[index]))
+    return changes
+
+
+def load_registry(path: Union[str, Path], cache: Optional[CompileCache] = None) -> _Registry:
+    """Open a compiled IR file, or compile a ``.ff`` spec to binary IR (through ``cache``)."""
+    from .compiler import encode_ir, load_ir_bytes, load_runtime
+
+    data = Path(path).read_bytes()
+    if is_binary_ir(data):
+        return _Registry(_BinarySource(BinaryIRReader(data)))
+    if data.lstrip()[:1] == b"{":
+        return _Registry(_JSONSource(json.loads(data)))
+    source = data.decode("utf-8")
+    if cache is not None:
+        encoded = load_ir_bytes(source, cache, "binary")
+    else:
+        encoded = encode_ir(load_runtime(source, None)[0], "binary")
+    return _Registry(_BinarySource(BinaryIRReader(encoded)))
+
+
+def diff_files(
+    old_path: Union[str, Path], new_path: Union[str, Path], cache: Optional[CompileCache] = None
+) -> List[Change]:
+    """Diff two specs or IR files (any mix of ``.ff``, JSON and binary IR)."""
+    return diff_registries(load_registry(old_path, cache), load_registry(new_path, cache))
@@ -2,8 +2,10 @@
 
 from __future__ import annotations
 
+import hashlib
 import json
-from typing import Any, Dict, List, Optional
+from pathlib import Path
+from typing import Any, BinaryIO, Callable, Dict, Iterable, Iterator, List, Optional, TextIO, Tuple, Union
 
 from .ast_nodes import (
     BinaryOp,
@@ -24,64 +26,91 @@ from .ast_nodes import (
     TargetStep,
     UnaryOp,
 )
+from .ir_binary import KIND_ARRAY, KIND_OBJECT, BinaryIRReader, BinaryIRWriter, Record, Subsection, is_binary_ir
 from .runtime import Runtime, TimelineSpec
-
-
-_OPERATOR_PRECEDENCE: Dict[str, int] = {
-    "or": 1,
-    "and": 2,
-    "==": 3,
-    "!=": 3,
-    "<": 4,
-    "<=": 4,
-    ">": 4,
-    ">=": 4,
-    "+": 5,
-    "-": 5,
-    "*": 6,
-    "/": 6,
-}
-
-
-def _maybe_parenthesize(child: Expression, parent_op: str) -> str:
-    child_text = _expression_to_string(child)
-    if not isinstance(child, BinaryOp):
-        return child_text
-
-    parent_prec = _OPERATOR_PRECEDENCE.get(parent_op, 0)
-    child_prec = _OPERATOR_PRECEDENCE.get(child.operator, 0)
-    if child_prec < parent_prec:
-        return f"({child_text})"
-    return child_text
-
-
-def _expression_to_string(expr: Expression) -> str:
-    if isinstance(expr, Literal):
-        if isinstance(expr.value, str):
-            return json.dumps(expr.value)
-        return str(expr.value)
-    if isinstance(expr, Identifier):
-        return expr.name
-    if isinstance(expr, MemberAccess):
-        return f"{_expression_to_string(expr.object)}.{expr.member}"
-    if isinstance(expr, UnaryOp):
-        operand = _expression_to_string(expr.operand)
-        if expr.operator == "not":
-            return f"not {operand}"
-        return f"{expr.operator}{operand}"
-    if isinstance(expr, BinaryOp):
-        left = _maybe_parenthesize(expr.left, expr.operator)
-        right = _maybe_parenthesize(expr.right, expr.operator)
-        return f"{left} {expr.operator} {right}"
-
-    raise TypeError(f"Unsupported expression node: {type(expr)}")
+from .tokens import OPERATOR_PRECEDENCE
+
+
+_OPERATOR_PRECEDENCE: Dict[str, int] = OPERATOR_PRECEDENCE
+_UNARY_PRECEDENCE = max(OPERATOR_PRECEDENCE.values()) + 1
+
+
+class ExpressionRenderer:
+    """Render expression trees to IR text without recursion.
+
+    Rendered text is cached per node identity, so subtrees shared between
+    pipelines and extensions are rendered once and spliced in afterwards. The
+    cache holds a reference to each node it keys, which keeps ``id()`` values
+    from being reused while the renderer is alive.
+    """
+
+    def __init__(self):
+        self._cache: Dict[int, Tuple[Expression, str]] = {}
+
+    def render(self, expr: Expression) -> str:
+        cached = self._cache.get(id(expr))
+        if cached is not None:
+            return cached[1]
+
+        parts: List[str] = []
+        # Work items are either nodes still to render or literal text to emit;
+        # they are pushed in reverse so popping yields left-to-right output.
+        stack: List[Any] = [expr]
+        while stack:
+            item = stack.pop()
+            if item.__class__ is str:
+                parts.append(item)
+                continue
+
+            hit = self._cache.get(id(item))
+            if hit is not None:
+                parts.append(hit[1])
+            elif isinstance(item, Literal):
+                value = item.value
+                parts.append(json.dumps(value) if isinstance(value, str) else str(value))
+            elif isinstance(item, Identifier):
+                parts.append(item.name)
+            elif isinstance(item, MemberAccess):
+                stack.append("." + item.member)
+                stack.append(item.object)
+            elif isinstance(item, UnaryOp):
+                # Unary operators bind tighter than any binary one.
+                self._push_operand(stack, item.operand, _UNARY_PRECEDENCE)
+                parts.append("not " if item.operator == "not" else item.operator)
+            elif isinstance(item, BinaryOp):
+                parent_prec = _OPERATOR_PRECEDENCE.get(item.operator, 0)
+                # Operators are left-associative, so a right operand of equal
+                # precedence needs parentheses too: ``a - (b - c)``.
+                self._push_operand(stack, item.right, parent_prec + 1)
+                stack.append(f" {item.operator} ")
+                self._push_operand(stack, item.left, parent_prec)
+            else:
+                raise TypeError(f"Unsupported expression node: {type(item)}")
+
+        text = "".join(parts)
+        self._cache[id(expr)] = (expr, text)
+        return text
+
+    @staticmethod
+    def _push_operand(stack: List[Any], child: Expression, parent_prec: int) -> None:
+        if isinstance(child, BinaryOp) and _OPERATOR_PRECEDENCE.get(child.operator, 0) < parent_prec:
+            stack.append(")")
+            stack.append(child)
+            stack.append("(")
+        else:
+            stack.append(child)
+
+
+def _expression_to_string(expr: Expression, renderer: Optional[ExpressionRenderer] = None) -> str:
+    return (renderer or ExpressionRenderer()).render(expr)
 
 
 def _serialize_schema(schema: List[SchemaField]) -> Dict[str, str]:
     return {field.name: field.type_name for field in schema}
 
 
-def _serialize_steps(steps: List[PipelineStep]) -> List[Dict[str, Any]]:
+def _serialize_steps(steps: List[PipelineStep], renderer: Optional[ExpressionRenderer] = None) -> List[Dict[str, Any]]:
+    renderer = renderer or ExpressionRenderer()
     operations: List[Dict[str, Any]] = []
     for step in steps:
         if isinstance(step, DeriveStep):
@@ -89,7 +118,7 @@ def _serialize_steps(steps: List[PipelineStep]) -> List[Dict[str, Any]]:
                 {
                     "type": "derive",
                     "target": step.variable,
-                    "expression": _expression_to_string(step.expression),
+                    "expression": renderer.render(step.expression),
                 }
             )
         elif isinstance(step, SelectStep):
@@ -111,11 +140,11 @@ def _serialize_dataset(dataset: DatasetDeclaration) -> Dict[str, Any]:
     return payload
 
 
-def _serialize_pipeline(pipeline: PipelineDefinition) -> Dict[str, Any]:
+def _serialize_pipeline(pipeline: PipelineDefinition, renderer: Optional[ExpressionRenderer] = None) -> Dict[str, Any]:
     return {
         "name": pipeline.name,
         "input": f"{pipeline.source.name}:{pipeline.source.version}",
-        "operations": _serialize_steps(pipeline.steps),
+        "operations": _serialize_steps(pipeline.steps, renderer),
     }
 
 
@@ -123,14 +152,16 @@ def _serialize_model(model: ModelDefinition) -> Dict[str, Any]:
     return {"type": model.type_name, "params": dict(model.params)}
 
 
-def _serialize_extension(extension: Optional[PipelineExtension]) -> Optional[List[Dict[str, Any]]]:
+def _serialize_extension(
+    extension: Optional[PipelineExtension], renderer: Optional[ExpressionRenderer] = None
+) -> Optional[List[Dict[str, Any]]]:
     if not extension:
         return None
-    operations = _serialize_steps(extension.steps)
+    operations = _serialize_steps(extension.steps, renderer)
     return operations or None
 
 
-def _serialize_experiment(experiment: ExperimentDefinition) -> Dict[str, Any]:
+def _serialize_experiment(experiment: ExperimentDefinition, renderer: Optional[ExpressionRenderer] = None) -> Dict[str, Any]:
     payload: Dict[str, Any] = {
         "pipeline": experiment.pipeline,
         "model": experiment.model,
@@ -138,26 +169,12 @@ def _serialize_experiment(experiment: ExperimentDefinition) -> Dict[str, Any]:
     }
     if experiment.description:
         payload["description"] = experiment.description
-    extension_ops = _serialize_extension(experiment.extension)
+    extension_ops = _serialize_extension(experiment.extension, renderer)
     if extension_ops:
         payload["extension"] = extension_ops
     return payload
 
 
-def _serialize_timeline(name: str, timeline: TimelineSpec) -> Dict[str, Any]:
-    experiments = {
-        exp_name: _serialize_experiment(exp)
-        for exp_name, exp in timeline.experiments.items()
-    }
-    payload: Dict[str, Any] = {
-        "parent": timeline.parent,
-        "experiments": experiments,
-    }
-    if timeline.description:
-        payload["description"] = timeline.description
-    return payload
-
-
 def _serialize_merges(merges: List[MergeStatement]) -> List[Dict[str, Any]]:
     serialized: List[Dict[str, Any]] = []
     for merge in merges:
@@ -175,43 +192,364 @@ def _serialize_merges(merges: List[MergeStatement]) -> List[Dict[str, Any]]:
     return serialized
 
 
-def build_temporal_ir(runtime: Runtime) -> Dict[str, Any]:
-    datasets = {
-        f"{name}:{version}": _serialize_dataset(dataset)
-        for (name, version), dataset in runtime.datasets.items()
-    }
+class _StreamedObject:
+    """A JSON object whose ``(key, value)`` entries are produced on demand."""
+
+    __slots__ = ("entries",)
+
+    def __init__(self, entries: Iterable[Tuple[str, Any]]):
+        self.entries = entries
+
+
+class _StreamedArray:
+    """A JSON array whose items are produced on demand."""
+
+    __slots__ = ("items",)
+
+    def __init__(self, items: Iterable[Any]):
+        self.items = items
+
+
+HASH_DIGEST_SIZE = 16
+
+
+def entity_hash(kind: str, payload: Any, *dependencies: str) -> str:
+    """Content hash of one IR entity: its canonical JSON plus the hashes it builds on."""
+    digest = hashlib.blake2b(kind.encode("utf-8"), digest_size=HASH_DIGEST_SIZE)
+    digest.update(b"\0")
+    digest.update(json.dumps(payload, sort_keys=True, separators=(",", ":")).encode("utf-8"))
+    for dependency in dependencies:
+        digest.update(b"\0" + dependency.encode("utf-8"))
+    return digest.hexdigest()
+
+
+class StructuralHasher:
+    """Merkle-style hashes for the entities of one runtime.
+
+    A pipeline's hash covers its dataset's hash, and an experiment's covers
+    its pipeline, extension, model and dataset hashes, so editing a dataset
+    changes the hash of everything built on it. Hashes of shared entities
+    are memoized, so each dataset, pipeline and model is hashed once no
+    matter how many experiments reference it. Every hash is also folded
+    into ``root`` in IR order.
+    """
+
+    def __init__(self, runtime: Runtime, renderer: Optional[ExpressionRenderer] = None):
+        self.runtime = runtime
+        self.renderer = renderer or ExpressionRenderer()
+        self._datasets: Dict[str, str] = {}
+        self._pipelines: Dict[str, str] = {}
+        self._models: Dict[str, str] = {}
+        self._root = hashlib.blake2b(b"temporal-ir", digest_size=HASH_DIGEST_SIZE)
+
+    def record(self, section: str, key: str, digest: str) -> str:
+        self._root.update(f"{section}\0{key}\0{digest}\n".encode("utf-8"))
+        return digest
+
+    def root(self) -> str:
+        return self._root.hexdigest()
+
+    def dataset(self, key: str, payload: Optional[Dict[str, Any]] = None) -> str:
+        digest = self._datasets.get(key)
+        if digest is None:
+            if payload is None:
+                name, _, version = key.rpartition(":")
+                declaration = self.runtime.datasets.get((name, version))
+                payload = _serialize_dataset(declaration) if declaration else {"missing": key}
+            digest = self._datasets[key] = entity_hash("dataset", payload)
+        return digest
+
+    def pipeline(self, name: str, payload: Optional[Dict[str, Any]] = None) -> str:
+        digest = self._pipelines.get(name)
+        if digest is None:
+            if payload is None:
+                definition = self.runtime.pipelines.get(name)
+                payload = _serialize_pipeline(definition, self.renderer) if definition else {"missing": name}
+            digest = self._pipelines[name] = entity_hash("pipeline", payload, self.dataset(payload.get("input", "")))
+        return digest
+
+    def model(self, name: str, payload: Optional[Dict[str, Any]] = None) -> str:
+        digest = self._models.get(name)
+        if digest is None:
+            if payload is None:
+                definition = self.runtime.models.get(name)
+                payload = _serialize_model(definition) if definition else {"missing": name}
+            digest = self._models[name] = entity_hash("model", payload)
+        return digest
+
+    def experiment_dependencies(self, pipeline_name: str, model_name: str) -> Tuple[str, str, str]:
+        """``(pipeline, model, dataset)`` hashes an experiment's hash builds on."""
+        pipeline = self.runtime.pipelines.get(pipeline_name)
+        dataset_key = f"{pipeline.source.name}:{pipeline.source.version}" if pipeline else ""
+        return self.pipeline(pipeline_name), self.model(model_name), self.dataset(dataset_key)
+
+    def experiment(self, payload: Dict[str, Any]) -> str:
+        pipeline, model, dataset = self.experiment_dependencies(payload["pipeline"], payload["model"])
+        return entity_hash(
+            "experiment", payload, pipeline, entity_hash("extension", payload.get("extension")), model, dataset
+        )
 
-    pipelines = {
-        name: _serialize_pipeline(pipeline)
-        for name, pipeline in runtime.pipelines.items()
-    }
 
-    models = {
-        name: _serialize_model(model)
-        for name, model in runtime.models.items()
-    }
+class _ReuseEntry:
+    __slots__ = ("node", "dependencies", "payload", "texts")
+
+    def __init__(self, node: ExperimentDefinition, dependencies: Tuple[str, str, str], payload: Dict[str, Any]):
+        # Holding the node keeps its id from being recycled while the entry lives.
+        self.node = node
+        self.dependencies = dependencies
+        self.payload = payload
+        self.texts: Dict[Tuple[Optional[int], int], str] = {}
+
+
+class IRReuseCache:
+    """Experiment payloads and their JSON text, kept between IR builds of an edited spec.
+
+    Entries are keyed by the experiment's AST node and reused only while the
+    pipeline, model and dataset hashes it depends on are unchanged, so an
+    incremental rebuild re-serializes just the experiments that were
+    re-parsed or whose dependencies changed. Each build starts a new
+    generation; entries the previous build did not use are dropped.
+    Reused payloads are shared between builds and must not be mutated.
+    """
+
+    def __init__(self):
+        self._current: Dict[int, _ReuseEntry] = {}
+        self._previous: Dict[int, _ReuseEntry] = {}
+        self._by_payload: Dict[int, _ReuseEntry] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def begin(self) -> None:
+        self._previous, self._current = self._current, {}
+        self._by_payload = {}
+        self.hits = self.misses = 0
+
+    def experiment(self, experiment: ExperimentDefinition, hasher: StructuralHasher) -> Dict[str, Any]:
+        dependencies = hasher.experiment_dependencies(experiment.pipeline, experiment.model)
+        key = id(experiment)
+        entry = self._current.get(key) or self._previous.pop(key, None)
+        if entry is None or entry.node is not experiment or entry.dependencies != dependencies:
+            payload = _serialize_experiment(experiment)
+            entry = _ReuseEntry(experiment, dependencies, _with_hash(payload, hasher.experiment(payload)))
+            self.misses += 1
+        else:
+            self.hits += 1
+        self._current[key] = entry
+        self._by_payload[id(entry.payload)] = entry
+        return entry.payload
+
+    def text(self, value: Any, key: Tuple[Optional[int], int], render: Callable[[], str]) -> str:
+        """JSON text of ``value`` at one indent/depth, remembered if ``value`` is a cached payload."""
+        entry = self._by_payload.get(id(value))
+        if entry is None or entry.payload is not value:
+            return render()
+        text = entry.texts.get(key)
+        if text is None:
+            text = entry.texts[key] = render()
+        return text
+
+
+def _with_hash(payload: Dict[str, Any], digest: str) -> Dict[str, Any]:
+    payload["hash"] = digest
+    return payload
 
-    experiments: Dict[str, Any] = {}
-    main_timeline = runtime.timelines.get("main")
-    if main_timeline:
-        experiments = {
-            name: _serialize_experiment(experiment)
-            for name, experiment in main_timeline.experiments.items()
-        }
-
-    timelines = {
-        name: _serialize_timeline(name, timeline)
-        for name, timeline in runtime.timelines.items()
-        if name != "main"
-    }
 
-    merges = _serialize_merges(runtime.merges)
+def _hashed_experiments(
+    timeline: Optional[TimelineSpec],
+    section: str,
+    hasher: StructuralHasher,
+    reuse: Optional[IRReuseCache] = None,
+) -> Iterator[Tuple[str, Dict[str, Any]]]:
+    if timeline is None:
+        return
+    for name, experiment in timeline.experiments.items():
+        if reuse is not None:
+            payload = reuse.experiment(experiment, hasher)
+            hasher.record(section, name, payload["hash"])
+            yield name, payload
+            continue
+        payload = _serialize_experiment(experiment)
+        yield name, _with_hash(payload, hasher.record(section, name, hasher.experiment(payload)))
+
+
+def _timeline_entries(
+    timeline: TimelineSpec, hasher: StructuralHasher, reuse: Optional[IRReuseCache] = None
+) -> Iterator[Tuple[str, Any]]:
+    experiment_hashes: List[str] = []
+
+    def experiments() -> Iterator[Tuple[str, Dict[str, Any]]]:
+        for name, payload in _hashed_experiments(timeline, f"timelines/{timeline.name}", hasher, reuse):
+            experiment_hashes.append(f"{name}={payload['hash']}")
+            yield name, payload
+
+    yield "parent", timeline.parent
+    yield "forked_at", timeline.forked_at
+    yield "experiments", _StreamedObject(experiments())
+    if timeline.description:
+        yield "description", timeline.description
+    # Consumers drain "experiments" before asking for the next key, so every
+    # experiment hash is known by the time the timeline hash is needed.
+    digest = entity_hash(
+        "timeline", [timeline.parent, timeline.description, timeline.forked_at], *experiment_hashes
+    )
+    yield "hash", hasher.record("timelines", timeline.name, digest)
+
+
+def _ir_sections(runtime: Runtime, reuse: Optional[IRReuseCache] = None) -> _StreamedObject:
+    """Describe the whole Temporal IR lazily, in canonical key order.
+
+    Both ``build_temporal_ir`` and ``write_temporal_ir`` consume this, so the
+    in-memory payload and the streamed file can never drift apart. Only the
+    pipeline renderer is shared; each experiment renders with its own so the
+    memo does not grow with the number of experiments being streamed. The
+    root ``hash`` comes last because it covers every entity hash before it.
+    With ``reuse``, experiments unchanged since the previous build come from
+    that cache instead of being serialized and hashed again.
+    """
+    if reuse is not None:
+        reuse.begin()
+    renderer = ExpressionRenderer()
+    hasher = StructuralHasher(runtime, renderer)
+
+    def sections() -> Iterator[Tuple[str, Any]]:
+        yield "datasets", _StreamedObject(
+            (key, _with_hash(payload, hasher.record("datasets", key, hasher.dataset(key, payload))))
+            for key, payload in (
+                (f"{name}:{version}", _serialize_dataset(dataset))
+                for (name, version), dataset in runtime.datasets.items()
+            )
+        )
+        yield "pipelines", _StreamedObject(
+            (name, _with_hash(payload, hasher.record("pipelines", name, hasher.pipeline(name, payload))))
+            for name, payload in (
+                (name, _serialize_pipeline(pipeline, renderer)) for name, pipeline in runtime.pipelines.items()
+            )
+        )
+        yield "models", _StreamedObject(
+            (name, _with_hash(payload, hasher.record("models", name, hasher.model(name, payload))))
+            for name, payload in ((name, _serialize_model(model)) for name, model in runtime.models.items())
+        )
+        yield "experiments", _StreamedObject(
+            _hashed_experiments(runtime.timelines.get("main"), "experiments", hasher, reuse)
+        )
+        yield "timelines", _StreamedObject(
+            (name, _StreamedObject(_timeline_entries(timeline, hasher, reuse)))
+            for name, timeline in runtime.timelines.items()
+            if name != "main"
+        )
+        yield "merges", _StreamedArray(
+            _with_hash(payload, hasher.record("merges", str(index), entity_hash("merge", payload)))
+            for index, payload in enumerate(_serialize_merges(runtime.merges))
+        )
+        yield "hash", hasher.root()
 
-    return {
-        "datasets": datasets,
-        "pipelines": pipelines,
-        "models": models,
-        "experiments": experiments,
-        "timelines": timelines,
-        "merges": merges,
-    }
+    return _StreamedObject(sections())
+
+
+def _materialize(value: Any) -> Any:
+    if isinstance(value, _StreamedObject):
+        return {key: _materialize(item) for key, item in value.entries}
+    if isinstance(value, _StreamedArray):
+        return [_materialize(item) for item in value.items]
+    return value
+
+
+def build_temporal_ir(runtime: Runtime) -> Dict[str, Any]:
+    return _materialize(_ir_sections(runtime))
+
+
+class _JSONStreamWriter:
+    """Write streamed IR with exactly the bytes ``json.dumps(..., indent=indent)`` gives."""
+
+    def __init__(self, fp: TextIO, indent: Optional[int], reuse: Optional[IRReuseCache] = None):
+        self.write = fp.write
+        self.indent = indent
+        self.reuse = reuse
+        self.item_separator = ", " if indent is None else ","
+
+    def _newline(self, depth: int) -> str:
+        if self.indent is None:
+            return ""
+        return "\n" + " " * (self.indent * depth)
+
+    def value(self, value: Any, depth: int) -> None:
+        if isinstance(value, _StreamedObject):
+            self._container("{", "}", ((json.dumps(key) + ": ", item) for key, item in value.entries), depth)
+        elif isinstance(value, _StreamedArray):
+            self._container("[", "]", (("", item) for item in value.items), depth)
+        elif self.reuse is not None:
+            self.write(self.reuse.text(value, (self.indent, depth), lambda: self._dump(value, depth)))
+        else:
+            self.write(self._dump(value, depth))
+
+    def _dump(self, value: Any, depth: int) -> str:
+        text = json.dumps(value, indent=self.indent)
+        if self.indent is not None and depth:
+            # json.dumps escapes newlines inside strings, so every raw
+            # newline here is structural and can be re-indented.
+            text = text.replace("\n", self._newline(depth))
+        return text
+
+    def _container(self, opener: str, closer: str, entries: Iterable[Tuple[str, Any]], depth: int) -> None:
+        empty = True
+        for prefix, item in entries:
+            self.write(opener if empty else self.item_separator)
+            empty = False
+            self.write(self._newline(depth + 1))
+            self.write(prefix)
+            self.value(item, depth + 1)
+        if empty:
+            self.write(opener + closer)
+        else:
+            self.write(self._newline(depth))
+            self.write(closer)
+
+
+def write_temporal_ir(
+    runtime: Runtime, fp: TextIO, indent: Optional[int] = None, reuse: Optional[IRReuseCache] = None
+) -> None:
+    """Stream the Temporal IR to ``fp`` one entry at a time.
+
+    The output is byte-identical to ``json.dumps(build_temporal_ir(runtime),
+    indent=indent)`` but only a single entry is held in memory at once
+    (plus, with ``reuse``, the cached experiment text).
+    """
+    _JSONStreamWriter(fp, indent, reuse).value(_ir_sections(runtime, reuse), 0)
+
+
+def _binary_entry(value: Any) -> Any:
+    """Materialize one entry, keeping streamed collections inside it as subsections."""
+    if not isinstance(value, _StreamedObject):
+        return _materialize(value)
+    return Record((key, _binary_item(item)) for key, item in value.entries)
+
+
+def _binary_item(item: Any) -> Any:
+    if isinstance(item, _StreamedObject):
+        return Subsection(KIND_OBJECT, ((name, _materialize(child)) for name, child in item.entries))
+    if isinstance(item, _StreamedArray):
+        return Subsection(KIND_ARRAY, ((None, _materialize(child)) for child in item.items))
+    return _materialize(item)
+
+
+def write_temporal_ir_binary(runtime: Runtime, fp: BinaryIO, reuse: Optional[IRReuseCache] = None) -> None:
+    """Stream the Temporal IR to ``fp`` in the binary layout of :mod:`fusionflow.ir_binary`."""
+    writer = BinaryIRWriter(fp)
+    for name, section in _ir_sections(runtime, reuse).entries:
+        if isinstance(section, _StreamedArray):
+            writer.write_section(name, KIND_ARRAY, ((None, _binary_entry(item)) for item in section.items))
+        elif not isinstance(section, _StreamedObject):
+            writer.write_value(name, section)
+        else:
+            writer.write_section(
+                name, KIND_OBJECT, ((key, _binary_entry(item)) for key, item in section.entries)
+            )
+    writer.close()
+
+
+def load_ir(path: Union[str, Path]) -> Dict[str, Any]:
+    """Load a Temporal IR file written as JSON or in the binary format."""
+    data = Path(path).read_bytes()
+    if is_binary_ir(data):
+        return BinaryIRReader(data).to_dict()
+    return json.loads(data)
@@ -0,0 +1,269 @@
+"""Rebuild a Runtime registry from compiled Temporal IR instead of ``.ff`` source."""
+
+from __future__ import annotations
+
+import json
+import mmap
+from collections.abc import MutableMapping
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Tuple, Union
+
+from .ast_nodes import (
+    DatasetDeclaration,
+    DatasetReference,
+    DeriveStep,
+    ExperimentDefinition,
+    Expression,
+    MergeStatement,
+    MergeStrategy,
+    ModelDefinition,
+    PipelineDefinition,
+    PipelineExtension,
+    PipelineStep,
+    SchemaField,
+    SelectStep,
+    TargetStep,
+)
+from .ir_binary import MAGIC, BinaryIRReader, is_binary_ir
+from .lexer import Lexer
+from .parser import Parser
+from .runtime import Runtime, TimelineSpec
+from .tokens import TokenType
+
+_PENDING = object()
+
+
+class LazyMapping(MutableMapping):
+    """A dict whose values are produced by ``loader(key)`` the first time they are read.
+
+    Keys, their order and membership are known up front; assigning or
+    deleting works like a plain dict.
+    """
+
+    def __init__(self, keys: Iterable[Any], loader: Callable[[Any], Any]):
+        self._values: Dict[Any, Any] = dict.fromkeys(keys, _PENDING)
+        self._loader = loader
+
+    def __getitem__(self, key: Any) -> Any:
+        value = self._values[key]
+        if value is _PENDING:
+            value = self._values[key] = self._loader(key)
+        return value
+
+    def __setitem__(self, key: Any, value: Any) -> None:
+        self._values[key] = value
+
+    def __delitem__(self, key: Any) -> None:
+        del self._values[key]
+
+    def __iter__(self) -> Iterator[Any]:
+        return iter(self._values)
+
+    def __len__(self) -> int:
+        return len(self._values)
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._values
+
+    def is_loaded(self, key: Any) -> bool:
+        return self._values[key] is not _PENDING
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({list(self._values)!r})"
+
+
+class ExperimentIndex(MutableMapping):
+    """``(timeline, experiment) -> ExperimentDefinition`` view over ``Runtime.timelines``.
+
+    Stands in for ``Runtime.experiments_index`` so looking experiments up by
+    key only decodes the timeline and experiment asked for.
+    """
+
+    def __init__(self, timelines: MutableMapping):
+        self._timelines = timelines
+
+    def __getitem__(self, key: Tuple[str, str]) -> ExperimentDefinition:
+        timeline, name = key
+        if timeline not in self._timelines:
+            raise KeyError(key)
+        return self._timelines[timeline].experiments[name]
+
+    def __setitem__(self, key: Tuple[str, str], experiment: ExperimentDefinition) -> None:
+        timeline, name = key
+        self._timelines[timeline].experiments[name] = experiment
+
+    def __delitem__(self, key: Tuple[str, str]) -> None:
+        timeline, name = key
+        if timeline not in self._timelines:
+            raise KeyError(key)
+        del self._timelines[timeline].experiments[name]
+
+    def __iter__(self) -> Iterator[Tuple[str, str]]:
+        for timeline, spec in self._timelines.items():
+            for name in spec.experiments:
+                yield timeline, name
+
+    def __len__(self) -> int:
+        return sum(len(spec.experiments) for spec in self._timelines.values())
+
+
+class _JSONSource:
+    """IR sections from a fully parsed JSON document."""
+
+    def __init__(self, document: Dict[str, Any]):
+        self._document = document
+
+    def section(self, name: str) -> Any:
+        return self._document.get(name, {})
+
+    def collection(self, ref: Any) -> Tuple[List[str], Callable[[str], Any]]:
+        return list(ref), ref.__getitem__
+
+    def top(self, name: str) -> Any:
+        return self.section(name)
+
+
+class _BinarySource:
+    """IR sections decoded from a binary IR buffer one entry at a time."""
+
+    def __init__(self, reader: BinaryIRReader):
+        self._reader = reader
+
+    def section(self, name: str) -> Any:
+        if name not in self._reader.sections:
+            return {}
+        return self._reader.section(name)
+
+    def collection(self, ref: Any) -> Tuple[List[str], Callable[[str], Any]]:
+        if ref not in self._reader.sections:
+            return [], {}.__getitem__
+        keys = self._reader.keys(ref)
+        positions = {key: position for position, key in enumerate(keys)}
+        # Nested collections come back as their section name, decoded on demand.
+        return keys, lambda key: self._reader.entry_at(ref, positions[key], resolve=str)
+
+    def top(self, name: str) -> Any:
+        return name
+
+
+def _open_source(path: Union[str, Path]) -> Union[_JSONSource, _BinarySource]:
+    with open(path, "rb") as handle:
+        if is_binary_ir(handle.read(len(MAGIC))):
+            # Map rather than read the file so untouched entries never leave the disk.
+            return _BinarySource(BinaryIRReader(mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ)))
+        handle.seek(0)
+        return _JSONSource(json.load(handle))
+
+
+class _IRDecoder:
+    """Turn IR payloads back into AST nodes, re-parsing rendered expressions once each."""
+
+    def __init__(self):
+        self._expressions: Dict[str, Expression] = {}
+
+    def expression(self, text: str) -> Expression:
+        expr = self._expressions.get(text)
+        if expr is None:
+            parser = Parser(Lexer(text).tokenize())
+            expr = parser.parse_expression()
+            if parser.current_token().type != TokenType.EOF:
+                raise SyntaxError(f"Trailing input after IR expression '{text}'")
+            self._expressions[text] = expr
+        return expr
+
+    def steps(self, operations: List[Dict[str, Any]]) -> List[PipelineStep]:
+        steps: List[PipelineStep] = []
+        for operation in operations:
+            kind = operation["type"]
+            if kind == "derive":
+                steps.append(DeriveStep(operation["target"], self.expression(operation["expression"])))
+            elif kind == "select":
+                steps.append(SelectStep(list(operation["fields"])))
+            elif kind == "target":
+                steps.append(TargetStep(operation["field"]))
+            else:
+                raise ValueError(f"Unknown IR operation type '{kind}'")
+        return steps
+
+    @staticmethod
+    def dataset(payload: Dict[str, Any]) -> DatasetDeclaration:
+        schema = [SchemaField(name, type_name) for name, type_name in payload.get("schema", {}).items()]
+        return DatasetDeclaration(
+            payload["name"], payload["version"], payload["source"], schema, payload.get("description")
+        )
+
+    def pipeline(self, name: str, payload: Dict[str, Any]) -> PipelineDefinition:
+        dataset, _, version = payload["input"].rpartition(":")
+        return PipelineDefinition(name, DatasetReference(dataset, version), self.steps(payload["operations"]))
+
+    @staticmethod
+    def model(name: str, payload: Dict[str, Any]) -> ModelDefinition:
+        return ModelDefinition(name, payload["type"], dict(payload["params"]))
+
+    def experiment(self, name: str, payload: Dict[str, Any]) -> ExperimentDefinition:
+        extension = payload.get("extension")
+        return ExperimentDefinition(
+            name,
+            payload["pipeline"],
+            payload["model"],
+            list(payload["metrics"]),
+            payload.get("description"),
+            PipelineExtension(self.steps(extension)) if extension else None,
+        )
+
+    @staticmethod
+    def merge(payload: Dict[str, Any]) -> MergeStatement:
+        strategy = payload["strategy"]
+        return MergeStatement(
+            payload["source"],
+            payload["target"],
+            payload["justification"],
+            MergeStrategy(strategy["name"], list(strategy["arguments"])),
+        )
+
+
+def runtime_from_ir(path: Union[str, Path]) -> Runtime:
+    """Build a ``Runtime`` from a compiled IR file (JSON or binary).
+
+    Datasets, models and merges are decoded immediately. Pipelines,
+    timelines and the experiments inside each timeline are decoded the
+    first time they are looked up; the reverse and ancestry indexes are
+    built (decoding everything) by the first query that needs them.
+    """
+    source = _open_source(path)
+    decoder = _IRDecoder()
+    runtime = Runtime()
+
+    for payload in source.section("datasets").values():
+        declaration = decoder.dataset(payload)
+        runtime.datasets[(declaration.name, declaration.version)] = declaration
+
+    runtime.models = {name: decoder.model(name, payload) for name, payload in source.section("models").items()}
+
+    pipeline_keys, pipeline_payload = source.collection(source.top("pipelines"))
+    runtime.pipelines = LazyMapping(pipeline_keys, lambda name: decoder.pipeline(name, pipeline_payload(name)))
+
+    def experiments(ref: Any) -> LazyMapping:
+        keys, payload = source.collection(ref)
+        return LazyMapping(keys, lambda name: decoder.experiment(name, payload(name)))
+
+    timeline_keys, timeline_payload = source.collection(source.top("timelines"))
+    main = runtime.timelines["main"]
+
+    def timeline(name: str) -> TimelineSpec:
+        if name == "main":
+            return TimelineSpec(main.name, main.description, main.parent, experiments(source.top("experiments")))
+        payload = timeline_payload(name)
+        return TimelineSpec(
+            name,
+            payload.get("description"),
+            payload.get("parent"),
+            experiments(payload["experiments"]),
+            payload.get("forked_at"),
+        )
+
+    runtime.timelines = LazyMapping(["main", *timeline_keys], timeline)
+    runtime.experiments_index = ExperimentIndex(runtime.timelines)
+    runtime.merges = [decoder.merge(payload) for payload in source.section("merges")]
+    runtime.invalidate_indexes()
+    return runtime
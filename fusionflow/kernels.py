@@ -0,0 +1,355 @@
+"""Compile derive expressions into vectorized NumPy kernels."""
+
+from __future__ import annotations
+
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Mapping, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .ast_nodes import BinaryOp, Expression, Identifier, Literal, UnaryOp
+from .ir_export import ExpressionRenderer
+
+# Rows per block. A few float64 temporaries of this length stay in cache, so
+# a chain of operations streams each input once instead of once per operator.
+DEFAULT_CHUNK_SIZE = 1 << 14
+
+_BINARY_UFUNCS = {
+    "+": np.add,
+    "-": np.subtract,
+    "*": np.multiply,
+    "/": np.true_divide,
+    "==": np.equal,
+    "!=": np.not_equal,
+    "<": np.less,
+    "<=": np.less_equal,
+    ">": np.greater,
+    ">=": np.greater_equal,
+    "and": np.logical_and,
+    "or": np.logical_or,
+}
+_UNARY_UFUNCS = {
+    "not": np.logical_not,
+    "-": np.negative,
+    "+": np.positive,
+}
+
+# Operand of an instruction: ("column", index), ("constant", index), ("temp", index)
+# or ("output", index), the result of an earlier expression of a fused kernel.
+_Operand = Tuple[str, int]
+
+
+class Kernel:
+    """One derive expression lowered to a straight-line list of ufunc calls.
+
+    Calling it with a mapping of column arrays (a dict or a DataFrame)
+    returns the derived column. Rows are processed in blocks of
+    ``chunk_size``: every intermediate result lives in a block-sized buffer
+    reused across blocks (and across instructions of the same dtype), and
+    the last instruction writes straight into the output, so an expression
+    with ``k`` operators makes one pass over its inputs and allocates no
+    full-length temporaries. The Python source for each combination of
+    input dtypes is generated and compiled once, then cached on the kernel.
+    """
+
+    def __init__(self, expression: Expression, text: str):
+        self._setup(text)
+        self._add(expression)
+
+    def _setup(self, text: str) -> None:
+        self.text = text
+        self.columns: List[str] = []
+        self.constants: List[Any] = []
+        # (ufunc, operands); instruction ``i`` produces ("temp", i).
+        self.instructions: List[Tuple[Any, Tuple[_Operand, ...]]] = []
+        # One result per output, and the instruction range that computes it.
+        self.results: List[_Operand] = []
+        self._starts: List[int] = []
+        self._ends: List[int] = []
+        self._column_ids: Dict[str, int] = {}
+        # Names bound by earlier expressions of a fused kernel: ("output", i)
+        # or, for names that are not outputs, the operand holding the value.
+        self._assigned: Dict[str, _Operand] = {}
+        self._variants: Dict[Tuple[np.dtype, ...], Tuple[Any, List[np.dtype], List[np.dtype]]] = {}
+
+    def _add(self, expression: Expression) -> None:
+        self._starts.append(len(self.instructions))
+        self.results.append(self._lower(expression))
+        self._ends.append(len(self.instructions))
+
+    def _lower(self, expression: Expression) -> _Operand:
+        results: List[_Operand] = []
+        # Iterative post-order walk; ``True`` marks a node whose children are done.
+        stack: List[Tuple[Expression, bool]] = [(expression, False)]
+        while stack:
+            node, ready = stack.pop()
+            if isinstance(node, Identifier):
+                if node.name in self._assigned:
+                    results.append(self._assigned[node.name])
+                    continue
+                if node.name not in self._column_ids:
+                    self._column_ids[node.name] = len(self.columns)
+                    self.columns.append(node.name)
+                results.append(("column", self._column_ids[node.name]))
+            elif isinstance(node, Literal):
+                self.constants.append(node.value)
+                results.append(("constant", len(self.constants) - 1))
+            elif isinstance(node, BinaryOp):
+                ufunc = _BINARY_UFUNCS.get(node.operator)
+                if ufunc is None:
+                    raise ValueError(f"Operator '{node.operator}' cannot be compiled to a kernel")
+                if ready:
+                    right = results.pop()
+                    left = results.pop()
+                    results.append(self._emit(ufunc, left, right))
+                else:
+                    stack.append((node, True))
+                    stack.append((node.right, False))
+                    stack.append((node.left, False))
+            elif isinstance(node, UnaryOp):
+                ufunc = _UNARY_UFUNCS.get(node.operator)
+                if ufunc is None:
+                    raise ValueError(f"Operator '{node.operator}' cannot be compiled to a kernel")
+                if ready:
+                    results.append(self._emit(ufunc, results.pop()))
+                else:
+                    stack.append((node, True))
+                    stack.append((node.operand, False))
+            else:
+                raise ValueError(f"{type(node).__name__} expressions cannot be compiled to a kernel")
+        return results.pop()
+
+    def _emit(self, ufunc: Any, *operands: _Operand) -> _Operand:
+        self.instructions.append((ufunc, operands))
+        return ("temp", len(self.instructions) - 1)
+
+    def __call__(
+        self,
+        columns: Mapping[str, Any],
+        out: Optional[np.ndarray] = None,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+    ) -> np.ndarray:
+        return self._run(columns, [out], chunk_size)[0]
+
+    def _run(self, columns: Mapping[str, Any], outs: List[Optional[np.ndarray]], chunk_size: int) -> List[np.ndarray]:
+        try:
+            arrays = [np.asarray(columns[name]) for name in self.columns]
+        except KeyError as exc:
+            raise ValueError(f"Column {exc} used by '{self.text}' is not defined") from None
+        given = [out for out in outs if out is not None]
+        if arrays:
+            rows = len(arrays[0])
+            if any(len(array) != rows for array in arrays):
+                raise ValueError(f"Columns used by '{self.text}' differ in length")
+        elif given:
+            rows = len(given[0])
+        else:
+            rows = _row_count(columns)
+
+        function, dtypes, buffer_dtypes = self._variant(tuple(array.dtype for array in arrays))
+        outs = [np.empty(rows, dtype=dtype) if out is None else out for out, dtype in zip(outs, dtypes)]
+        size = max(1, min(chunk_size, rows))
+        buffers = [np.empty(size, dtype=buffer_dtype) for buffer_dtype in buffer_dtypes]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            function(outs, rows, size, self.constants, buffers, *arrays)
+        return outs
+
+    def _variant(self, dtypes: Tuple[np.dtype, ...]):
+        variant = self._variants.get(dtypes)
+        if variant is None:
+            variant = self._variants[dtypes] = self._specialize(dtypes)
+        return variant
+
+    def _specialize(self, dtypes: Tuple[np.dtype, ...]):
+        """Generate and compile the block loop for one combination of input dtypes."""
+        # Result dtypes follow NumPy's own promotion: run each ufunc on empty inputs.
+        samples = [np.empty(0, dtype=dtype) for dtype in dtypes]
+        temp_dtypes: List[np.dtype] = []
+        result_dtypes: List[np.dtype] = []
+
+        def dtype_of(operand: _Operand) -> np.dtype:
+            kind, index = operand
+            if kind == "column":
+                return dtypes[index]
+            if kind == "constant":
+                return np.asarray(self.constants[index]).dtype
+            if kind == "output":
+                return result_dtypes[index]
+            return temp_dtypes[index]
+
+        def sample(operand: _Operand) -> Any:
+            kind, index = operand
+            if kind == "column":
+                return samples[index]
+            if kind == "constant":
+                return self.constants[index]
+            return np.empty(0, dtype=dtype_of(operand))
+
+        position = 0
+        # Constants are probed as themselves so promotion matches the real
+        # call; ``1 / 0`` must not warn at compile time.
+        with np.errstate(all="ignore"):
+            for result, end in zip(self.results, self._ends):
+                for ufunc, operands in self.instructions[position:end]:
+                    temp_dtypes.append(np.asarray(ufunc(*(sample(operand) for operand in operands))).dtype)
+                position = end
+                result_dtypes.append(dtype_of(result))
+
+        # Give each temporary a block buffer, recycling buffers whose value is
+        # dead; the root instruction of each output writes into it directly
+        # and needs none.
+        roots = {
+            index: output
+            for output, (kind, index) in enumerate(self.results)
+            if kind == "temp" and index >= self._starts[output]
+        }
+        last_use: Dict[int, int] = {}
+        for position, (_, operands) in enumerate(self.instructions):
+            for operand_kind, operand in operands:
+                if operand_kind == "temp":
+                    last_use[operand] = position
+        # An output that is an earlier temporary (``derive c = a``) is copied
+        # out after its group, so that buffer stays live until the next one.
+        for output, (kind, index) in enumerate(self.results):
+            if kind == "temp" and index not in roots:
+                last_use[index] = max(last_use.get(index, 0), self._ends[output])
+        released: Dict[int, List[int]] = {}
+        for temp, position in last_use.items():
+            released.setdefault(position, []).append(temp)
+        buffer_dtypes: List[np.dtype] = []
+        free: Dict[np.dtype, List[int]] = {}
+        assigned: List[int] = []
+        for position in range(len(self.instructions)):
+            for temp in released.get(position, ()):
+                free.setdefault(temp_dtypes[temp], []).append(assigned[temp])
+            if position in roots:
+                assigned.append(-1)
+                continue
+            pool = free.get(temp_dtypes[position])
+            if pool:
+                assigned.append(pool.pop())
+            else:
+                assigned.append(len(buffer_dtypes))
+                buffer_dtypes.append(temp_dtypes[position])
+
+        def name(operand: _Operand) -> str:
+            operand_kind, operand_index = operand
+            if operand_kind == "column":
+                return f"c{operand_index}"
+            if operand_kind == "constant":
+                return f"k{operand_index}"
+            if operand_kind == "output":
+                return f"r{operand_index}"
+            return f"s{assigned[operand_index]}"
+
+        parameters = "".join(f", c{i}_all" for i in range(len(dtypes)))
+        lines = [
+            f"def kernel(outs, rows, size, constants, buffers{parameters}):",
+            *(f"    o{i} = outs[{i}]" for i in range(len(self.results))),
+            *(f"    k{i} = constants[{i}]" for i in range(len(self.constants))),
+            *(f"    b{i} = buffers[{i}]" for i in range(len(buffer_dtypes))),
+            "    for lo in range(0, rows, size):",
+            "        hi = min(lo + size, rows)",
+            "        n = hi - lo",
+            *(f"        c{i} = c{i}_all[lo:hi]" for i in range(len(dtypes))),
+            *(f"        r{i} = o{i}[lo:hi]" for i in range(len(self.results))),
+            *(f"        s{i} = b{i}[:n]" for i in range(len(buffer_dtypes))),
+        ]
+        ufuncs: Dict[str, Any] = {}
+        position = 0
+        for output, (result, end) in enumerate(zip(self.results, self._ends)):
+            for ufunc, operands in self.instructions[position:end]:
+                ufuncs[f"_{ufunc.__name__}"] = ufunc
+                target = f"r{roots[position]}" if position in roots else name(("temp", position))
+                lines.append(f"        _{ufunc.__name__}({', '.join(name(operand) for operand in operands)}, out={target})")
+                position += 1
+            if result[0] != "temp" or result[1] not in roots:
+                lines.append(f"        r{output}[:] = {name(result)}")
+        lines.append("    return outs")
+        namespace: Dict[str, Any] = dict(ufuncs)
+        exec(compile("\n".join(lines), f"<kernel {self.text}>", "exec"), namespace)
+        return namespace["kernel"], result_dtypes, buffer_dtypes
+
+
+class FusedKernel(Kernel):
+    """Several consecutive derives compiled into one block loop.
+
+    ``assignments`` are ``(name, expression)`` pairs applied in order; an
+    expression may use the names assigned before it, which are read from
+    the block just computed instead of from a full-length column. Only the
+    names in ``outputs`` (all of them by default) are materialized; the
+    others live in block buffers and never exist as full columns. Calling
+    the kernel returns a dict of the output columns.
+    """
+
+    def __init__(
+        self,
+        assignments: Sequence[Tuple[str, Expression]],
+        text: str,
+        outputs: Optional[Sequence[str]] = None,
+    ):
+        self._setup(text)
+        wanted = None if outputs is None else set(outputs)
+        final = {name: position for position, (name, _) in enumerate(assignments)}
+        self.outputs: List[str] = []
+        for position, (name, expression) in enumerate(assignments):
+            # A name assigned again later is only an intermediate value here.
+            if final[name] == position and (wanted is None or name in wanted):
+                self._add(expression)
+                self._assigned[name] = ("output", len(self.results) - 1)
+                self.outputs.append(name)
+            else:
+                self._assigned[name] = self._lower(expression)
+        # Instructions after the last output compute nothing that is returned.
+        del self.instructions[self._ends[-1] if self._ends else 0 :]
+
+    def __call__(self, columns: Mapping[str, Any], chunk_size: int = DEFAULT_CHUNK_SIZE) -> Dict[str, np.ndarray]:
+        return dict(zip(self.outputs, self._run(columns, [None] * len(self.results), chunk_size)))
+
+
+def _row_count(columns: Mapping[str, Any]) -> int:
+    if hasattr(columns, "index"):  # a DataFrame: len() counts rows already
+        return len(columns)
+    for values in columns.values():
+        return len(values)
+    return 0
+
+
+# Kernels kept per cache. A long-lived process (``fusionflow serve``) sees an
+# open-ended stream of expressions, so the least recently used are dropped.
+MAX_KERNELS = 1024
+
+_KERNELS: "OrderedDict[str, Kernel]" = OrderedDict()
+_FUSED: "OrderedDict[str, FusedKernel]" = OrderedDict()
+
+
+def _cached(cache: "OrderedDict[str, Any]", key: str, build: Callable[[], Any]) -> Any:
+    kernel = cache.get(key)
+    if kernel is None:
+        kernel = cache[key] = build()
+        while len(cache) > MAX_KERNELS:
+            cache.popitem(last=False)
+    else:
+        cache.move_to_end(key)
+    return kernel
+
+
+def compile_expression(expression: Expression) -> Kernel:
+    """The kernel for ``expression``; expressions that render the same share one kernel."""
+    text = ExpressionRenderer().render(expression)
+    return _cached(_KERNELS, text, lambda: Kernel(expression, text))
+
+
+def compile_assignments(
+    assignments: Sequence[Tuple[str, Expression]], outputs: Optional[Sequence[str]] = None
+) -> FusedKernel:
+    """The fused kernel for a sequence of ``(name, expression)`` derives, returning ``outputs``."""
+    renderer = ExpressionRenderer()
+    text = "; ".join(f"{name} = {renderer.render(expression)}" for name, expression in assignments)
+    key = text if outputs is None else f"{text} -> {', '.join(outputs)}"
+    return _cached(_FUSED, key, lambda: FusedKernel(assignments, text, outputs))
+
+
+def evaluate(expression: Expression, columns: Mapping[str, Any], **options: Any) -> np.ndarray:
+    """Evaluate ``expression`` over ``columns`` with its cached kernel."""
+    return compile_expression(expression)(columns, **options)
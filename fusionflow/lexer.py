@@ -1,13 +1,109 @@
 """Lexer for FusionFlow language"""
 
-from .tokens import Token, TokenType
+import re
+
+from .tokens import Token, TokenBuffer, TokenType
+
+# A single master pattern recognises every lexeme; ``lastgroup`` tells the
+# tokenizer which alternative matched. Blanks and comments are folded into the
+# prefix of the following match so they never cost a loop iteration of their
+# own; TRAILER lets that prefix match at the very end of the source.
+# Two-character operators come before their one-character prefixes, and
+# MISMATCH catches anything else.
+_TOKEN_PATTERN = re.compile(
+    r"""
+    [ \t\r]*(?:\#[^\n]*)?
+    (?:
+        (?P<NEWLINE>\n)
+        | (?P<NAME>[^\W\d]\w*)
+        | (?P<OPERATOR>==|!=|<=|>=|[-+*/=<>()\[\]{},:.])
+        | (?P<NUMBER>\d+(?:\.\d*)?)
+        | (?P<STRING>"(?:[^"\\]|\\[\s\S]?)*"?|'(?:[^'\\]|\\[\s\S]?)*'?)
+        | (?P<BANG>!)
+        | (?P<TRAILER>\Z)
+        | (?P<MISMATCH>[\s\S])
+    )
+    """,
+    re.VERBOSE,
+)
+
+_ESCAPE_PATTERN = re.compile(r"\\([\s\S]?)")
+
+_ESCAPE_CHARS = {'n': '\n', 't': '\t', 'r': '\r', '\\': '\\'}
+
+_OPERATORS = {
+    '+': TokenType.PLUS,
+    '-': TokenType.MINUS,
+    '*': TokenType.MULTIPLY,
+    '/': TokenType.DIVIDE,
+    '=': TokenType.EQUALS,
+    '==': TokenType.DOUBLE_EQUALS,
+    '!=': TokenType.NOT_EQUALS,
+    '<': TokenType.LESS_THAN,
+    '>': TokenType.GREATER_THAN,
+    '<=': TokenType.LESS_EQUAL,
+    '>=': TokenType.GREATER_EQUAL,
+    '(': TokenType.LPAREN,
+    ')': TokenType.RPAREN,
+    '[': TokenType.LBRACKET,
+    ']': TokenType.RBRACKET,
+    '{': TokenType.LBRACE,
+    '}': TokenType.RBRACE,
+    ',': TokenType.COMMA,
+    ':': TokenType.COLON,
+    '.': TokenType.DOT,
+}
+
+
+_OPERATOR_CODES = {text: token_type.value for text, token_type in _OPERATORS.items()}
+
+_NUMBER_CODE = TokenType.NUMBER.value
+_STRING_CODE = TokenType.STRING.value
+_NEWLINE_CODE = TokenType.NEWLINE.value
+_EOF_CODE = TokenType.EOF.value
+
+
+def _unescape(body: str) -> str:
+    return _ESCAPE_PATTERN.sub(lambda m: _ESCAPE_CHARS.get(m.group(1), m.group(1)), body)
+
+
+def _string_value(text: str) -> str:
+    quote_char = text[0]
+    body = text[1:]
+    if body.endswith(quote_char) and not _has_dangling_escape(body[:-1]):
+        body = body[:-1]
+    if '\\' in body:
+        body = _unescape(body)
+    return body
+
+
+def _has_dangling_escape(body: str) -> bool:
+    # A closing quote preceded by an odd run of backslashes is escaped, which
+    # only happens for unterminated strings that run to the end of the source.
+    run = len(body) - len(body.rstrip('\\'))
+    return run % 2 == 1
+
+
+def _token_value(code: int, text: str):
+    """Materialize a token value from its source slice (used by TokenBuffer)."""
+    if code == _NUMBER_CODE:
+        return float(text) if '.' in text else int(text)
+    if code == _STRING_CODE:
+        return _string_value(text)
+    if code == _EOF_CODE:
+        return None
+    return text
+
 
 class Lexer:
-    def __init__(self, source: str):
+    def __init__(self, source: str, start: int = 0, end=None):
+        # ``start``/``end`` restrict lexing to a slice of ``source`` while
+        # offsets, lines and columns stay relative to the whole text.
         self.source = source
-        self.pos = 0
-        self.line = 1
-        self.column = 1
+        self.pos = start
+        self.end = len(source) if end is None else end
+        self.line = source.count('\n', 0, start) + 1
+        self.column = start - source.rfind('\n', 0, start)
         self.tokens = []
         
         self.keywords = {
@@ -39,185 +135,89 @@ class Lexer:
             'true': TokenType.IDENTIFIER,
             'false': TokenType.IDENTIFIER,
         }
-    
-    def current_char(self):
-        if self.pos >= len(self.source):
-            return None
-        return self.source[self.pos]
-    
-    def peek_char(self, offset=1):
-        pos = self.pos + offset
-        if pos >= len(self.source):
-            return None
-        return self.source[pos]
-    
-    def advance(self):
-        if self.pos < len(self.source):
-            if self.source[self.pos] == '\n':
-                self.line += 1
-                self.column = 1
-            else:
-                self.column += 1
-            self.pos += 1
-
-    def skip_whitespace(self):
-        while self.current_char() and self.current_char() in ' \t\r':
-            self.advance()
-
-    def skip_comment(self):
-        if self.current_char() == '#':
-            while self.current_char() and self.current_char() != '\n':
-                self.advance()
-
-    def read_number(self):
-        start_col = self.column
-        num_str = ''
-        has_dot = False
-
-        while self.current_char() and (self.current_char().isdigit() or self.current_char() == '.'):
-            if self.current_char() == '.':
-                if has_dot:
-                    break
-                has_dot = True
-            num_str += self.current_char()
-            self.advance()
-
-        value = float(num_str) if has_dot else int(num_str)
-        return Token(TokenType.NUMBER, value, self.line, start_col)
-
-    def read_string(self):
-        start_col = self.column
-        quote_char = self.current_char()
-        self.advance()
-
-        string_value = ''
-        while self.current_char() and self.current_char() != quote_char:
-            if self.current_char() == '\\':
-                self.advance()
-                if self.current_char():
-                    escape_chars = {'n': '\n', 't': '\t', 'r': '\r', '\\': '\\', quote_char: quote_char}
-                    string_value += escape_chars.get(self.current_char(), self.current_char())
-                    self.advance()
-            else:
-                string_value += self.current_char()
-                self.advance()
-
-        if self.current_char() == quote_char:
-            self.advance()
-
-        return Token(TokenType.STRING, string_value, self.line, start_col)
-
-    def read_identifier(self):
-        start_col = self.column
-        identifier = ''
-
-        while self.current_char() and (self.current_char().isalnum() or self.current_char() == '_'):
-            identifier += self.current_char()
-            self.advance()
-
-        token_type = self.keywords.get(identifier.lower(), TokenType.IDENTIFIER)
-        return Token(token_type, identifier, self.line, start_col)
-    
+
     def tokenize(self):
-        while self.pos < len(self.source):
-            self.skip_whitespace()
-            
-            if not self.current_char():
-                break
-            
-            if self.current_char() == '#':
-                self.skip_comment()
-                continue
-            
-            if self.current_char() == '\n':
-                token = Token(TokenType.NEWLINE, '\n', self.line, self.column)
-                self.tokens.append(token)
-                self.advance()
-                continue
-            
-            if self.current_char().isdigit():
-                self.tokens.append(self.read_number())
-                continue
-            
-            if self.current_char() in '"\'':
-                self.tokens.append(self.read_string())
-                continue
-            
-            if self.current_char().isalpha() or self.current_char() == '_':
-                self.tokens.append(self.read_identifier())
-                continue
-            
-            # Operators and delimiters
-            start_col = self.column
-            char = self.current_char()
-            
-            if char == '+':
-                self.tokens.append(Token(TokenType.PLUS, '+', self.line, start_col))
-                self.advance()
-            elif char == '-':
-                self.tokens.append(Token(TokenType.MINUS, '-', self.line, start_col))
-                self.advance()
-            elif char == '*':
-                self.tokens.append(Token(TokenType.MULTIPLY, '*', self.line, start_col))
-                self.advance()
-            elif char == '/':
-                self.tokens.append(Token(TokenType.DIVIDE, '/', self.line, start_col))
-                self.advance()
-            elif char == '=':
-                self.advance()
-                if self.current_char() == '=':
-                    self.tokens.append(Token(TokenType.DOUBLE_EQUALS, '==', self.line, start_col))
-                    self.advance()
-                else:
-                    self.tokens.append(Token(TokenType.EQUALS, '=', self.line, start_col))
-            elif char == '!':
-                self.advance()
-                if self.current_char() == '=':
-                    self.tokens.append(Token(TokenType.NOT_EQUALS, '!=', self.line, start_col))
-                    self.advance()
-            elif char == '<':
-                self.advance()
-                if self.current_char() == '=':
-                    self.tokens.append(Token(TokenType.LESS_EQUAL, '<=', self.line, start_col))
-                    self.advance()
-                else:
-                    self.tokens.append(Token(TokenType.LESS_THAN, '<', self.line, start_col))
-            elif char == '>':
-                self.advance()
-                if self.current_char() == '=':
-                    self.tokens.append(Token(TokenType.GREATER_EQUAL, '>=', self.line, start_col))
-                    self.advance()
-                else:
-                    self.tokens.append(Token(TokenType.GREATER_THAN, '>', self.line, start_col))
-            elif char == '(':
-                self.tokens.append(Token(TokenType.LPAREN, '(', self.line, start_col))
-                self.advance()
-            elif char == ')':
-                self.tokens.append(Token(TokenType.RPAREN, ')', self.line, start_col))
-                self.advance()
-            elif char == '[':
-                self.tokens.append(Token(TokenType.LBRACKET, '[', self.line, start_col))
-                self.advance()
-            elif char == ']':
-                self.tokens.append(Token(TokenType.RBRACKET, ']', self.line, start_col))
-                self.advance()
-            elif char == '{':
-                self.tokens.append(Token(TokenType.LBRACE, '{', self.line, start_col))
-                self.advance()
-            elif char == '}':
-                self.tokens.append(Token(TokenType.RBRACE, '}', self.line, start_col))
-                self.advance()
-            elif char == ',':
-                self.tokens.append(Token(TokenType.COMMA, ',', self.line, start_col))
-                self.advance()
-            elif char == ':':
-                self.tokens.append(Token(TokenType.COLON, ':', self.line, start_col))
-                self.advance()
-            elif char == '.':
-                self.tokens.append(Token(TokenType.DOT, '.', self.line, start_col))
-                self.advance()
-            else:
-                raise SyntaxError(f"Unexpected character '{char}' at line {self.line}, column {self.column}")
-        
-        self.tokens.append(Token(TokenType.EOF, None, self.line, self.column))
+        self.tokens.extend(self.iter_tokens())
         return self.tokens
+
+    def iter_tokens(self):
+        """Yield tokens one at a time, ending with EOF, without building a list."""
+        source = self.source
+        keywords = self.keywords
+        line = self.line
+        line_start = self.pos - self.column + 1
+        identifier = TokenType.IDENTIFIER
+
+        for match in _TOKEN_PATTERN.finditer(source, self.pos, self.end):
+            kind = match.lastgroup
+            start = match.start(kind)
+            if kind == 'NAME':
+                text = match.group(kind)
+                token_type = keywords.get(text.lower(), identifier)
+                yield Token(token_type, text, line, start - line_start + 1)
+            elif kind == 'NEWLINE':
+                yield Token(TokenType.NEWLINE, '\n', line, start - line_start + 1)
+                line += 1
+                line_start = start + 1
+            elif kind == 'OPERATOR':
+                text = match.group(kind)
+                yield Token(_OPERATORS[text], text, line, start - line_start + 1)
+            elif kind == 'NUMBER':
+                text = match.group(kind)
+                value = float(text) if '.' in text else int(text)
+                yield Token(TokenType.NUMBER, value, line, start - line_start + 1)
+            elif kind == 'STRING':
+                text = match.group(kind)
+                column = start - line_start + 1
+                newlines = text.count('\n')
+                if newlines:
+                    # Strings may span lines; the token keeps its start column
+                    # but reports the line on which it ends.
+                    line += newlines
+                    line_start = start + text.rindex('\n') + 1
+                yield Token(TokenType.STRING, _string_value(text), line, column)
+            elif kind == 'MISMATCH':
+                raise SyntaxError(
+                    f"Unexpected character '{match.group(kind)}' at line {line}, column {start - line_start + 1}"
+                )
+            # A lone '!' (BANG) is consumed without producing a token, and
+            # TRAILER only absorbs blanks or a comment at the end of input.
+
+        self.pos = self.end
+        self.line = line
+        self.column = self.pos - line_start + 1
+        yield Token(TokenType.EOF, None, self.line, self.column)
+
+    def tokenize_compact(self):
+        """Tokenize into a ``TokenBuffer`` that stores offsets instead of values."""
+        source = self.source
+        keyword_codes = {text: token_type.value for text, token_type in self.keywords.items()}
+        identifier = TokenType.IDENTIFIER.value
+        buffer = TokenBuffer(source, _token_value)
+        append = buffer.append
+        line = self.line
+
+        for match in _TOKEN_PATTERN.finditer(source, self.pos, self.end):
+            kind = match.lastgroup
+            start, end = match.span(kind)
+            if kind == 'NAME':
+                append(keyword_codes.get(match.group(kind).lower(), identifier), start, end, line)
+            elif kind == 'NEWLINE':
+                append(_NEWLINE_CODE, start, end, line)
+                line += 1
+            elif kind == 'OPERATOR':
+                append(_OPERATOR_CODES[match.group(kind)], start, end, line)
+            elif kind == 'NUMBER':
+                append(_NUMBER_CODE, start, end, line)
+            elif kind == 'STRING':
+                line += source.count('\n', start, end)
+                append(_STRING_CODE, start, end, line)
+            elif kind == 'MISMATCH':
+                column = start - source.rfind('\n', 0, start)
+                raise SyntaxError(f"Unexpected character '{match.group(kind)}' at line {line}, column {column}")
+
+        self.pos = self.end
+        self.line = line
+        self.column = self.pos - source.rfind('\n', 0, self.pos)
+        append(_EOF_CODE, self.pos, self.pos, line)
+        return buffer
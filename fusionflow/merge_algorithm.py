@@ -1,5 +1,14 @@
 """Merge algorithm for timeline conflicts"""
 
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Mapping, Optional, Tuple
+
+from .ast_nodes import ExperimentDefinition, MergeStatement, MergeStrategy
+from .persistent import MISSING, PersistentMap
+
+
 def merge_timelines(source_state, target_state):
     """
     Merge source timeline state into target timeline state
@@ -12,7 +21,7 @@ def merge_timelines(source_state, target_state):
 def detect_conflicts(source_state, target_state):
     """Detect conflicts between two timeline states"""
     conflicts = []
-    
+
     for key in source_state:
         if key in target_state:
             if source_state[key] != target_state[key]:
@@ -21,5 +30,161 @@ def detect_conflicts(source_state, target_state):
                     'source_value': source_state[key],
                     'target_value': target_state[key]
                 })
-    
+
     return conflicts
+
+
+# ``(timeline, experiment) -> {metric: value}``, supplied by whoever ran the experiments.
+Scores = Mapping[Tuple[str, str], Mapping[str, float]]
+
+
+@dataclass
+class MergeConflict:
+    """An experiment both timelines changed differently since their merge base.
+
+    ``base``, ``source`` and ``target`` are the three versions (``None`` when
+    absent on that side); ``resolution`` is ``"source"`` or ``"target"`` when
+    the strategy picked a side, else ``None``.
+    """
+
+    experiment: str
+    base: Optional[ExperimentDefinition]
+    source: Optional[ExperimentDefinition]
+    target: Optional[ExperimentDefinition]
+    resolution: Optional[str] = None
+
+
+@dataclass
+class MergeResult:
+    source: str
+    target: str
+    base_timeline: str
+    # The target's effective experiments with the merge applied.
+    merged: PersistentMap
+    # Experiments only the source changed, taken over as-is.
+    applied: List[str] = field(default_factory=list)
+    conflicts: List[MergeConflict] = field(default_factory=list)
+
+    @property
+    def unresolved(self) -> List[MergeConflict]:
+        return [conflict for conflict in self.conflicts if conflict.resolution is None]
+
+
+Resolver = Callable[[MergeConflict, List[str], str, str, Optional[Scores]], Optional[str]]
+
+
+def _prefer_source(conflict, arguments, source, target, scores):
+    return "source"
+
+
+def _prefer_target(conflict, arguments, source, target, scores):
+    return "target"
+
+
+def _prefer_metrics(conflict, arguments, source, target, scores):
+    # Higher is better; metrics are tried in order until one separates the sides.
+    if not scores:
+        return None
+    source_scores = scores.get((source, conflict.experiment), {})
+    target_scores = scores.get((target, conflict.experiment), {})
+    for metric in arguments:
+        if metric in source_scores and metric in target_scores and source_scores[metric] != target_scores[metric]:
+            return "source" if source_scores[metric] > target_scores[metric] else "target"
+    return None
+
+
+MERGE_STRATEGIES: Dict[str, Resolver] = {
+    "prefer_source": _prefer_source,
+    "prefer_target": _prefer_target,
+    "prefer_metrics": _prefer_metrics,
+}
+
+
+class _ExperimentHasher:
+    """Structural hashes of experiments, memoized per node for one merge."""
+
+    def __init__(self, runtime):
+        from .ir_export import StructuralHasher, _serialize_experiment
+
+        self._hasher = StructuralHasher(runtime)
+        self._serialize = _serialize_experiment
+        self._hashes: Dict[int, str] = {}
+
+    def same(self, first: Any, second: Any) -> bool:
+        if first is second:
+            return True
+        if first is MISSING or second is MISSING:
+            return False
+        return self.hash(first) == self.hash(second)
+
+    def hash(self, experiment: ExperimentDefinition) -> str:
+        digest = self._hashes.get(id(experiment))
+        if digest is None:
+            digest = self._hashes[id(experiment)] = self._hasher.experiment(self._serialize(experiment))
+        return digest
+
+
+def _changes(base: PersistentMap, view: PersistentMap, hasher: _ExperimentHasher) -> Dict[str, Any]:
+    # Re-declared but structurally identical experiments are not changes.
+    return {name: new for name, old, new in base.diff(view) if not hasher.same(old, new)}
+
+
+def three_way_merge(
+    runtime,
+    source: str,
+    target: str,
+    strategy: Optional[MergeStrategy] = None,
+    scores: Optional[Scores] = None,
+) -> MergeResult:
+    """Merge ``source``'s effective experiments into ``target``'s against their merge base.
+
+    Only entries that differ from the base on either side are visited: the
+    timeline views are persistent maps sharing structure with the base, so
+    the work follows the number of changes rather than the registry size.
+    Experiments are compared by structural hash. Changes made on one side
+    only are applied; differing changes on both sides are conflicts, which
+    ``strategy`` may resolve. The registry itself is not modified.
+    """
+    resolver: Optional[Resolver] = None
+    if strategy is not None:
+        resolver = MERGE_STRATEGIES.get(strategy.name)
+        if resolver is None:
+            raise ValueError(f"Unknown merge strategy '{strategy.name}'")
+
+    base_timeline, base = runtime.merge_base(source, target)
+    merged = runtime.effective_experiments(target)
+    hasher = _ExperimentHasher(runtime)
+    source_changes = _changes(base, runtime.effective_experiments(source), hasher)
+    target_changes = _changes(base, merged, hasher)
+    result = MergeResult(source, target, base_timeline, merged)
+
+    for name in sorted(source_changes):
+        theirs = source_changes[name]
+        if name in target_changes:
+            ours = target_changes[name]
+            if hasher.same(theirs, ours):
+                continue
+            conflict = MergeConflict(
+                name,
+                base.get(name),
+                None if theirs is MISSING else theirs,
+                None if ours is MISSING else ours,
+            )
+            if resolver is not None:
+                conflict.resolution = resolver(conflict, list(strategy.arguments), source, target, scores)
+            result.conflicts.append(conflict)
+            if conflict.resolution != "source":
+                continue
+        else:
+            result.applied.append(name)
+        merged = merged.delete(name) if theirs is MISSING else merged.set(name, theirs)
+
+    result.merged = merged
+    return result
+
+
+def evaluate_merge(runtime, statement: MergeStatement, scores: Optional[Scores] = None) -> MergeResult:
+    """Evaluate a recorded ``merge`` statement with its declared strategy."""
+    return three_way_merge(
+        runtime, statement.source_timeline, statement.target_timeline, statement.strategy, scores
+    )
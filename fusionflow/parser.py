@@ -1,6 +1,10 @@
 """Parser for the FusionFlow temporal specification language"""
 
-from .tokens import Token, TokenType
+import sys
+from array import array
+from collections import deque
+
+from .tokens import OPERATOR_PRECEDENCE, TokenBuffer, TokenType
 from .ast_nodes import (
     Program,
     DatasetDeclaration,
@@ -23,17 +27,94 @@ from .ast_nodes import (
     MemberAccess,
 )
 
+# Token type codes used by the parser's comparisons.
+_NUMBER = TokenType.NUMBER.value
+_STRING = TokenType.STRING.value
+_IDENTIFIER = TokenType.IDENTIFIER.value
+_DATASET = TokenType.DATASET.value
+_PIPELINE = TokenType.PIPELINE.value
+_MODEL = TokenType.MODEL.value
+_EXPERIMENT = TokenType.EXPERIMENT.value
+_TIMELINE = TokenType.TIMELINE.value
+_MERGE = TokenType.MERGE.value
+_FROM = TokenType.FROM.value
+_DERIVE = TokenType.DERIVE.value
+_SELECT = TokenType.SELECT.value
+_TARGET = TokenType.TARGET.value
+_EXTEND = TokenType.EXTEND.value
+_SOURCE = TokenType.SOURCE.value
+_SCHEMA = TokenType.SCHEMA.value
+_DESCRIPTION = TokenType.DESCRIPTION.value
+_TYPE = TokenType.TYPE.value
+_PARAMS = TokenType.PARAMS.value
+_USES = TokenType.USES.value
+_METRICS = TokenType.METRICS.value
+_INTO = TokenType.INTO.value
+_BECAUSE = TokenType.BECAUSE.value
+_STRATEGY = TokenType.STRATEGY.value
+_END = TokenType.END.value
+_PLUS = TokenType.PLUS.value
+_MINUS = TokenType.MINUS.value
+_MULTIPLY = TokenType.MULTIPLY.value
+_DIVIDE = TokenType.DIVIDE.value
+_EQUALS = TokenType.EQUALS.value
+_DOUBLE_EQUALS = TokenType.DOUBLE_EQUALS.value
+_NOT_EQUALS = TokenType.NOT_EQUALS.value
+_LESS_THAN = TokenType.LESS_THAN.value
+_GREATER_THAN = TokenType.GREATER_THAN.value
+_LESS_EQUAL = TokenType.LESS_EQUAL.value
+_GREATER_EQUAL = TokenType.GREATER_EQUAL.value
+_AND = TokenType.AND.value
+_OR = TokenType.OR.value
+_NOT = TokenType.NOT.value
+_LPAREN = TokenType.LPAREN.value
+_RPAREN = TokenType.RPAREN.value
+_LBRACKET = TokenType.LBRACKET.value
+_RBRACKET = TokenType.RBRACKET.value
+_LBRACE = TokenType.LBRACE.value
+_RBRACE = TokenType.RBRACE.value
+_COMMA = TokenType.COMMA.value
+_COLON = TokenType.COLON.value
+_DOT = TokenType.DOT.value
+_NEWLINE = TokenType.NEWLINE.value
+_EOF = TokenType.EOF.value
+
+# Binary operator token codes mapped to their binding strength.
+_BINARY_PRECEDENCE = {
+    _OR: OPERATOR_PRECEDENCE["or"],
+    _AND: OPERATOR_PRECEDENCE["and"],
+    _DOUBLE_EQUALS: OPERATOR_PRECEDENCE["=="],
+    _NOT_EQUALS: OPERATOR_PRECEDENCE["!="],
+    _LESS_THAN: OPERATOR_PRECEDENCE["<"],
+    _LESS_EQUAL: OPERATOR_PRECEDENCE["<="],
+    _GREATER_THAN: OPERATOR_PRECEDENCE[">"],
+    _GREATER_EQUAL: OPERATOR_PRECEDENCE[">="],
+    _PLUS: OPERATOR_PRECEDENCE["+"],
+    _MINUS: OPERATOR_PRECEDENCE["-"],
+    _MULTIPLY: OPERATOR_PRECEDENCE["*"],
+    _DIVIDE: OPERATOR_PRECEDENCE["/"],
+}
+
 
 class Parser:
     def __init__(self, tokens):
         self.tokens = tokens
         self.pos = 0
+        # Integer type codes, one per token, so the hot comparisons below
+        # test plain ints instead of resolving TokenType members.
+        if isinstance(tokens, TokenBuffer):
+            self._codes = tokens.types
+        else:
+            self._codes = array('B', [token.code for token in tokens])
 
     def current_token(self):
         if self.pos < len(self.tokens):
             return self.tokens[self.pos]
         return self.tokens[-1]
 
+    def current_type(self):
+        return self._codes[self.pos]
+
     def peek_token(self, offset=1):
         pos = self.pos + offset
         if pos < len(self.tokens):
@@ -45,29 +126,42 @@ class Parser:
             self.pos += 1
 
     def expect(self, token_type):
+        code = token_type.value if isinstance(token_type, TokenType) else token_type
+        if self.current_type() != code:
+            token = self.current_token()
+            raise SyntaxError(f"Expected {TokenType(code)}, got {token.type} at line {token.line}")
         token = self.current_token()
-        if token.type != token_type:
-            raise SyntaxError(f"Expected {token_type}, got {token.type} at line {token.line}")
         self.advance()
         return token
 
     def expect_any(self, *token_types):
-        token = self.current_token()
-        if token.type not in token_types:
-            expected = ', '.join(t.name for t in token_types)
+        codes = [t.value if isinstance(t, TokenType) else t for t in token_types]
+        if self.current_type() not in codes:
+            token = self.current_token()
+            expected = ', '.join(TokenType(code).name for code in codes)
             raise SyntaxError(f"Expected one of ({expected}), got {token.type} at line {token.line}")
+        token = self.current_token()
         self.advance()
         return token
 
+    def expect_name(self):
+        # Names such as dataset, column and metric identifiers repeat across a
+        # spec; interning makes every occurrence share one string object.
+        return sys.intern(self.expect(_IDENTIFIER).value)
+
+    def _unexpected(self, context):
+        token = self.current_token()
+        return SyntaxError(f"Unexpected token {token.type} {context} at line {token.line}")
+
     def skip_newlines(self):
-        while self.current_token().type == TokenType.NEWLINE:
+        while self.current_type() == _NEWLINE:
             self.advance()
 
     def parse(self):
         statements = []
         self.skip_newlines()
 
-        while self.current_token().type != TokenType.EOF:
+        while self.current_type() != _EOF:
             stmt = self.parse_statement()
             if stmt:
                 statements.append(stmt)
@@ -76,56 +170,57 @@ class Parser:
         return Program(statements)
 
     def parse_statement(self):
-        token = self.current_token()
+        kind = self.current_type()
 
-        if token.type == TokenType.DATASET:
+        if kind == _DATASET:
             return self.parse_dataset_declaration()
-        if token.type == TokenType.PIPELINE:
+        if kind == _PIPELINE:
             return self.parse_pipeline_definition()
-        if token.type == TokenType.MODEL:
+        if kind == _MODEL:
             return self.parse_model_definition()
-        if token.type == TokenType.EXPERIMENT:
+        if kind == _EXPERIMENT:
             return self.parse_experiment_definition()
-        if token.type == TokenType.TIMELINE:
+        if kind == _TIMELINE:
             return self.parse_timeline_definition()
-        if token.type == TokenType.MERGE:
+        if kind == _MERGE:
             return self.parse_merge_statement()
-        if token.type == TokenType.NEWLINE:
+        if kind == _NEWLINE:
             self.advance()
             return None
 
+        token = self.current_token()
         raise SyntaxError(f"Unexpected token {token.type} at line {token.line}")
 
     def parse_dataset_declaration(self):
-        self.expect(TokenType.DATASET)
-        name = self.expect(TokenType.IDENTIFIER).value
-        version_token = self.expect_any(TokenType.IDENTIFIER, TokenType.STRING)
-        version = version_token.value
+        self.expect(_DATASET)
+        name = self.expect_name()
+        version_token = self.expect_any(_IDENTIFIER, _STRING)
+        version = sys.intern(version_token.value)
         self.skip_newlines()
 
         source = None
         description = None
         schema_fields = []
 
-        while self.current_token().type != TokenType.END:
-            token = self.current_token()
-            if token.type == TokenType.SOURCE:
+        while self.current_type() != _END:
+            kind = self.current_type()
+            if kind == _SOURCE:
                 self.advance()
-                source = self.expect(TokenType.STRING).value
+                source = self.expect(_STRING).value
                 self.skip_newlines()
-            elif token.type == TokenType.DESCRIPTION:
+            elif kind == _DESCRIPTION:
                 self.advance()
-                description = self.expect(TokenType.STRING).value
+                description = self.expect(_STRING).value
                 self.skip_newlines()
-            elif token.type == TokenType.SCHEMA:
+            elif kind == _SCHEMA:
                 schema_fields = self.parse_schema_block()
                 self.skip_newlines()
-            elif token.type == TokenType.NEWLINE:
+            elif kind == _NEWLINE:
                 self.advance()
             else:
-                raise SyntaxError(f"Unexpected token {token.type} in dataset declaration at line {token.line}")
+                raise self._unexpected("in dataset declaration")
 
-        self.expect(TokenType.END)
+        self.expect(_END)
 
         if source is None:
             raise SyntaxError(f"Dataset '{name}' is missing a source declaration")
@@ -133,55 +228,55 @@ class Parser:
         return DatasetDeclaration(name=name, version=version, source=source, schema=schema_fields, description=description)
 
     def parse_schema_block(self):
-        self.expect(TokenType.SCHEMA)
-        self.expect(TokenType.LBRACE)
+        self.expect(_SCHEMA)
+        self.expect(_LBRACE)
         self.skip_newlines()
 
         fields = []
-        while self.current_token().type != TokenType.RBRACE:
-            field_name = self.expect(TokenType.IDENTIFIER).value
-            self.expect(TokenType.COLON)
-            type_token = self.expect(TokenType.IDENTIFIER)
-            fields.append(SchemaField(field_name, type_token.value))
+        while self.current_type() != _RBRACE:
+            field_name = self.expect_name()
+            self.expect(_COLON)
+            type_name = self.expect_name()
+            fields.append(SchemaField(field_name, type_name))
 
-            if self.current_token().type == TokenType.COMMA:
+            if self.current_type() == _COMMA:
                 self.advance()
-            if self.current_token().type == TokenType.NEWLINE:
+            if self.current_type() == _NEWLINE:
                 self.skip_newlines()
 
-        self.expect(TokenType.RBRACE)
+        self.expect(_RBRACE)
         return fields
 
     def parse_pipeline_definition(self):
-        self.expect(TokenType.PIPELINE)
-        name = self.expect(TokenType.IDENTIFIER).value
+        self.expect(_PIPELINE)
+        name = self.expect_name()
         self.skip_newlines()
 
         source = None
         steps = []
 
-        while self.current_token().type != TokenType.END:
-            token = self.current_token()
-            if token.type == TokenType.FROM:
+        while self.current_type() != _END:
+            kind = self.current_type()
+            if kind == _FROM:
                 if source is not None:
                     raise SyntaxError(f"Pipeline '{name}' has multiple from clauses")
                 source = self.parse_pipeline_source()
                 self.skip_newlines()
-            elif token.type == TokenType.DERIVE:
+            elif kind == _DERIVE:
                 steps.append(self.parse_derive_step())
                 self.skip_newlines()
-            elif token.type == TokenType.SELECT:
+            elif kind == _SELECT:
                 steps.append(self.parse_select_step())
                 self.skip_newlines()
-            elif token.type == TokenType.TARGET:
+            elif kind == _TARGET:
                 steps.append(self.parse_target_step())
                 self.skip_newlines()
-            elif token.type == TokenType.NEWLINE:
+            elif kind == _NEWLINE:
                 self.advance()
             else:
-                raise SyntaxError(f"Unexpected token {token.type} in pipeline definition at line {token.line}")
+                raise self._unexpected("in pipeline definition")
 
-        self.expect(TokenType.END)
+        self.expect(_END)
 
         if source is None:
             raise SyntaxError(f"Pipeline '{name}' is missing a from clause")
@@ -189,63 +284,62 @@ class Parser:
         return PipelineDefinition(name=name, source=source, steps=steps)
 
     def parse_pipeline_source(self):
-        self.expect(TokenType.FROM)
-        dataset = self.expect(TokenType.IDENTIFIER).value
-        version_token = self.expect_any(TokenType.IDENTIFIER, TokenType.STRING)
-        version = version_token.value
+        self.expect(_FROM)
+        dataset = self.expect_name()
+        version_token = self.expect_any(_IDENTIFIER, _STRING)
+        version = sys.intern(version_token.value)
         return DatasetReference(dataset, version)
 
     def parse_derive_step(self):
-        self.expect(TokenType.DERIVE)
-        variable = self.expect(TokenType.IDENTIFIER).value
-        self.expect(TokenType.EQUALS)
+        self.expect(_DERIVE)
+        variable = self.expect_name()
+        self.expect(_EQUALS)
         expression = self.parse_expression()
         return DeriveStep(variable, expression)
 
     def parse_select_step(self):
-        self.expect(TokenType.SELECT)
-        self.expect(TokenType.LBRACKET)
+        self.expect(_SELECT)
+        self.expect(_LBRACKET)
 
         fields = []
-        while self.current_token().type != TokenType.RBRACKET:
-            token = self.expect(TokenType.IDENTIFIER)
-            fields.append(token.value)
-            if self.current_token().type == TokenType.COMMA:
+        while self.current_type() != _RBRACKET:
+            fields.append(self.expect_name())
+            if self.current_type() == _COMMA:
                 self.advance()
-            elif self.current_token().type == TokenType.NEWLINE:
+            elif self.current_type() == _NEWLINE:
                 self.skip_newlines()
 
-        self.expect(TokenType.RBRACKET)
+        self.expect(_RBRACKET)
         return SelectStep(fields)
 
     def parse_target_step(self):
-        self.expect(TokenType.TARGET)
-        target_name = self.expect(TokenType.IDENTIFIER).value
+        self.expect(_TARGET)
+        target_name = self.expect_name()
         return TargetStep(target_name)
 
     def parse_model_definition(self):
-        self.expect(TokenType.MODEL)
-        name = self.expect(TokenType.IDENTIFIER).value
+        self.expect(_MODEL)
+        name = self.expect_name()
         self.skip_newlines()
 
         model_type = None
         params = {}
 
-        while self.current_token().type != TokenType.END:
-            token = self.current_token()
-            if token.type == TokenType.TYPE:
+        while self.current_type() != _END:
+            kind = self.current_type()
+            if kind == _TYPE:
                 self.advance()
-                model_type = self.expect(TokenType.IDENTIFIER).value
+                model_type = self.expect_name()
                 self.skip_newlines()
-            elif token.type == TokenType.PARAMS:
+            elif kind == _PARAMS:
                 params = self.parse_params_block()
                 self.skip_newlines()
-            elif token.type == TokenType.NEWLINE:
+            elif kind == _NEWLINE:
                 self.advance()
             else:
-                raise SyntaxError(f"Unexpected token {token.type} in model definition at line {token.line}")
+                raise self._unexpected("in model definition")
 
-        self.expect(TokenType.END)
+        self.expect(_END)
 
         if model_type is None:
             raise SyntaxError(f"Model '{name}' is missing a type declaration")
@@ -253,28 +347,28 @@ class Parser:
         return ModelDefinition(name=name, type_name=model_type, params=params)
 
     def parse_params_block(self):
-        self.expect(TokenType.PARAMS)
-        self.expect(TokenType.LBRACE)
+        self.expect(_PARAMS)
+        self.expect(_LBRACE)
         self.skip_newlines()
 
         params = {}
-        while self.current_token().type != TokenType.RBRACE:
-            key = self.expect(TokenType.IDENTIFIER).value
-            self.expect(TokenType.COLON)
+        while self.current_type() != _RBRACE:
+            key = self.expect_name()
+            self.expect(_COLON)
             value = self.parse_expression()
             params[key] = value
 
-            if self.current_token().type == TokenType.COMMA:
+            if self.current_type() == _COMMA:
                 self.advance()
-            if self.current_token().type == TokenType.NEWLINE:
+            if self.current_type() == _NEWLINE:
                 self.skip_newlines()
 
-        self.expect(TokenType.RBRACE)
+        self.expect(_RBRACE)
         return params
 
     def parse_experiment_definition(self):
-        self.expect(TokenType.EXPERIMENT)
-        name = self.expect(TokenType.IDENTIFIER).value
+        self.expect(_EXPERIMENT)
+        name = self.expect_name()
         self.skip_newlines()
 
         description = None
@@ -283,42 +377,42 @@ class Parser:
         metrics = []
         extension = None
 
-        while self.current_token().type != TokenType.END:
-            token = self.current_token()
-            if token.type == TokenType.DESCRIPTION:
+        while self.current_type() != _END:
+            kind = self.current_type()
+            if kind == _DESCRIPTION:
                 self.advance()
-                description = self.expect(TokenType.STRING).value
+                description = self.expect(_STRING).value
                 self.skip_newlines()
-            elif token.type == TokenType.USES:
+            elif kind == _USES:
                 self.advance()
-                binding_token = self.current_token()
-                if binding_token.type == TokenType.PIPELINE:
+                binding_kind = self.current_type()
+                if binding_kind == _PIPELINE:
                     self.advance()
-                    pipeline_name = self.expect(TokenType.IDENTIFIER).value
-                elif binding_token.type == TokenType.MODEL:
+                    pipeline_name = self.expect_name()
+                elif binding_kind == _MODEL:
                     self.advance()
-                    model_name = self.expect(TokenType.IDENTIFIER).value
+                    model_name = self.expect_name()
                 else:
-                    binding_type = self.expect(TokenType.IDENTIFIER).value.lower()
+                    binding_type = self.expect_name().lower()
                     if binding_type == 'pipeline':
-                        pipeline_name = self.expect(TokenType.IDENTIFIER).value
+                        pipeline_name = self.expect_name()
                     elif binding_type == 'model':
-                        model_name = self.expect(TokenType.IDENTIFIER).value
+                        model_name = self.expect_name()
                     else:
                         raise SyntaxError(f"Unknown binding type '{binding_type}' in experiment '{name}'")
                 self.skip_newlines()
-            elif token.type == TokenType.METRICS:
+            elif kind == _METRICS:
                 metrics = self.parse_metrics_list()
                 self.skip_newlines()
-            elif token.type == TokenType.EXTEND:
+            elif kind == _EXTEND:
                 extension = self.parse_extension_block()
                 self.skip_newlines()
-            elif token.type == TokenType.NEWLINE:
+            elif kind == _NEWLINE:
                 self.advance()
             else:
-                raise SyntaxError(f"Unexpected token {token.type} in experiment definition at line {token.line}")
+                raise self._unexpected("in experiment definition")
 
-        self.expect(TokenType.END)
+        self.expect(_END)
 
         if pipeline_name is None:
             raise SyntaxError(f"Experiment '{name}' is missing a pipeline binding")
@@ -337,95 +431,95 @@ class Parser:
         )
 
     def parse_metrics_list(self):
-        self.expect(TokenType.METRICS)
-        self.expect(TokenType.LBRACKET)
+        self.expect(_METRICS)
+        self.expect(_LBRACKET)
 
         metrics = []
-        while self.current_token().type != TokenType.RBRACKET:
-            metrics.append(self.expect(TokenType.IDENTIFIER).value)
-            if self.current_token().type == TokenType.COMMA:
+        while self.current_type() != _RBRACKET:
+            metrics.append(self.expect_name())
+            if self.current_type() == _COMMA:
                 self.advance()
-            elif self.current_token().type == TokenType.NEWLINE:
+            elif self.current_type() == _NEWLINE:
                 self.skip_newlines()
 
-        self.expect(TokenType.RBRACKET)
+        self.expect(_RBRACKET)
         return metrics
 
     def parse_extension_block(self):
-        self.expect(TokenType.EXTEND)
-        self.expect(TokenType.LBRACE)
+        self.expect(_EXTEND)
+        self.expect(_LBRACE)
         self.skip_newlines()
 
         steps = []
-        while self.current_token().type != TokenType.RBRACE:
-            token = self.current_token()
-            if token.type == TokenType.DERIVE:
+        while self.current_type() != _RBRACE:
+            kind = self.current_type()
+            if kind == _DERIVE:
                 steps.append(self.parse_derive_step())
                 self.skip_newlines()
-            elif token.type == TokenType.SELECT:
+            elif kind == _SELECT:
                 steps.append(self.parse_select_step())
                 self.skip_newlines()
-            elif token.type == TokenType.TARGET:
+            elif kind == _TARGET:
                 steps.append(self.parse_target_step())
                 self.skip_newlines()
-            elif token.type == TokenType.NEWLINE:
+            elif kind == _NEWLINE:
                 self.advance()
             else:
-                raise SyntaxError(f"Unexpected token {token.type} in extension block at line {token.line}")
+                raise self._unexpected("in extension block")
 
-        self.expect(TokenType.RBRACE)
+        self.expect(_RBRACE)
         return PipelineExtension(steps)
 
     def parse_timeline_definition(self):
-        self.expect(TokenType.TIMELINE)
-        name = self.expect(TokenType.IDENTIFIER).value
+        self.expect(_TIMELINE)
+        name = self.expect_name()
 
         description = None
-        if self.current_token().type == TokenType.STRING:
+        if self.current_type() == _STRING:
             description = self.current_token().value
             self.advance()
 
         self.skip_newlines()
 
         experiments = []
-        while self.current_token().type != TokenType.END:
-            token = self.current_token()
-            if token.type == TokenType.EXPERIMENT:
+        while self.current_type() != _END:
+            kind = self.current_type()
+            if kind == _EXPERIMENT:
                 experiments.append(self.parse_experiment_definition())
                 self.skip_newlines()
-            elif token.type == TokenType.NEWLINE:
+            elif kind == _NEWLINE:
                 self.advance()
             else:
-                raise SyntaxError(f"Unexpected token {token.type} in timeline definition at line {token.line}")
+                raise self._unexpected("in timeline definition")
 
-        self.expect(TokenType.END)
+        self.expect(_END)
         return TimelineDefinition(name=name, description=description, experiments=experiments)
 
     def parse_merge_statement(self):
-        self.expect(TokenType.MERGE)
-        source = self.expect(TokenType.IDENTIFIER).value
-        self.expect(TokenType.INTO)
-        target = self.expect(TokenType.IDENTIFIER).value
+        self.expect(_MERGE)
+        source = self.expect_name()
+        self.expect(_INTO)
+        target = self.expect_name()
         self.skip_newlines()
 
         justification = ""
         strategy = None
 
-        while self.current_token().type != TokenType.END:
-            token = self.current_token()
-            if token.type == TokenType.BECAUSE:
+        while self.current_type() != _END:
+            kind = self.current_type()
+            if kind == _BECAUSE:
                 self.advance()
-                justification = self.expect(TokenType.STRING).value
+                justification = self.expect(_STRING).value
                 self.skip_newlines()
-            elif token.type == TokenType.STRATEGY:
+            elif kind == _STRATEGY:
                 strategy = self.parse_strategy_spec()
                 self.skip_newlines()
-            elif token.type == TokenType.NEWLINE:
+            elif kind == _NEWLINE:
                 self.advance()
             else:
-                raise SyntaxError(f"Unexpected token {token.type} in merge statement at line {token.line}")
+                raise self._unexpected("in merge statement")
 
-        self.expect(TokenType.END)
+        self.expect(_END)
 
         if strategy is None:
             raise SyntaxError("Merge statements must declare a strategy")
@@ -433,83 +527,31 @@ class Parser:
         return MergeStatement(source_timeline=source, target_timeline=target, justification=justification, strategy=strategy)
 
     def parse_strategy_spec(self):
-        self.expect(TokenType.STRATEGY)
-        name = self.expect(TokenType.IDENTIFIER).value
+        self.expect(_STRATEGY)
+        name = self.expect_name()
 
         arguments = []
-        while self.current_token().type in (TokenType.IDENTIFIER, TokenType.STRING):
-            arguments.append(self.current_token().value)
+        while self.current_type() in (_IDENTIFIER, _STRING):
+            arguments.append(sys.intern(self.current_token().value))
             self.advance()
 
         return MergeStrategy(name=name, arguments=arguments)
 
-    def parse_expression(self):
-        return self.parse_or_expression()
-
-    def parse_or_expression(self):
-        left = self.parse_and_expression()
-
-        while self.current_token().type == TokenType.OR:
-            op = self.current_token().value
-            self.advance()
-            right = self.parse_and_expression()
-            left = BinaryOp(left, op, right)
-
-        return left
-
-    def parse_and_expression(self):
-        left = self.parse_comparison_expression()
-
-        while self.current_token().type == TokenType.AND:
-            op = self.current_token().value
-            self.advance()
-            right = self.parse_comparison_expression()
-            left = BinaryOp(left, op, right)
-
-        return left
-
-    def parse_comparison_expression(self):
-        left = self.parse_additive_expression()
-
-        while self.current_token().type in (
-            TokenType.DOUBLE_EQUALS,
-            TokenType.NOT_EQUALS,
-            TokenType.LESS_THAN,
-            TokenType.GREATER_THAN,
-            TokenType.LESS_EQUAL,
-            TokenType.GREATER_EQUAL,
-        ):
-            op = self.current_token().value
-            self.advance()
-            right = self.parse_additive_expression()
-            left = BinaryOp(left, op, right)
-
-        return left
-
-    def parse_additive_expression(self):
-        left = self.parse_multiplicative_expression()
-
-        while self.current_token().type in (TokenType.PLUS, TokenType.MINUS):
-            op = self.current_token().value
-            self.advance()
-            right = self.parse_multiplicative_expression()
-            left = BinaryOp(left, op, right)
-
-        return left
-
-    def parse_multiplicative_expression(self):
+    def parse_expression(self, min_precedence=1):
+        """Precedence climbing over ``_BINARY_PRECEDENCE``; all operators are left-associative."""
         left = self.parse_unary_expression()
 
-        while self.current_token().type in (TokenType.MULTIPLY, TokenType.DIVIDE):
+        while True:
+            precedence = _BINARY_PRECEDENCE.get(self.current_type())
+            if precedence is None or precedence < min_precedence:
+                return left
             op = self.current_token().value
             self.advance()
-            right = self.parse_unary_expression()
+            right = self.parse_expression(precedence + 1)
             left = BinaryOp(left, op, right)
 
-        return left
-
     def parse_unary_expression(self):
-        if self.current_token().type == TokenType.NOT:
+        if self.current_type() == _NOT:
             op = self.current_token().value
             self.advance()
             operand = self.parse_unary_expression()
@@ -518,28 +560,68 @@ class Parser:
         return self.parse_primary_expression()
 
     def parse_primary_expression(self):
-        token = self.current_token()
+        kind = self.current_type()
 
-        if token.type == TokenType.NUMBER:
-            self.advance()
-            return Literal(token.value)
-        if token.type == TokenType.STRING:
+        if kind == _NUMBER or kind == _STRING:
+            token = self.current_token()
             self.advance()
             return Literal(token.value)
-        if token.type == TokenType.IDENTIFIER:
+        if kind == _IDENTIFIER:
+            token = self.current_token()
             self.advance()
-            expr = Identifier(token.value)
+            expr = Identifier(sys.intern(token.value))
 
-            while self.current_token().type == TokenType.DOT:
+            while self.current_type() == _DOT:
                 self.advance()
-                member = self.expect(TokenType.IDENTIFIER).value
+                member = self.expect_name()
                 expr = MemberAccess(expr, member)
 
             return expr
-        if token.type == TokenType.LPAREN:
+        if kind == _LPAREN:
             self.advance()
             expr = self.parse_expression()
-            self.expect(TokenType.RPAREN)
+            self.expect(_RPAREN)
             return expr
 
+        token = self.current_token()
         raise SyntaxError(f"Unexpected token in expression: {token.type} at line {token.line}")
+
+
+class StreamingParser(Parser):
+    """Parser that pulls tokens lazily from an iterator such as ``Lexer.iter_tokens()``.
+
+    Only the current token and whatever ``peek_token`` asked for are buffered,
+    so memory no longer grows with the length of the token stream.
+    """
+
+    def __init__(self, tokens):
+        super().__init__(deque())
+        self._stream = iter(tokens)
+        self._fill(1)
+        if not self.tokens:
+            raise SyntaxError("Token stream is empty; expected at least an EOF token")
+
+    def _fill(self, count):
+        buffer = self.tokens
+        while len(buffer) < count:
+            token = next(self._stream, None)
+            if token is None:
+                return
+            buffer.append(token)
+
+    def current_token(self):
+        return self.tokens[0]
+
+    def current_type(self):
+        return self.tokens[0].code
+
+    def peek_token(self, offset=1):
+        self._fill(offset + 1)
+        if offset < len(self.tokens):
+            return self.tokens[offset]
+        return self.tokens[-1]
+
+    def advance(self):
+        self._fill(2)
+        if len(self.tokens) > 1:
+            self.tokens.popleft()
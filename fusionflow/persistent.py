@@ -0,0 +1,284 @@
+"""Persistent (immutable, structurally shared) hash-array-mapped trie."""
+
+from __future__ import annotations
+
+import zlib
+from collections.abc import Mapping
+from typing import Any, Iterable, Iterator, List, Optional, Tuple, Union
+
+_BITS = 5
+_MASK = (1 << _BITS) - 1
+# Hashes are 32 bits wide; past this shift every bit has been used.
+_MAX_SHIFT = 32
+
+
+def _key_hash(key: Any) -> int:
+    # String keys hash with CRC-32 rather than ``hash()`` so a trie pickled by
+    # one process (e.g. in the compile cache) is still valid in another one
+    # with a different hash seed.
+    if isinstance(key, str):
+        return zlib.crc32(key.encode("utf-8"))
+    return hash(key) & 0xFFFFFFFF
+
+
+def _count_bits(value: int) -> int:
+    return bin(value).count("1")
+
+
+# int.bit_count (3.10+) is several times faster than counting bin() digits.
+_popcount = getattr(int, "bit_count", _count_bits)
+
+
+class _CollisionNode:
+    """Entries whose 32-bit hashes are identical, kept as a flat tuple."""
+
+    __slots__ = ("key_hash", "entries")
+
+    def __init__(self, key_hash: int, entries: Tuple[Tuple[Any, Any], ...]):
+        self.key_hash = key_hash
+        self.entries = entries
+
+    def find(self, shift: int, key_hash: int, key: Any, default: Any) -> Any:
+        for entry_key, value in self.entries:
+            if entry_key == key:
+                return value
+        return default
+
+    def assoc(self, shift: int, key_hash: int, key: Any, value: Any) -> Tuple["_CollisionNode", bool]:
+        for index, (entry_key, entry_value) in enumerate(self.entries):
+            if entry_key == key:
+                if entry_value is value:
+                    return self, False
+                entries = self.entries[:index] + ((key, value),) + self.entries[index + 1:]
+                return _CollisionNode(self.key_hash, entries), False
+        return _CollisionNode(self.key_hash, self.entries + ((key, value),)), True
+
+    def without(self, shift: int, key_hash: int, key: Any) -> Optional["_CollisionNode"]:
+        for index, (entry_key, _) in enumerate(self.entries):
+            if entry_key == key:
+                entries = self.entries[:index] + self.entries[index + 1:]
+                return _CollisionNode(self.key_hash, entries) if entries else None
+        return self
+
+    def items(self) -> Iterator[Tuple[Any, Any]]:
+        return iter(self.entries)
+
+
+class _BitmapNode:
+    """Up to 32 slots indexed by 5 hash bits; ``bitmap`` marks which are present.
+
+    A slot is either a leaf ``(hash, key, value)`` tuple or a child node.
+    """
+
+    __slots__ = ("bitmap", "slots")
+
+    def __init__(self, bitmap: int, slots: Tuple[Any, ...]):
+        self.bitmap = bitmap
+        self.slots = slots
+
+    def find(self, shift: int, key_hash: int, key: Any, default: Any) -> Any:
+        node: Any = self
+        while True:
+            bit = 1 << ((key_hash >> shift) & _MASK)
+            if not node.bitmap & bit:
+                return default
+            slot = node.slots[_popcount(node.bitmap & (bit - 1))]
+            if type(slot) is tuple:
+                return slot[2] if slot[1] == key else default
+            shift += _BITS
+            if type(slot) is _CollisionNode:
+                return slot.find(shift, key_hash, key, default)
+            node = slot
+
+    def assoc(self, shift: int, key_hash: int, key: Any, value: Any) -> Tuple["_BitmapNode", bool]:
+        bit = 1 << ((key_hash >> shift) & _MASK)
+        index = _popcount(self.bitmap & (bit - 1))
+        slots = self.slots
+        if not self.bitmap & bit:
+            return _BitmapNode(self.bitmap | bit, slots[:index] + ((key_hash, key, value),) + slots[index:]), True
+
+        slot = slots[index]
+        if type(slot) is tuple:
+            if slot[1] == key:
+                if slot[2] is value:
+                    return self, False
+                replacement: Any = (key_hash, key, value)
+                added = False
+            else:
+                replacement = _pair(shift + _BITS, slot, (key_hash, key, value))
+                added = True
+        else:
+            replacement, added = slot.assoc(shift + _BITS, key_hash, key, value)
+            if replacement is slot:
+                return self, False
+        return _BitmapNode(self.bitmap, slots[:index] + (replacement,) + slots[index + 1:]), added
+
+    def without(self, shift: int, key_hash: int, key: Any) -> Optional["_BitmapNode"]:
+        bit = 1 << ((key_hash >> shift) & _MASK)
+        if not self.bitmap & bit:
+            return self
+        index = _popcount(self.bitmap & (bit - 1))
+        slot = self.slots[index]
+        if type(slot) is tuple:
+            if slot[1] != key:
+                return self
+            replacement = None
+        else:
+            replacement = slot.without(shift + _BITS, key_hash, key)
+            if replacement is slot:
+                return self
+        if replacement is None:
+            if self.bitmap == bit:
+                return None
+            return _BitmapNode(self.bitmap & ~bit, self.slots[:index] + self.slots[index + 1:])
+        return _BitmapNode(self.bitmap, self.slots[:index] + (replacement,) + self.slots[index + 1:])
+
+    def items(self) -> Iterator[Tuple[Any, Any]]:
+        for slot in self.slots:
+            if type(slot) is tuple:
+                yield slot[1], slot[2]
+            else:
+                yield from slot.items()
+
+
+def _pair(shift: int, first: Tuple[int, Any, Any], second: Tuple[int, Any, Any]) -> Union[_BitmapNode, _CollisionNode]:
+    """The smallest subtree holding two leaves that share the hash bits above ``shift``."""
+    if shift >= _MAX_SHIFT:
+        return _CollisionNode(first[0], ((first[1], first[2]), (second[1], second[2])))
+    first_bits = (first[0] >> shift) & _MASK
+    second_bits = (second[0] >> shift) & _MASK
+    if first_bits == second_bits:
+        return _BitmapNode(1 << first_bits, (_pair(shift + _BITS, first, second),))
+    if first_bits > second_bits:
+        first, second = second, first
+    return _BitmapNode((1 << first_bits) | (1 << second_bits), (first, second))
+
+
+def _slot_items(slot: Any) -> Iterator[Tuple[Any, Any]]:
+    if type(slot) is tuple:
+        return iter(((slot[1], slot[2]),))
+    return slot.items()
+
+
+def _diff_slots(old: Any, new: Any, changes: List[Tuple[Any, Any, Any]]) -> None:
+    """Append ``(key, old, new)`` for entries that differ between two subtrees."""
+    if old is new:
+        # Shared structure: nothing below here can differ.
+        return
+    if type(old) is _BitmapNode and type(new) is _BitmapNode:
+        bits = old.bitmap | new.bitmap
+        while bits:
+            bit = bits & -bits
+            bits ^= bit
+            old_slot = old.slots[_popcount(old.bitmap & (bit - 1))] if old.bitmap & bit else None
+            new_slot = new.slots[_popcount(new.bitmap & (bit - 1))] if new.bitmap & bit else None
+            _diff_slots(old_slot, new_slot, changes)
+        return
+    if type(old) is tuple and type(new) is tuple and old[1] == new[1]:
+        if old[2] is not new[2]:
+            changes.append((old[1], old[2], new[2]))
+        return
+    # A leaf against a subtree, or collision buckets: compare the (few) entries directly.
+    before = dict(_slot_items(old)) if old is not None else {}
+    after = dict(_slot_items(new)) if new is not None else {}
+    for key, value in before.items():
+        other = after.get(key, MISSING)
+        if other is not value:
+            changes.append((key, value, other))
+    for key, value in after.items():
+        if key not in before:
+            changes.append((key, MISSING, value))
+
+
+_EMPTY_ROOT = _BitmapNode(0, ())
+_MISSING = object()
+
+# Stands in for the absent side of an added or removed entry in ``PersistentMap.diff``.
+MISSING = _MISSING
+
+
+class PersistentMap(Mapping):
+    """An immutable mapping whose updates return a new map sharing structure with the old one.
+
+    ``set`` and ``delete`` copy only the ``O(log32 n)`` trie nodes on the
+    path to the key, so keeping every historical version of a map costs a
+    few small nodes per change, and handing a map to someone else is
+    ``O(1)`` because nobody can modify it.
+    """
+
+    __slots__ = ("_root", "_size")
+
+    def __init__(self, items: Union[Mapping, Iterable[Tuple[Any, Any]], None] = None):
+        self._root = _EMPTY_ROOT
+        self._size = 0
+        if items is not None:
+            pairs = items.items() if isinstance(items, Mapping) else items
+            root, size = _EMPTY_ROOT, 0
+            for key, value in pairs:
+                root, added = root.assoc(0, _key_hash(key), key, value)
+                size += added
+            self._root, self._size = root, size
+
+    @classmethod
+    def _from_root(cls, root: _BitmapNode, size: int) -> "PersistentMap":
+        instance = cls.__new__(cls)
+        instance._root = root
+        instance._size = size
+        return instance
+
+    def __getitem__(self, key: Any) -> Any:
+        value = self._root.find(0, _key_hash(key), key, _MISSING)
+        if value is _MISSING:
+            raise KeyError(key)
+        return value
+
+    def get(self, key: Any, default: Any = None) -> Any:
+        return self._root.find(0, _key_hash(key), key, default)
+
+    def __contains__(self, key: object) -> bool:
+        return self._root.find(0, _key_hash(key), key, _MISSING) is not _MISSING
+
+    def __iter__(self) -> Iterator[Any]:
+        for key, _ in self._root.items():
+            yield key
+
+    def __len__(self) -> int:
+        return self._size
+
+    def items(self):  # type: ignore[override]
+        """``(key, value)`` pairs in trie order (stable for a given set of keys, not insertion order)."""
+        return self._root.items()
+
+    def set(self, key: Any, value: Any) -> "PersistentMap":
+        root, added = self._root.assoc(0, _key_hash(key), key, value)
+        if root is self._root:
+            return self
+        return self._from_root(root, self._size + added)
+
+    def delete(self, key: Any) -> "PersistentMap":
+        root = self._root.without(0, _key_hash(key), key)
+        if root is self._root:
+            raise KeyError(key)
+        return self._from_root(root or _EMPTY_ROOT, self._size - 1)
+
+    def update(self, items: Union[Mapping, Iterable[Tuple[Any, Any]]]) -> "PersistentMap":
+        root, size = self._root, self._size
+        pairs = items.items() if isinstance(items, Mapping) else items
+        for key, value in pairs:
+            root, added = root.assoc(0, _key_hash(key), key, value)
+            size += added
+        return self._from_root(root, size)
+
+    def diff(self, other: "PersistentMap") -> List[Tuple[Any, Any, Any]]:
+        """``(key, value here, value in other)`` for every entry that differs; ``MISSING`` marks an absent side.
+
+        Values are compared by identity. Subtrees the two maps share are
+        skipped without being visited, so diffing a map against a version
+        derived from it costs time proportional to the changes, not the size.
+        """
+        changes: List[Tuple[Any, Any, Any]] = []
+        _diff_slots(self._root, other._root, changes)
+        return changes
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({dict(self.items())!r})"
@@ -0,0 +1,296 @@
+"""Indexed queries over a compiled registry: ``fusionflow query``.
+
+A query names an entity kind and optional conditions joined by ``and``::
+
+    experiments where pipeline = churn_features and metric = f1
+    timelines where metric = f1
+    datasets where name = customers and version >= v2 and version < v10
+
+Every condition is answered from an inverted index (or, for versions, a
+sorted key list) built once per registry and cached with the compile
+results, so no query loops over ``runtime.timelines``.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import re
+from array import array
+from bisect import bisect_left, bisect_right
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Union
+
+from .compile_cache import CompileCache
+from .ir_binary import is_binary_ir
+from .lexer import Lexer
+from .runtime import Runtime
+from .tokens import TokenType
+
+_VERSION_PART = re.compile(r"(\d+)")
+
+# Only version fields accept ordering comparisons.
+_RANGE_OPS = ("<", "<=", ">", ">=")
+
+# Tokens that may be glued together (no blanks between them) into one value.
+_VALUE_TOKENS = {
+    TokenType.IDENTIFIER,
+    TokenType.NUMBER,
+    TokenType.STRING,
+    TokenType.DOT,
+    TokenType.MINUS,
+    TokenType.COLON,
+}
+_OPERATOR_TOKENS = {
+    TokenType.EQUALS: "=",
+    TokenType.DOUBLE_EQUALS: "==",
+    TokenType.NOT_EQUALS: "!=",
+    TokenType.LESS_THAN: "<",
+    TokenType.LESS_EQUAL: "<=",
+    TokenType.GREATER_THAN: ">",
+    TokenType.GREATER_EQUAL: ">=",
+}
+
+
+def version_key(version: str) -> Tuple[Tuple[int, int, str], ...]:
+    """Natural sort key: ``v2 < v10`` and ``1.9 < 1.10``."""
+    return tuple(
+        (0, int(part), "") if part.isdigit() else (1, 0, part)
+        for part in _VERSION_PART.split(version)
+        if part
+    )
+
+
+def _intersect(first: array, second: array) -> array:
+    """Intersection of two sorted id arrays, bisecting the larger one."""
+    if len(first) > len(second):
+        first, second = second, first
+    result = array("I")
+    size = len(second)
+    low = 0
+    for item in first:
+        low = bisect_left(second, item, low)
+        if low == size:
+            break
+        if second[low] == item:
+            result.append(item)
+    return result
+
+
+class _Table:
+    """Labels of one entity kind plus ``field -> value -> sorted ids`` postings."""
+
+    def __init__(self, ranged: Iterable[str] = ()):
+        self.labels: List[str] = []
+        self.postings: Dict[str, Dict[str, array]] = {}
+        self.ranged = set(ranged)
+        # field -> (sorted version keys, ids in the same order)
+        self.ordered: Dict[str, Tuple[List[Any], array]] = {}
+
+    def add(self, label: str, fields: Dict[str, List[str]]) -> None:
+        item = len(self.labels)
+        self.labels.append(label)
+        for field, values in fields.items():
+            postings = self.postings.setdefault(field, {})
+            for value in dict.fromkeys(values) if len(values) > 1 else values:
+                ids = postings.get(value)
+                if ids is None:
+                    ids = postings[value] = array("I")
+                ids.append(item)
+
+    def finish(self) -> None:
+        for field in self.ranged:
+            pairs = sorted(
+                (version_key(value), item)
+                for value, items in self.postings.get(field, {}).items()
+                for item in items
+            )
+            self.ordered[field] = ([key for key, _ in pairs], array("I", (item for _, item in pairs)))
+
+    def select(self, field: str, op: str, value: str) -> array:
+        if field not in self.postings:
+            raise ValueError(f"Unknown field '{field}'; expected one of: {', '.join(sorted(self.postings))}")
+        if op in _RANGE_OPS:
+            if field not in self.ranged:
+                raise ValueError(f"Field '{field}' only supports =, == and !=")
+            keys, items = self.ordered[field]
+            bound = version_key(value)
+            if op == "<":
+                selected = items[: bisect_left(keys, bound)]
+            elif op == "<=":
+                selected = items[: bisect_right(keys, bound)]
+            elif op == ">":
+                selected = items[bisect_right(keys, bound):]
+            else:
+                selected = items[bisect_left(keys, bound):]
+            return array("I", sorted(selected))
+        matches = self.postings[field].get(value, array("I"))
+        if op == "!=":
+            excluded = set(matches)
+            return array("I", (item for item in range(len(self.labels)) if item not in excluded))
+        return matches
+
+    def query(self, conditions: List[Tuple[str, str, str]]) -> List[str]:
+        if not conditions:
+            return list(self.labels)
+        selections = sorted((self.select(*condition) for condition in conditions), key=len)
+        result = selections[0]
+        for selection in selections[1:]:
+            if not result:
+                break
+            result = _intersect(result, selection)
+        labels = self.labels
+        return [labels[item] for item in result]
+
+
+class RegistryIndex:
+    """Inverted indexes over one registry, answering :func:`parse_query` conditions.
+
+    Experiments are labelled ``timeline/experiment``, datasets
+    ``name:version``; everything else by name. Labels come back in
+    registry order.
+    """
+
+    def __init__(self, runtime: Runtime):
+        self.tables: Dict[str, _Table] = {
+            "experiments": _Table(),
+            "timelines": _Table(),
+            "pipelines": _Table(ranged=("version",)),
+            "datasets": _Table(ranged=("version",)),
+            "models": _Table(),
+        }
+        for (name, version), declaration in runtime.datasets.items():
+            self.tables["datasets"].add(
+                f"{name}:{version}", {"name": [name], "version": [version], "source": [declaration.source]}
+            )
+        pipeline_datasets: Dict[str, str] = {}
+        for name, pipeline in runtime.pipelines.items():
+            pipeline_datasets[name] = pipeline.source.name
+            self.tables["pipelines"].add(
+                name,
+                {
+                    "name": [name],
+                    "dataset": [pipeline.source.name, f"{pipeline.source.name}:{pipeline.source.version}"],
+                    "version": [pipeline.source.version],
+                },
+            )
+        for name, model in runtime.models.items():
+            self.tables["models"].add(name, {"name": [name], "type": [model.type_name]})
+
+        for timeline, spec in runtime.timelines.items():
+            pipelines: List[str] = []
+            models: List[str] = []
+            metrics: List[str] = []
+            for name, experiment in spec.experiments.items():
+                self.tables["experiments"].add(
+                    f"{timeline}/{name}",
+                    {
+                        "name": [name],
+                        "timeline": [timeline],
+                        "pipeline": [experiment.pipeline],
+                        "model": [experiment.model],
+                        "metric": experiment.metrics,
+                        "dataset": [pipeline_datasets.get(experiment.pipeline, "")],
+                    },
+                )
+                pipelines.append(experiment.pipeline)
+                models.append(experiment.model)
+                metrics.extend(experiment.metrics)
+            self.tables["timelines"].add(
+                timeline,
+                {
+                    "name": [timeline],
+                    "parent": [spec.parent or ""],
+                    "pipeline": pipelines,
+                    "model": models,
+                    "metric": metrics,
+                },
+            )
+        for table in self.tables.values():
+            table.finish()
+
+    def query(self, text: str) -> List[str]:
+        entity, conditions = parse_query(text)
+        table = self.tables.get(entity)
+        if table is None:
+            raise ValueError(f"Unknown entity '{entity}'; expected one of: {', '.join(self.tables)}")
+        return table.query(conditions)
+
+
+def parse_query(text: str) -> Tuple[str, List[Tuple[str, str, str]]]:
+    """Split a query into its entity kind and ``(field, op, value)`` conditions."""
+    buffer = Lexer(text).tokenize_compact()
+    source = buffer.source
+    types = [token.type for token in buffer]
+    count = len(types) - 1  # drop EOF
+    position = 0
+
+    def word(index: int) -> str:
+        return source[buffer.starts[index]:buffer.ends[index]]
+
+    def expect_word(what: str) -> str:
+        nonlocal position
+        if position >= count or not word(position).isidentifier():
+            raise SyntaxError(f"Expected {what} in query '{text}'")
+        position += 1
+        return word(position - 1)
+
+    entity = expect_word("an entity kind")
+    if entity in ("experiment", "timeline", "pipeline", "dataset", "model"):
+        entity += "s"
+    conditions: List[Tuple[str, str, str]] = []
+    if position < count:
+        if word(position) != "where":
+            raise SyntaxError(f"Expected 'where' after '{entity}' in query '{text}'")
+        position += 1
+        while True:
+            field = expect_word("a field name")
+            if position >= count or types[position] not in _OPERATOR_TOKENS:
+                raise SyntaxError(f"Expected a comparison after '{field}' in query '{text}'")
+            op = _OPERATOR_TOKENS[types[position]]
+            position += 1
+            if position >= count or types[position] not in _VALUE_TOKENS:
+                raise SyntaxError(f"Expected a value after '{field} {op}' in query '{text}'")
+            first = position
+            position += 1
+            # Glue adjacent tokens so values like ``v1.2`` or ``customers:v1`` stay whole.
+            while (
+                position < count
+                and types[position] in _VALUE_TOKENS
+                and buffer.starts[position] == buffer.ends[position - 1]
+            ):
+                position += 1
+            if position - first == 1 and types[first] == TokenType.STRING:
+                value = buffer.value(first)
+            else:
+                value = source[buffer.starts[first]:buffer.ends[position - 1]]
+            conditions.append((field, op, value))
+            if position >= count:
+                break
+            if types[position] != TokenType.AND:
+                raise SyntaxError(f"Expected 'and' between conditions in query '{text}'")
+            position += 1
+    return entity, conditions
+
+
+def load_index(path: Union[str, Path], cache: Optional[CompileCache] = None) -> RegistryIndex:
+    """Build (or fetch from ``cache``) the index for a ``.ff`` spec or a compiled IR file."""
+    from .compiler import load_runtime
+
+    data = Path(path).read_bytes()
+    is_ir = is_binary_ir(data) or data.lstrip()[:1] == b"{"
+    if is_ir:
+        key_source, kind = hashlib.blake2b(data, digest_size=32).hexdigest(), "index:ir"
+    else:
+        key_source, kind = data.decode("utf-8"), "index"
+
+    key = cache.key(key_source, kind) if cache is not None else None
+    if key is not None:
+        cached = cache.get(key)
+        if cached is not None:
+            return cached
+
+    runtime = Runtime.from_ir(path) if is_ir else load_runtime(key_source, cache)[0]
+    index = RegistryIndex(runtime)
+    if key is not None:
+        cache.put(key, index)
+    return index
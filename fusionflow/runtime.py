@@ -3,6 +3,8 @@
 from dataclasses import dataclass, field
 from typing import Dict, List, Optional, Tuple
 
+from .ancestry import AncestryIndex
+from .persistent import PersistentMap
 from .ast_nodes import (
     DatasetDeclaration,
     DatasetReference,
@@ -19,6 +21,9 @@ class TimelineSpec:
     description: Optional[str] = None
     parent: Optional[str] = None
     experiments: Dict[str, ExperimentDefinition] = field(default_factory=dict)
+    # How many of the parent's own experiments existed when this timeline
+    # branched; ``None`` means all of them.
+    forked_at: Optional[int] = None
 
 
 class Runtime:
@@ -32,6 +37,28 @@ class Runtime:
         self.experiments_index: Dict[Tuple[str, str], ExperimentDefinition] = {}
         self.merges: List[MergeStatement] = []
         self.current_timeline = 'main'
+        # Reverse indexes and timeline ancestry, kept up to date by the
+        # register_* methods; see ``invalidate_indexes`` for bulk loads.
+        self._pipelines_by_dataset: Dict[Tuple[str, str], List[str]] = {}
+        self._experiments_by_pipeline: Dict[str, List[Tuple[str, str]]] = {}
+        self._experiments_by_model: Dict[str, List[Tuple[str, str]]] = {}
+        self._ancestry = AncestryIndex()
+        self._ancestry.add('main')
+        self._indexed = True
+        # Effective experiment views per timeline, built on first use.
+        self._effective: Optional[Dict[str, PersistentMap]] = None
+        self._bases: Dict[str, PersistentMap] = {}
+
+    @classmethod
+    def from_ir(cls, path) -> "Runtime":
+        """Rebuild the registry from a compiled ``.tir.json`` or binary IR file.
+
+        No source is lexed or parsed; timelines and experiments are decoded
+        lazily the first time they are accessed.
+        """
+        from .ir_loader import runtime_from_ir
+
+        return runtime_from_ir(path)
 
     @staticmethod
     def _dataset_key(name: str, version: str) -> Tuple[str, str]:
@@ -54,6 +81,9 @@ class Runtime:
                 f"Pipeline '{definition.name}' references unknown dataset '{definition.source.name}' version '{definition.source.version}'"
             )
         self.pipelines[definition.name] = definition
+        if self._indexed:
+            key = self._dataset_key(definition.source.name, definition.source.version)
+            self._pipelines_by_dataset.setdefault(key, []).append(definition.name)
 
     def register_model(self, definition: ModelDefinition):
         if definition.name in self.models:
@@ -81,6 +111,10 @@ class Runtime:
 
         timeline_spec.experiments[experiment.name] = experiment
         self.experiments_index[(timeline, experiment.name)] = experiment
+        if self._indexed:
+            self._index_experiment(timeline, experiment)
+        if self._effective is not None:
+            self._effective[timeline] = self._effective[timeline].set(experiment.name, experiment)
 
     def create_timeline(self, name: str, description: Optional[str], parent: Optional[str] = None):
         if name in self.timelines:
@@ -90,7 +124,15 @@ class Runtime:
         if source_parent not in self.timelines:
             raise ValueError(f"Parent timeline '{source_parent}' does not exist")
 
-        self.timelines[name] = TimelineSpec(name=name, description=description, parent=source_parent)
+        forked_at = len(self.timelines[source_parent].experiments)
+        self.timelines[name] = TimelineSpec(
+            name=name, description=description, parent=source_parent, forked_at=forked_at
+        )
+        if self._indexed:
+            self._ancestry.add(name, source_parent)
+        if self._effective is not None:
+            # Branching shares the parent's current view: O(1), nothing is copied.
+            self._bases[name] = self._effective[name] = self._effective[source_parent]
 
     def record_merge(self, statement: MergeStatement):
         if statement.source_timeline not in self.timelines:
@@ -98,3 +140,155 @@ class Runtime:
         if statement.target_timeline not in self.timelines:
             raise ValueError(f"Cannot merge into unknown timeline '{statement.target_timeline}'")
         self.merges.append(statement)
+
+    def _index_experiment(self, timeline: str, experiment: ExperimentDefinition):
+        ref = (timeline, experiment.name)
+        self._experiments_by_pipeline.setdefault(experiment.pipeline, []).append(ref)
+        self._experiments_by_model.setdefault(experiment.model, []).append(ref)
+
+    def invalidate_indexes(self):
+        """Mark the reverse and ancestry indexes stale after the registry maps were replaced.
+
+        They are rebuilt from ``pipelines`` and ``timelines`` by the next query.
+        """
+        self._indexed = False
+        self._effective = None
+
+    def _ensure_indexes(self):
+        if self._indexed:
+            return
+        self._pipelines_by_dataset = {}
+        for name, definition in self.pipelines.items():
+            key = self._dataset_key(definition.source.name, definition.source.version)
+            self._pipelines_by_dataset.setdefault(key, []).append(name)
+        self._experiments_by_pipeline = {}
+        self._experiments_by_model = {}
+        self._ancestry = AncestryIndex()
+        for spec in self._timelines_parents_first():
+            self._ancestry.add(spec.name, spec.parent)
+        for timeline, spec in self.timelines.items():
+            for experiment in spec.experiments.values():
+                self._index_experiment(timeline, experiment)
+        self._indexed = True
+
+    def _timelines_parents_first(self) -> List[TimelineSpec]:
+        ordered: List[TimelineSpec] = []
+        placed = set()
+        pending = list(self.timelines.values())
+        # Parents normally precede their children; defer any that do not.
+        while pending:
+            deferred = []
+            for spec in pending:
+                if spec.parent is None or spec.parent in placed:
+                    ordered.append(spec)
+                    placed.add(spec.name)
+                else:
+                    deferred.append(spec)
+            if len(deferred) == len(pending):
+                raise ValueError(f"Parent timeline '{deferred[0].parent}' does not exist")
+            pending = deferred
+        return ordered
+
+    def _ensure_effective(self) -> Dict[str, PersistentMap]:
+        if self._effective is not None:
+            return self._effective
+        ordered = self._timelines_parents_first()
+        forks: Dict[str, Dict[int, List[str]]] = {}
+        for spec in ordered:
+            if spec.parent is not None:
+                parent_size = len(self.timelines[spec.parent].experiments)
+                point = parent_size if spec.forked_at is None else min(spec.forked_at, parent_size)
+                forks.setdefault(spec.parent, {}).setdefault(point, []).append(spec.name)
+
+        empty = PersistentMap()
+        bases: Dict[str, PersistentMap] = {}
+        effective: Dict[str, PersistentMap] = {}
+        for spec in ordered:
+            state = bases.setdefault(spec.name, empty)
+            children = forks.get(spec.name, {})
+            for index, (name, experiment) in enumerate(spec.experiments.items()):
+                for child in children.get(index, ()):
+                    bases[child] = state
+                state = state.set(name, experiment)
+            for child in children.get(len(spec.experiments), ()):
+                bases[child] = state
+            effective[spec.name] = state
+        self._bases = bases
+        self._effective = effective
+        return effective
+
+    def effective_experiments(self, timeline: str) -> PersistentMap:
+        """Every experiment visible on ``timeline``: its own plus those inherited when it branched.
+
+        A timeline sees its parent's experiments as they were at the moment
+        it branched (later additions to the parent are not inherited), and
+        its own experiments override inherited ones of the same name. Views
+        are persistent maps sharing structure along the branch hierarchy.
+        """
+        effective = self._ensure_effective()
+        if timeline not in effective:
+            raise ValueError(f"Timeline '{timeline}' is not defined")
+        return effective[timeline]
+
+    def branch_base(self, timeline: str) -> PersistentMap:
+        """The parent's effective experiments at the moment ``timeline`` branched (empty for roots)."""
+        self._ensure_effective()
+        if timeline not in self._bases:
+            raise ValueError(f"Timeline '{timeline}' is not defined")
+        return self._bases[timeline]
+
+    def merge_base(self, source: str, target: str) -> Tuple[str, PersistentMap]:
+        """The lowest common ancestor of two timelines and its experiments when their histories split.
+
+        That is the ancestor's view at the earlier of the two points where
+        the paths to ``source`` and ``target`` branched off it (or its
+        current view when one timeline is the ancestor of the other and has
+        not branched since).
+        """
+        ancestor = self.lowest_common_ancestor(source, target)
+        if ancestor is None:
+            raise ValueError(f"Timelines '{source}' and '{target}' share no history")
+        depth = self._ancestry.depth(ancestor)
+        forks = [
+            self._ancestry.ancestor(name, depth + 1) for name in (source, target) if name != ancestor
+        ]
+        if not forks:
+            return ancestor, self.effective_experiments(ancestor)
+        parent_size = len(self.timelines[ancestor].experiments)
+
+        def fork_point(child: str) -> int:
+            forked_at = self.timelines[child].forked_at
+            return parent_size if forked_at is None else forked_at
+
+        return ancestor, self.branch_base(min(forks, key=fork_point))
+
+    def evaluate_merge(self, statement: MergeStatement, scores=None):
+        """Three-way merge ``statement``'s source into its target; see ``merge_algorithm.evaluate_merge``."""
+        from .merge_algorithm import evaluate_merge
+
+        return evaluate_merge(self, statement, scores)
+
+    def pipelines_using_dataset(self, name: str, version: str) -> List[str]:
+        """Names of the pipelines reading dataset ``name`` at ``version``, in declaration order."""
+        self._ensure_indexes()
+        return list(self._pipelines_by_dataset.get(self._dataset_key(name, version), ()))
+
+    def experiments_using_pipeline(self, name: str) -> List[Tuple[str, str]]:
+        """``(timeline, experiment)`` keys of every experiment built on pipeline ``name``."""
+        self._ensure_indexes()
+        return list(self._experiments_by_pipeline.get(name, ()))
+
+    def experiments_using_model(self, name: str) -> List[Tuple[str, str]]:
+        """``(timeline, experiment)`` keys of every experiment that trains model ``name``."""
+        self._ensure_indexes()
+        return list(self._experiments_by_model.get(name, ()))
+
+    def is_ancestor(self, ancestor: str, timeline: str) -> bool:
+        """Whether ``ancestor`` is ``timeline`` itself or one of the timelines it branched from."""
+        self._ensure_indexes()
+        return self._ancestry.is_ancestor(ancestor, timeline)
+
+    def lowest_common_ancestor(self, first: str, second: str) -> Optional[str]:
+        """The most recent timeline both ``first`` and ``second`` descend from."""
+        self._ensure_indexes()
+        return self._ancestry.lowest_common_ancestor(first, second)
@@ -1,5 +1,6 @@
 """Token definitions for FusionFlow lexer"""
 
+from array import array
 from enum import Enum, auto
 
 class TokenType(Enum):
@@ -63,12 +64,81 @@ class TokenType(Enum):
     NEWLINE = auto()
     EOF = auto()
 
+# Binding strength of binary operators, shared by the parser and the IR
+# expression renderer so both agree on where parentheses are needed.
+OPERATOR_PRECEDENCE = {
+    "or": 1,
+    "and": 2,
+    "==": 3,
+    "!=": 3,
+    "<": 4,
+    "<=": 4,
+    ">": 4,
+    ">=": 4,
+    "+": 5,
+    "-": 5,
+    "*": 6,
+    "/": 6,
+}
+
+
 class Token:
+    __slots__ = ('type', 'value', 'line', 'column', 'code')
+
     def __init__(self, type: TokenType, value, line: int, column: int):
         self.type = type
         self.value = value
         self.line = line
         self.column = column
+        self.code = type._value_
     
     def __repr__(self):
         return f"Token({self.type}, {self.value!r}, {self.line}, {self.column})"
+
+
+_TYPES_BY_CODE = {member.value: member for member in TokenType}
+
+
+class TokenBuffer:
+    """Compact token storage over the original source text.
+
+    Token types, start/end offsets and line numbers live in parallel
+    ``array``s; values and columns are only computed when a token is read,
+    so a million tokens cost tens of bytes each instead of a full ``Token``.
+    Indexing returns a freshly built ``Token``.
+    """
+
+    def __init__(self, source: str, convert):
+        self.source = source
+        self.types = array('B')
+        self.starts = array('q')
+        self.ends = array('q')
+        self.lines = array('q')
+        # Callable(code, text) -> value, supplied by the lexer so literal
+        # decoding rules stay in one place.
+        self._convert = convert
+
+    def append(self, code: int, start: int, end: int, line: int):
+        self.types.append(code)
+        self.starts.append(start)
+        self.ends.append(end)
+        self.lines.append(line)
+
+    def __len__(self):
+        return len(self.types)
+
+    def value(self, index: int):
+        return self._convert(self.types[index], self.source[self.starts[index]:self.ends[index]])
+
+    def column(self, index: int) -> int:
+        start = self.starts[index]
+        return start - self.source.rfind('\n', 0, start)
+
+    def __getitem__(self, index: int) -> Token:
+        if index < 0:
+            index += len(self.types)
+        return Token(_TYPES_BY_CODE[self.types[index]], self.value(index), self.lines[index], self.column(index))
+
+    def __iter__(self):
+        for index in range(len(self.types)):
+            yield self[index]
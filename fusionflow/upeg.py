@@ -1,7 +1,7 @@
 """UPEG - Unified Polyglot Execution Graph"""
 
 from dataclasses import dataclass
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 
 @dataclass
 class UPEGNode:
@@ -18,10 +18,16 @@ class UPEG:
     def __init__(self):
         self.nodes = []
         self.edges = []
+        self._by_id: Dict[str, UPEGNode] = {}
     
     def add_node(self, node: UPEGNode):
         """Add a node to the graph"""
         self.nodes.append(node)
+        self._by_id[node.id] = node
+    
+    def get_node(self, node_id: str) -> Optional[UPEGNode]:
+        """Look up a node by id"""
+        return self._by_id.get(node_id)
     
     def add_edge(self, from_node: str, to_node: str):
         """Add an edge between nodes"""
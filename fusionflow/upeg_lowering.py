@@ -0,0 +1,194 @@
+"""Lower a FusionFlow registry into a UPEG, sharing identical subgraphs.
+
+Every dataset read, pipeline step, model fit and evaluation becomes a
+:class:`~fusionflow.upeg.UPEGNode`. Nodes are hash-consed: a node's id is a
+structural hash of its operation, its metadata and the ids of its inputs, and
+asking for a node that already exists returns the existing one. Ten
+experiments that use ``churn_features`` therefore feed from one chain of
+pipeline nodes, and two pipelines that start with the same read and derives
+share that prefix.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from .ast_nodes import DatasetDeclaration, ExperimentDefinition, PipelineStep
+from .ir_export import ExpressionRenderer, _serialize_model, _serialize_steps, entity_hash
+from .runtime import Runtime
+from .upeg import UPEG, UPEGNode
+
+
+@dataclass
+class LoweringReport:
+    """How many nodes lowering asked for and how many were actually created, per operation."""
+
+    requested: Dict[str, int] = field(default_factory=dict)
+    created: Dict[str, int] = field(default_factory=dict)
+
+    @property
+    def total_requested(self) -> int:
+        return sum(self.requested.values())
+
+    @property
+    def total_created(self) -> int:
+        return sum(self.created.values())
+
+    @property
+    def deduplicated(self) -> int:
+        return self.total_requested - self.total_created
+
+    def summary(self) -> str:
+        lines = [
+            f"{self.total_requested} nodes requested, {self.total_created} created, "
+            f"{self.deduplicated} deduplicated"
+        ]
+        for operation in sorted(self.requested):
+            requested = self.requested[operation]
+            created = self.created.get(operation, 0)
+            lines.append(f"  {operation:<9} {requested:>9} -> {created:>9}")
+        return "\n".join(lines)
+
+
+class UPEGBuilder:
+    """Adds nodes to a UPEG, returning the existing node for a repeated request."""
+
+    def __init__(self, graph: Optional[UPEG] = None):
+        self.graph = graph if graph is not None else UPEG()
+        self.report = LoweringReport()
+
+    def node(
+        self,
+        operation: str,
+        inputs: Sequence[str],
+        metadata: Dict[str, Any],
+        outputs: Sequence[str] = (),
+    ) -> str:
+        """Id of the node computing ``operation`` over ``inputs``; created on first request."""
+        node_id = entity_hash(f"upeg:{operation}", metadata, *inputs)
+        requested = self.report.requested
+        requested[operation] = requested.get(operation, 0) + 1
+        if self.graph.get_node(node_id) is None:
+            self.graph.add_node(UPEGNode(node_id, operation, list(inputs), list(outputs), metadata))
+            for source in inputs:
+                self.graph.add_edge(source, node_id)
+            created = self.report.created
+            created[operation] = created.get(operation, 0) + 1
+        return node_id
+
+    def replay(self, operations: Sequence[str]) -> None:
+        """Count requests for a chain of nodes known to exist already (a memoised lowering)."""
+        requested = self.report.requested
+        for operation in operations:
+            requested[operation] = requested.get(operation, 0) + 1
+
+
+@dataclass
+class LoweredRegistry:
+    """The UPEG of a registry plus where its pipelines and experiments end up in it.
+
+    ``pipelines`` maps a pipeline name to the node producing its output;
+    ``experiments`` maps ``(timeline, experiment)`` to its ``evaluate`` node.
+    """
+
+    graph: UPEG
+    report: LoweringReport
+    pipelines: Dict[str, str] = field(default_factory=dict)
+    experiments: Dict[Tuple[str, str], str] = field(default_factory=dict)
+
+
+class _Lowering:
+    def __init__(self, runtime: Runtime):
+        self.runtime = runtime
+        self.builder = UPEGBuilder()
+        self.renderer = ExpressionRenderer()
+        # Pipeline name -> (output node, operations of its chain), for replaying shared chains.
+        self._pipelines: Dict[str, Tuple[str, List[str]]] = {}
+        # (input node, model name) -> fit and (fit, metrics) -> evaluate, so the
+        # common case skips building and hashing the metadata again.
+        self._fits: Dict[Tuple[str, str], str] = {}
+        self._evaluations: Dict[Tuple[str, Tuple[str, ...]], str] = {}
+
+    def read(self, dataset: DatasetDeclaration) -> str:
+        # The description does not change what is read, so it is left out of the hash.
+        schema = [column.name for column in dataset.schema]
+        metadata = {
+            "dataset": dataset.name,
+            "version": dataset.version,
+            "source": dataset.source,
+            "schema": {column.name: column.type_name for column in dataset.schema},
+        }
+        return self.builder.node("read", [], metadata, schema)
+
+    def steps(self, node_id: str, steps: Sequence[PipelineStep], operations: List[str]) -> str:
+        for payload in _serialize_steps(list(steps), self.renderer):
+            operation = payload.pop("type")
+            if operation == "derive":
+                outputs = [payload["target"]]
+            elif operation == "select":
+                outputs = list(payload["fields"])
+            else:
+                outputs = [payload["field"]]
+            node_id = self.builder.node(operation, [node_id], payload, outputs)
+            operations.append(operation)
+        return node_id
+
+    def pipeline(self, name: str, replay: bool = True) -> str:
+        lowered = self._pipelines.get(name)
+        if lowered is not None:
+            if replay:
+                self.builder.replay(lowered[1])
+            return lowered[0]
+        pipeline = self.runtime.pipelines.get(name)
+        if pipeline is None:
+            raise ValueError(f"Pipeline '{name}' is not defined")
+        dataset = self.runtime.get_dataset(pipeline.source)
+        if dataset is None:
+            raise ValueError(
+                f"Dataset '{pipeline.source.name}' version '{pipeline.source.version}' "
+                f"used by pipeline '{name}' is not defined"
+            )
+        operations = ["read"]
+        output = self.steps(self.read(dataset), pipeline.steps, operations)
+        self._pipelines[name] = (output, operations)
+        return output
+
+    def experiment(self, experiment: ExperimentDefinition) -> str:
+        node_id = self.pipeline(experiment.pipeline)
+        if experiment.extension is not None:
+            node_id = self.steps(node_id, experiment.extension.steps, [])
+        fit = self._fits.get((node_id, experiment.model))
+        if fit is None:
+            model = self.runtime.models.get(experiment.model)
+            if model is None:
+                raise ValueError(f"Model '{experiment.model}' is not defined")
+            # A fit depends on the model's type and params, not the name it is registered under.
+            fit = self._fits[node_id, experiment.model] = self.builder.node(
+                "fit", [node_id], _serialize_model(model), ["model"]
+            )
+        else:
+            self.builder.replay(["fit"])
+
+        metrics = tuple(experiment.metrics)
+        evaluation = self._evaluations.get((fit, metrics))
+        if evaluation is None:
+            evaluation = self._evaluations[fit, metrics] = self.builder.node(
+                "evaluate", [fit], {"metrics": list(metrics)}, list(metrics)
+            )
+        else:
+            self.builder.replay(["evaluate"])
+        return evaluation
+
+
+def lower_runtime(runtime: Runtime) -> LoweredRegistry:
+    """Lower every pipeline and every timeline's own experiments into one shared UPEG."""
+    lowering = _Lowering(runtime)
+    lowered = LoweredRegistry(lowering.builder.graph, lowering.builder.report)
+    for timeline in runtime.timelines.values():
+        for experiment in timeline.experiments.values():
+            lowered.experiments[timeline.name, experiment.name] = lowering.experiment(experiment)
+    # Pipelines no experiment uses are lowered too; the others are not requested again.
+    for name in runtime.pipelines:
+        lowered.pipelines[name] = lowering.pipeline(name, replay=False)
+    return lowered
@@ -0,0 +1,412 @@
+"""Optimizer passes over a lowered UPEG.
+
+Each pass takes a graph and the ids of nodes whose output is observed from
+outside (pipeline outputs, experiment results), and returns a new graph, a
+map from old to new node ids and the number of rewrites it made. Graphs are
+rebuilt through :class:`~fusionflow.upeg_lowering.UPEGBuilder`, so nodes a
+pass makes identical (two pipelines that only differed in a dead derive)
+are merged again.
+
+* ``fold_constants`` evaluates all-literal subexpressions of derives.
+* ``eliminate_dead_derives`` drops derives whose column never reaches a
+  ``select``, ``target``, fit or observed output.
+* ``fuse_derives`` merges runs of consecutive derives into one ``kernel``
+  node, run by :class:`~fusionflow.kernels.FusedKernel`; intermediate
+  columns nothing downstream reads are not materialized.
+"""
+
+from __future__ import annotations
+
+import time
+from dataclasses import dataclass, field, replace
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+import numpy as np
+
+from .ast_nodes import BinaryOp, Expression, Identifier, Literal, MemberAccess, UnaryOp
+from .ir_export import ExpressionRenderer
+from .kernels import _BINARY_UFUNCS, _UNARY_UFUNCS, compile_expression
+from .lexer import Lexer, TokenType
+from .parser import Parser
+from .upeg import UPEG, UPEGNode
+from .upeg_lowering import LoweredRegistry, UPEGBuilder
+
+# New graph, old id -> new id, number of rewrites.
+PassResult = Tuple[UPEG, Dict[str, str], int]
+
+_EXPRESSIONS: Dict[str, Expression] = {}
+
+
+def parse_expression(text: str) -> Expression:
+    """Parse the expression text stored in derive metadata (cached per text)."""
+    expr = _EXPRESSIONS.get(text)
+    if expr is None:
+        parser = Parser(Lexer(text).tokenize())
+        expr = parser.parse_expression()
+        if parser.current_token().type != TokenType.EOF:
+            raise SyntaxError(f"Trailing input after expression '{text}'")
+        _EXPRESSIONS[text] = expr
+    return expr
+
+
+def _assignments(node: UPEGNode) -> List[Dict[str, str]]:
+    """The ``{"target", "expression"}`` assignments a derive or kernel node performs, in order."""
+    if node.operation == "derive":
+        return [node.metadata]
+    return node.metadata["assignments"]
+
+
+def _columns(expr: Expression) -> Set[str]:
+    names: Set[str] = set()
+    stack = [expr]
+    while stack:
+        item = stack.pop()
+        if isinstance(item, Identifier):
+            names.add(item.name)
+        elif isinstance(item, BinaryOp):
+            stack.append(item.left)
+            stack.append(item.right)
+        elif isinstance(item, UnaryOp):
+            stack.append(item.operand)
+        elif isinstance(item, MemberAccess):
+            stack.append(item.object)
+    return names
+
+
+def _consumers(graph: UPEG) -> Dict[str, List[str]]:
+    consumers: Dict[str, List[str]] = {node.id: [] for node in graph.nodes}
+    for source, target in graph.edges:
+        consumers[source].append(target)
+    return consumers
+
+
+def _rebuild(graph: UPEG, rewrite: Callable[[UPEGNode, List[str], UPEGBuilder], Optional[str]]) -> Tuple[UPEG, Dict[str, str]]:
+    """Copy ``graph`` node by node (inputs first); ``rewrite`` may return a replacement id.
+
+    ``rewrite(node, inputs, builder)`` gets the node's inputs already mapped
+    into the new graph. Returning ``None`` keeps the node as it is.
+    """
+    builder = UPEGBuilder()
+    mapping: Dict[str, str] = {}
+    for node in graph.nodes:
+        inputs = [mapping[source] for source in node.inputs]
+        new_id = rewrite(node, inputs, builder)
+        if new_id is None:
+            new_id = builder.node(node.operation, inputs, node.metadata, node.outputs)
+        mapping[node.id] = new_id
+    return builder.graph, mapping
+
+
+# -- constant folding -------------------------------------------------------
+
+
+def _literal(value: Any) -> Optional[Literal]:
+    """``Literal(value)`` if its rendered text parses back to the same value, else ``None``.
+
+    The grammar has no negative, boolean or exponent literals, so such
+    results are left unfolded.
+    """
+    if hasattr(value, "item"):
+        value = value.item()
+    if type(value) not in (int, float):
+        return None
+    try:
+        parsed = parse_expression(str(value))
+    except SyntaxError:
+        return None
+    if isinstance(parsed, Literal) and type(parsed.value) is type(value) and parsed.value == value:
+        return parsed
+    return None
+
+
+def _fold(ufunc: Any, *values: Any) -> Optional[Literal]:
+    if ufunc is None:
+        return None
+    try:
+        with np.errstate(all="ignore"):
+            return _literal(ufunc(*values))
+    except (TypeError, ValueError, OverflowError):
+        return None
+
+
+def fold_expression(expression: Expression) -> Expression:
+    """``expression`` with every all-literal ``BinaryOp``/``UnaryOp`` subtree evaluated.
+
+    Operators are applied with the same NumPy ufuncs kernels use, so a
+    folded value is what the kernel would have computed. Unchanged subtrees
+    are returned as they are.
+    """
+    results: List[Expression] = []
+    # Iterative post-order walk; ``True`` marks a node whose children are done.
+    stack: List[Tuple[Expression, bool]] = [(expression, False)]
+    while stack:
+        node, ready = stack.pop()
+        if isinstance(node, BinaryOp):
+            if not ready:
+                stack.append((node, True))
+                stack.append((node.right, False))
+                stack.append((node.left, False))
+                continue
+            right = results.pop()
+            left = results.pop()
+            folded = None
+            if isinstance(left, Literal) and isinstance(right, Literal):
+                folded = _fold(_BINARY_UFUNCS.get(node.operator), left.value, right.value)
+            if folded is None and (left is not node.left or right is not node.right):
+                folded = BinaryOp(left, node.operator, right)
+            results.append(node if folded is None else folded)
+        elif isinstance(node, UnaryOp):
+            if not ready:
+                stack.append((node, True))
+                stack.append((node.operand, False))
+                continue
+            operand = results.pop()
+            folded = None
+            if isinstance(operand, Literal):
+                folded = _fold(_UNARY_UFUNCS.get(node.operator), operand.value)
+            if folded is None and operand is not node.operand:
+                folded = UnaryOp(node.operator, operand)
+            results.append(node if folded is None else folded)
+        else:
+            results.append(node)
+    return results.pop()
+
+
+def fold_constants(graph: UPEG, keep: Iterable[str] = ()) -> PassResult:
+    """Fold constant subexpressions in every derive and kernel node."""
+    renderer = ExpressionRenderer()
+    folded = 0
+
+    def rewrite(node: UPEGNode, inputs: List[str], builder: UPEGBuilder) -> Optional[str]:
+        nonlocal folded
+        if node.operation not in ("derive", "kernel"):
+            return None
+        assignments = []
+        changed = False
+        for assignment in _assignments(node):
+            expr = parse_expression(assignment["expression"])
+            simplified = fold_expression(expr)
+            if simplified is not expr:
+                changed = True
+                folded += 1
+                assignment = {**assignment, "expression": renderer.render(simplified)}
+            assignments.append(assignment)
+        if not changed:
+            return None
+        metadata = assignments[0] if node.operation == "derive" else {**node.metadata, "assignments": assignments}
+        return builder.node(node.operation, inputs, metadata, node.outputs)
+
+    graph, mapping = _rebuild(graph, rewrite)
+    return graph, mapping, folded
+
+
+# -- dead derive elimination ------------------------------------------------
+
+
+@dataclass
+class _Live:
+    """Columns needed from a node's output: ``names``, or every column when ``everything``."""
+
+    names: Set[str] = field(default_factory=set)
+    everything: bool = False
+
+    def needs(self, name: str) -> bool:
+        return self.everything or name in self.names
+
+    def merge(self, other: "_Live") -> None:
+        self.names |= other.names
+        self.everything = self.everything or other.everything
+
+
+def _liveness(graph: UPEG, keep: Set[str]) -> Tuple[Dict[str, _Live], Dict[str, List[bool]]]:
+    """Columns live at each node's output, and which assignments of each derive/kernel are live.
+
+    Works backwards from the sinks, as ``plan_pipeline`` does for a single
+    pipeline: ``select`` narrows the live set to its fields (and whatever
+    is needed below it, such as the target), a fit consumes every column,
+    and outputs in ``keep`` or with no consumers are observed in full.
+    """
+    consumers = _consumers(graph)
+    live_out: Dict[str, _Live] = {}
+    live_assignments: Dict[str, List[bool]] = {}
+    for node in reversed(graph.nodes):
+        live = live_out.setdefault(node.id, _Live())
+        if node.id in keep or not consumers[node.id]:
+            live.everything = True
+
+        if node.operation == "select":
+            needed = _Live(set(node.metadata["fields"]) | live.names)
+        elif node.operation == "target":
+            needed = _Live(live.names | {node.metadata["field"]}, live.everything)
+        elif node.operation in ("derive", "kernel"):
+            needed = _Live(set(live.names), live.everything)
+            flags: List[bool] = []
+            for assignment in reversed(_assignments(node)):
+                target = assignment["target"]
+                if not needed.needs(target):
+                    flags.append(False)
+                    continue
+                flags.append(True)
+                needed.names.discard(target)
+                needed.names |= _columns(parse_expression(assignment["expression"]))
+            flags.reverse()
+            live_assignments[node.id] = flags
+        else:
+            # Fits, evaluations and unknown operations read every input column.
+            needed = _Live(everything=True)
+
+        for source in node.inputs:
+            live_out.setdefault(source, _Live()).merge(needed)
+    return live_out, live_assignments
+
+
+def eliminate_dead_derives(graph: UPEG, keep: Iterable[str] = ()) -> PassResult:
+    """Drop derives (and kernel assignments) whose column is never used downstream."""
+    _, live_assignments = _liveness(graph, set(keep))
+    removed = 0
+
+    def rewrite(node: UPEGNode, inputs: List[str], builder: UPEGBuilder) -> Optional[str]:
+        nonlocal removed
+        flags = live_assignments.get(node.id)
+        if flags is None or all(flags):
+            return None
+        removed += flags.count(False)
+        assignments = [assignment for assignment, alive in zip(_assignments(node), flags) if alive]
+        if not assignments:
+            return inputs[0]
+        if node.operation == "derive":
+            return None
+        targets = {assignment["target"] for assignment in assignments}
+        outputs = [name for name in node.outputs if name in targets]
+        return builder.node("kernel", inputs, {"assignments": assignments, "outputs": outputs}, outputs)
+
+    graph, mapping = _rebuild(graph, rewrite)
+    return graph, mapping, removed
+
+
+# -- derive fusion ------------------------------------------------------------
+
+
+def _fusable(assignment: Dict[str, str]) -> bool:
+    try:
+        compile_expression(parse_expression(assignment["expression"]))
+    except ValueError:
+        return False
+    return True
+
+
+def fuse_derives(graph: UPEG, keep: Iterable[str] = ()) -> PassResult:
+    """Merge chains of elementwise derives into single ``kernel`` nodes.
+
+    A derive is folded into the derive after it when that is its only
+    consumer and its output is not observed directly. The kernel node's
+    outputs are the assigned columns still live after the chain.
+    """
+    keep = set(keep)
+    consumers = _consumers(graph)
+    live_out, _ = _liveness(graph, keep)
+
+    def fusable(node: UPEGNode) -> bool:
+        return node.operation in ("derive", "kernel") and all(_fusable(a) for a in _assignments(node))
+
+    nodes = {node.id: node for node in graph.nodes}
+    absorbed: Set[str] = set()
+    for node in graph.nodes:
+        if not fusable(node) or node.id in keep or len(consumers[node.id]) != 1:
+            continue
+        consumer = nodes[consumers[node.id][0]]
+        if consumer.inputs == [node.id] and fusable(consumer):
+            absorbed.add(node.id)
+
+    # Absorbed node id -> (input in the new graph, assignments so far).
+    pending: Dict[str, Tuple[str, List[Dict[str, str]]]] = {}
+    fused = 0
+
+    def rewrite(node: UPEGNode, inputs: List[str], builder: UPEGBuilder) -> Optional[str]:
+        nonlocal fused
+        if not fusable(node):
+            return None
+        source, assignments = inputs[0] if inputs else None, []
+        if node.inputs and node.inputs[0] in pending:
+            source, assignments = pending.pop(node.inputs[0])
+        assignments = assignments + list(_assignments(node))
+        if node.id in absorbed:
+            pending[node.id] = (source, assignments)
+            return ""  # placeholder; nothing in the new graph reads it
+        if len(assignments) == len(_assignments(node)):
+            return None
+        fused += len(assignments) - len(_assignments(node))
+        live = live_out[node.id]
+        outputs: List[str] = []
+        for assignment in assignments:
+            name = assignment["target"]
+            if live.needs(name) and name not in outputs:
+                outputs.append(name)
+        return builder.node("kernel", [source], {"assignments": assignments, "outputs": outputs}, outputs)
+
+    graph, mapping = _rebuild(graph, rewrite)
+    return graph, {old: new for old, new in mapping.items() if new}, fused
+
+
+# -- driver ---------------------------------------------------------------------
+
+PASSES: Tuple[Tuple[str, Callable[..., PassResult]], ...] = (
+    ("constant_folding", fold_constants),
+    ("dead_columns", eliminate_dead_derives),
+    ("derive_fusion", fuse_derives),
+)
+
+
+@dataclass
+class PassStats:
+    name: str
+    nodes_before: int
+    nodes_after: int
+    rewrites: int
+    seconds: float
+
+
+@dataclass
+class OptimizationReport:
+    passes: List[PassStats] = field(default_factory=list)
+
+    def summary(self) -> str:
+        lines = []
+        for stats in self.passes:
+            lines.append(
+                f"{stats.name:<16} {stats.rewrites:>7} rewrites  "
+                f"{stats.nodes_before:>7} -> {stats.nodes_after:<7} nodes  {stats.seconds * 1000:8.1f} ms"
+            )
+        return "\n".join(lines)
+
+
+def optimize(
+    lowered: LoweredRegistry,
+    constant_folding: bool = True,
+    dead_columns: bool = True,
+    derive_fusion: bool = True,
+) -> Tuple[LoweredRegistry, OptimizationReport]:
+    """Run the enabled passes in order and return the rewritten registry graph.
+
+    Pipeline outputs and experiment results are kept observable, and the
+    returned ``pipelines``/``experiments`` point at their nodes in the new
+    graph.
+    """
+    enabled = {"constant_folding": constant_folding, "dead_columns": dead_columns, "derive_fusion": derive_fusion}
+    graph = lowered.graph
+    pipelines = dict(lowered.pipelines)
+    experiments = dict(lowered.experiments)
+    report = OptimizationReport()
+    for name, run in PASSES:
+        if not enabled[name]:
+            continue
+        keep = set(pipelines.values()) | set(experiments.values())
+        started = time.perf_counter()
+        new_graph, mapping, rewrites = run(graph, keep)
+        report.passes.append(
+            PassStats(name, len(graph.nodes), len(new_graph.nodes), rewrites, time.perf_counter() - started)
+        )
+        graph = new_graph
+        pipelines = {key: mapping[node_id] for key, node_id in pipelines.items()}
+        experiments = {key: mapping[node_id] for key, node_id in experiments.items()}
+    return replace(lowered, graph=graph, pipelines=pipelines, experiments=experiments), report
@@ -0,0 +1,54 @@
+import random
+
+import pytest
+
+from fusionflow.ancestry import AncestryIndex
+
+
+def walk(parents, name):
+    chain = []
+    while name is not None:
+        chain.append(name)
+        name = parents[name]
+    return chain
+
+
+def test_matches_parent_walks_on_random_forest():
+    rng = random.Random(7)
+    index = AncestryIndex()
+    parents = {}
+    for node in range(400):
+        parent = None if node == 0 or rng.random() < 0.05 else f"t{rng.randrange(node)}"
+        index.add(f"t{node}", parent)
+        parents[f"t{node}"] = parent
+
+    for _ in range(2000):
+        a, b = f"t{rng.randrange(400)}", f"t{rng.randrange(400)}"
+        assert index.is_ancestor(a, b) == (a in walk(parents, b))
+        ancestors = set(walk(parents, a))
+        expected = next((name for name in walk(parents, b) if name in ancestors), None)
+        assert index.lowest_common_ancestor(a, b) == expected
+
+
+def test_deep_chain():
+    index = AncestryIndex()
+    index.add("t0")
+    for node in range(1, 5000):
+        index.add(f"t{node}", f"t{node - 1}")
+    index.add("side", "t1234")
+
+    assert index.depth("t4999") == 4999
+    assert index.is_ancestor("t0", "t4999")
+    assert not index.is_ancestor("t4999", "t0")
+    assert index.lowest_common_ancestor("side", "t4999") == "t1234"
+
+
+def test_unknown_and_duplicate_names_raise():
+    index = AncestryIndex()
+    index.add("main")
+    with pytest.raises(ValueError):
+        index.add("main")
+    with pytest.raises(ValueError):
+        index.add("v2", "missing")
+    with pytest.raises(ValueError):
+        index.is_ancestor("main", "missing")
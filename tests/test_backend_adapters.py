@@ -0,0 +1,170 @@
+import warnings
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from fusionflow.backend_adapters import PandasBackend, plan_pipeline
+from fusionflow.compiler import build_runtime
+
+
+SPEC = """dataset customers v1
+    source "customers.csv"
+    schema {
+        id: int
+        amount: float
+        days: int
+        age: int
+        region: string
+        churned: bool
+        notes: string
+    }
+end
+
+pipeline churn_features
+    from customers v1
+    derive spend_per_day = amount / days
+    derive unused = notes == "vip"
+    derive age_spend = age * spend_per_day
+    select [spend_per_day, age_spend]
+    target churned
+end
+
+pipeline derived_target
+    from customers v1
+    select [amount, days]
+    derive heavy = amount * days > 1000
+    target heavy
+end
+
+pipeline everything
+    from customers v1
+    derive double_age = age * 2
+end
+"""
+
+
+@pytest.fixture
+def registry(tmp_path: Path):
+    rows = 50
+    rng = np.random.default_rng(3)
+    pd.DataFrame(
+        {
+            "id": np.arange(rows),
+            "amount": rng.random(rows) * 100,
+            "days": rng.integers(1, 400, rows),
+            "age": rng.integers(18, 90, rows),
+            "region": ["north", "south"] * (rows // 2),
+            "churned": rng.random(rows) < 0.3,
+            "notes": ["x"] * rows,
+        }
+    ).to_csv(tmp_path / "customers.csv", index=False)
+    runtime, _, _ = build_runtime(SPEC)
+    return runtime, tmp_path
+
+
+def test_plan_reads_only_needed_columns(registry):
+    runtime, _ = registry
+    pipeline = runtime.pipelines["churn_features"]
+    dataset = runtime.get_dataset(pipeline.source)
+
+    plan = plan_pipeline(pipeline.steps, [column.name for column in dataset.schema])
+
+    assert plan.columns == ["amount", "days", "age", "churned"]
+    assert plan.skipped == ["unused"]
+    assert plan.target == "churned"
+    assert plan_pipeline(runtime.pipelines["everything"].steps).columns is None
+
+
+def test_execute_pipeline(registry, monkeypatch):
+    runtime, base_dir = registry
+    pipeline = runtime.pipelines["churn_features"]
+    reads = []
+    original = pd.read_csv
+
+    def read_csv(*args, **kwargs):
+        reads.append(kwargs)
+        return original(*args, **kwargs)
+
+    monkeypatch.setattr(pd, "read_csv", read_csv)
+    with warnings.catch_warnings():
+        warnings.simplefilter("error")
+        result = PandasBackend(base_dir).execute_pipeline(pipeline, runtime.get_dataset(pipeline.source))
+
+    assert reads[0]["usecols"] == ["amount", "days", "age", "churned"]
+    assert reads[0]["dtype"] == {"amount": "float64", "days": "int64", "age": "int64", "churned": "bool"}
+    assert list(result.columns) == ["spend_per_day", "age_spend", "churned"]
+    assert result.attrs["target"] == "churned"
+
+    source = original(base_dir / "customers.csv")
+    expected = source["age"] * (source["amount"] / source["days"])
+    np.testing.assert_allclose(result["age_spend"].to_numpy(), expected.to_numpy())
+
+
+def test_target_derived_after_select(registry):
+    runtime, base_dir = registry
+    pipeline = runtime.pipelines["derived_target"]
+    dataset = runtime.get_dataset(pipeline.source)
+
+    plan = plan_pipeline(pipeline.steps, [column.name for column in dataset.schema])
+    assert plan.columns == ["amount", "days"]
+
+    result = PandasBackend(base_dir).execute_pipeline(pipeline, dataset)
+    assert list(result.columns) == ["amount", "days", "heavy"]
+    assert result.attrs["target"] == "heavy"
+    np.testing.assert_array_equal(result["heavy"], result["amount"] * result["days"] > 1000)
+
+
+def test_pipeline_without_select_keeps_all_columns(registry):
+    runtime, base_dir = registry
+    pipeline = runtime.pipelines["everything"]
+
+    result = PandasBackend(base_dir).execute_pipeline(pipeline, runtime.get_dataset(pipeline.source))
+
+    assert list(result.columns)[-1] == "double_age"
+    assert len(result.columns) == 8
+    assert result["region"].dtype == "string"
+
+
+def test_undeclared_column_is_rejected(registry):
+    runtime, base_dir = registry
+    edited, _, _ = build_runtime(SPEC.replace("age * spend_per_day", "height * spend_per_day"))
+    pipeline = edited.pipelines["churn_features"]
+
+    with pytest.raises(ValueError, match="'height' is not in the schema"):
+        PandasBackend(base_dir).execute_pipeline(pipeline, runtime.get_dataset(pipeline.source))
+
+
+def test_chunked_execution_matches_in_memory(registry):
+    runtime, base_dir = registry
+    pipeline = runtime.pipelines["churn_features"]
+    dataset = runtime.get_dataset(pipeline.source)
+    backend = PandasBackend(base_dir)
+    chunks = []
+
+    # A tiny budget still yields whole chunks of at least 1000 rows.
+    assert backend.chunk_rows(plan_pipeline(pipeline.steps), dataset, memory_budget=1) == 1000
+    with pytest.MonkeyPatch.context() as patch:
+        patch.setattr("fusionflow.backend_adapters._MIN_CHUNK_ROWS", 7)
+        rows = backend.execute_pipeline_chunked(pipeline, dataset, chunks.append, memory_budget=1)
+
+    expected = backend.execute_pipeline(pipeline, dataset)
+    assert rows == len(expected) == 50
+    assert [len(chunk) for chunk in chunks] == [7] * 7 + [1]
+    pd.testing.assert_frame_equal(pd.concat(chunks, ignore_index=True), expected)
+
+    backend.execute_pipeline_chunked(pipeline, dataset, base_dir / "out.csv")
+    written = pd.read_csv(base_dir / "out.csv")
+    assert list(written.columns) == ["spend_per_day", "age_spend", "churned"]
+    np.testing.assert_allclose(written["age_spend"], expected["age_spend"])
+
+
+def test_chunked_execution_needs_csv(registry):
+    runtime, base_dir = registry
+    pipeline = runtime.pipelines["churn_features"]
+    dataset = runtime.get_dataset(pipeline.source)
+    dataset.source = "customers.parquet"
+
+    with pytest.raises(ValueError, match="needs a CSV source"):
+        PandasBackend(base_dir).execute_pipeline_chunked(pipeline, dataset, lambda chunk: None)
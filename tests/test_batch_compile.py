@@ -0,0 +1,66 @@
+import json
+from pathlib import Path
+
+from fusionflow import __main__ as cli
+from fusionflow.batch_compile import discover_specs, output_path_for
+
+
+VALID_SPEC = """
+dataset customers v1
+    source "customers.csv"
+end
+
+pipeline churn_features
+    from customers v1
+    derive spend_per_day = amount / days
+end
+"""
+
+BROKEN_SPEC = """
+pipeline churn_features
+    from customers v1
+end
+"""
+
+
+def write_tree(root: Path) -> None:
+    (root / "team_a").mkdir(parents=True)
+    (root / "team_a" / "churn.ff").write_text(VALID_SPEC, encoding="utf-8")
+    (root / "team_b").mkdir()
+    (root / "team_b" / "churn.ff").write_text(VALID_SPEC, encoding="utf-8")
+    (root / "team_b" / "broken.ff").write_text(BROKEN_SPEC, encoding="utf-8")
+    (root / "notes.txt").write_text("not a spec", encoding="utf-8")
+
+
+def test_discover_specs_in_directory_and_glob(tmp_path: Path):
+    write_tree(tmp_path)
+
+    base, specs = discover_specs(str(tmp_path))
+    assert base == tmp_path
+    assert [spec.relative_to(tmp_path).as_posix() for spec in specs] == [
+        "team_a/churn.ff",
+        "team_b/broken.ff",
+        "team_b/churn.ff",
+    ]
+
+    base, specs = discover_specs(str(tmp_path / "team_*" / "churn.ff"))
+    assert base == tmp_path
+    assert output_path_for(specs[0], base, tmp_path / "out") == tmp_path / "out" / "team_a" / "churn.tir.json"
+
+
+def test_cli_compiles_directory_in_parallel(tmp_path: Path, capsys):
+    write_tree(tmp_path / "specs")
+    out_dir = tmp_path / "out"
+
+    exit_code = cli.main(
+        ["compile", str(tmp_path / "specs"), "--out-dir", str(out_dir), "--jobs", "2", "--no-cache"]
+    )
+
+    captured = capsys.readouterr()
+    assert exit_code == 1
+    assert "broken.ff: Error: Pipeline 'churn_features' references unknown dataset" in captured.err
+    assert "Compiled 2/3 files (1 failed)" in captured.out
+    assert "files/s" in captured.out
+    payload = json.loads((out_dir / "team_b" / "churn.tir.json").read_text(encoding="utf-8"))
+    assert "churn_features" in payload["pipelines"]
+    assert not (out_dir / "team_b" / "broken.tir.json").exists()
@@ -0,0 +1,129 @@
+import mmap
+import os
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from fusionflow.ast_nodes import DatasetDeclaration
+from fusionflow.backend_adapters import PandasBackend
+from fusionflow.column_cache import ColumnCache
+from fusionflow.compiler import build_runtime
+
+
+SPEC = """dataset customers v1
+    source "customers.csv"
+    schema {
+        id: int
+        amount: float
+        days: int
+        region: string
+    }
+end
+
+pipeline spend
+    from customers v1
+    derive spend_per_day = amount / days
+    select [spend_per_day]
+end
+
+pipeline regions
+    from customers v1
+    derive late = days > 100
+    select [region, late]
+end
+"""
+
+
+@pytest.fixture
+def setup(tmp_path: Path):
+    rows = 40
+    pd.DataFrame(
+        {
+            "id": np.arange(rows),
+            "amount": np.linspace(1, 100, rows),
+            "days": np.arange(1, rows + 1) * 7,
+            "region": ["north", "south"] * (rows // 2),
+        }
+    ).to_csv(tmp_path / "customers.csv", index=False)
+    runtime, _, _ = build_runtime(SPEC)
+    cache = ColumnCache(tmp_path / "columns")
+    return runtime, PandasBackend(tmp_path, column_cache=cache), cache, tmp_path
+
+
+def _is_memory_mapped(array):
+    while array is not None:
+        if isinstance(array, (np.memmap, mmap.mmap)):
+            return True
+        array = getattr(array, "base", None)
+    return False
+
+
+def _run(runtime, backend, name):
+    pipeline = runtime.pipelines[name]
+    return backend.execute_pipeline(pipeline, runtime.get_dataset(pipeline.source))
+
+
+def test_columns_are_parsed_once_and_memory_mapped(setup):
+    runtime, backend, cache, tmp_path = setup
+    first = _run(runtime, backend, "spend")
+    assert (cache.hits, cache.misses) == (0, 2)
+
+    source = backend.read_source(runtime.datasets[("customers", "v1")], ["amount", "days"])
+    assert (cache.hits, cache.misses) == (2, 2)
+    assert _is_memory_mapped(source["amount"].to_numpy())
+
+    second = _run(runtime, backend, "spend")
+    pd.testing.assert_frame_equal(first, second)
+    uncached = PandasBackend(tmp_path).execute_pipeline(
+        runtime.pipelines["spend"], runtime.datasets[("customers", "v1")]
+    )
+    pd.testing.assert_frame_equal(second, uncached)
+
+
+def test_string_columns_are_read_from_source(setup):
+    runtime, backend, cache, _ = setup
+    first = _run(runtime, backend, "regions")
+    second = _run(runtime, backend, "regions")
+
+    assert (cache.hits, cache.misses) == (1, 3)
+    assert first["region"].dtype == "string"
+    pd.testing.assert_frame_equal(first, second)
+
+
+def test_rewritten_source_gets_a_new_entry(setup):
+    runtime, backend, cache, tmp_path = setup
+    _run(runtime, backend, "spend")
+    entries = list((tmp_path / "columns" / "customers" / "v1").iterdir())
+
+    frame = pd.read_csv(tmp_path / "customers.csv")
+    frame["amount"] = frame["amount"] * 2
+    frame.to_csv(tmp_path / "customers.csv", index=False)
+    stat = os.stat(tmp_path / "customers.csv")
+    os.utime(tmp_path / "customers.csv", ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+
+    result = _run(runtime, backend, "spend")
+
+    assert result["spend_per_day"].iloc[0] == pytest.approx(2 * 1 / 7)
+    remaining = list((tmp_path / "columns" / "customers" / "v1").iterdir())
+    assert len(remaining) == 1 and remaining != entries
+
+
+@pytest.mark.parametrize("name, version", [("customers", ".."), ("..", "v1"), (".", "."), ("", "")])
+def test_entry_paths_stay_inside_the_cache(setup, name, version):
+    runtime, backend, cache, tmp_path = setup
+    source = tmp_path / "customers.csv"
+    dataset = runtime.datasets[("customers", "v1")]
+    _run(runtime, backend, "spend")
+    entry = cache.entry(dataset, cache.fingerprint(source))
+    assert entry.is_dir()
+
+    odd = DatasetDeclaration(name, version, dataset.source, dataset.schema)
+    odd_entry = cache.entry(odd, cache.fingerprint(source))
+    assert odd_entry.resolve().parent.parent.parent == cache.directory.resolve()
+
+    # A first miss for the odd entry only clears that entry's own siblings.
+    cache.load(odd, source, ["amount"], lambda names: pd.read_csv(source)[names])
+    assert odd_entry.is_dir() and entry.is_dir()
+    assert sorted(path.name for path in entry.iterdir()) == ["amount.npy", "days.npy"]
@@ -0,0 +1,112 @@
+import json
+import pickle
+from pathlib import Path
+
+import pytest
+
+from fusionflow import __main__ as cli
+from fusionflow.compile_cache import CompileCache, private_directory
+from fusionflow.compiler import load_runtime
+
+
+SPEC = """
+dataset customers v1
+    source "customers.csv"
+end
+
+pipeline churn_features
+    from customers v1
+    derive spend_per_day = amount / days
+end
+
+model rf_v1
+    type random_forest
+    params { trees: 200 }
+end
+
+experiment churn_baseline
+    uses pipeline churn_features
+    uses model rf_v1
+    metrics [accuracy]
+end
+"""
+
+
+def test_cache_key_depends_on_source_and_kind():
+    assert CompileCache.key(SPEC, "runtime") == CompileCache.key(SPEC, "runtime")
+    assert CompileCache.key(SPEC, "runtime") != CompileCache.key(SPEC + "\n", "runtime")
+    assert CompileCache.key(SPEC, "runtime") != CompileCache.key(SPEC, "index")
+
+
+def test_runtime_is_reused_from_disk(tmp_path: Path):
+    cache = CompileCache(tmp_path / "cache")
+    runtime, ast = load_runtime(SPEC, cache)
+
+    fresh = CompileCache(tmp_path / "cache")
+    cached_runtime, cached_ast = load_runtime(SPEC, fresh)
+
+    assert cached_ast == ast
+    assert sorted(cached_runtime.pipelines) == sorted(runtime.pipelines)
+    assert list(cached_runtime.timelines["main"].experiments) == ["churn_baseline"]
+
+
+def test_corrupt_entry_is_recompiled(tmp_path: Path):
+    cache = CompileCache(tmp_path / "cache")
+    key = cache.key(SPEC, "runtime")
+    load_runtime(SPEC, cache)
+    entry = next((tmp_path / "cache").rglob(f"{key}.pkl"))
+    entry.write_bytes(b"not a pickle")
+
+    runtime, _ = load_runtime(SPEC, CompileCache(tmp_path / "cache"))
+
+    assert "rf_v1" in runtime.models
+
+
+def test_foreign_entry_is_not_unpickled(tmp_path: Path, monkeypatch):
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path / "home"))
+    cache = CompileCache(tmp_path / "cache")
+    key = cache.key(SPEC, "runtime")
+    load_runtime(SPEC, cache)
+    entry = next((tmp_path / "cache").rglob(f"{key}.pkl"))
+
+    class Payload:
+        def __reduce__(self):
+            return (exec, ("raise SystemExit('unpickled a foreign entry')",))
+
+    # A well-formed pickle without a valid MAC, as a cloned or shared cache would hold.
+    entry.write_bytes(b"\0" * 32 + pickle.dumps(Payload()))
+    runtime, _ = load_runtime(SPEC, CompileCache(tmp_path / "cache"))
+    assert "rf_v1" in runtime.models
+
+    # Another user's entries are signed with another secret.
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path / "other"))
+    assert CompileCache(tmp_path / "cache").get(key) is None
+    assert not entry.exists()
+
+
+def test_cache_root_must_be_private(tmp_path: Path):
+    root = tmp_path / "root"
+    root.mkdir(mode=0o755)
+    root.chmod(0o755)
+    with pytest.raises(PermissionError):
+        private_directory(root)
+    (tmp_path / "link").symlink_to(tmp_path / "elsewhere")
+    (tmp_path / "elsewhere").mkdir(mode=0o700)
+    with pytest.raises(PermissionError):
+        private_directory(tmp_path / "link")
+    assert private_directory(tmp_path / "fresh").stat().st_mode & 0o777 == 0o700
+
+
+def test_cli_compile_with_cache_dir(tmp_path: Path):
+    spec_path = tmp_path / "spec.ff"
+    spec_path.write_text(SPEC, encoding="utf-8")
+    out_path = tmp_path / "spec.tir.json"
+    args = ["compile", str(spec_path), "--out", str(out_path), "--cache-dir", str(tmp_path / "cache")]
+
+    assert cli.main(args) == 0
+    first = out_path.read_text(encoding="utf-8")
+    assert cli.main(args) == 0
+
+    assert out_path.read_text(encoding="utf-8") == first
+    assert json.loads(first)["models"]["rf_v1"]["params"] == {"trees": 200}
+    assert list((tmp_path / "cache").rglob("*.pkl"))
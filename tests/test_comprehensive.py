@@ -98,3 +98,105 @@ def test_merge_requires_known_timelines():
 
     with pytest.raises(ValueError):
         interpreter.execute(ast)
+
+
+def test_reverse_indexes_and_timeline_ancestry():
+    source = """
+    dataset customers v1
+        source "customers.csv"
+    end
+
+    pipeline baseline
+        from customers v1
+    end
+
+    model rf_v1
+        type random_forest
+    end
+
+    model gbm
+        type gradient_boosting
+    end
+
+    experiment churn_main
+        uses pipeline baseline
+        uses model rf_v1
+        metrics [accuracy]
+    end
+
+    timeline v2 "Branch"
+        experiment churn_test
+            uses pipeline baseline
+            uses model rf_v1
+            metrics [accuracy]
+        end
+    end
+    """
+
+    runtime = interpret(source)
+    runtime.create_timeline('v3', None, parent='v2')
+    runtime.create_timeline('v4', None, parent='v2')
+
+    assert runtime.pipelines_using_dataset('customers', 'v1') == ['baseline']
+    assert runtime.experiments_using_model('rf_v1') == [('main', 'churn_main'), ('v2', 'churn_test')]
+    assert runtime.experiments_using_model('gbm') == []
+    assert runtime.experiments_using_pipeline('baseline') == [('main', 'churn_main'), ('v2', 'churn_test')]
+    assert runtime.is_ancestor('main', 'v3')
+    assert not runtime.is_ancestor('v3', 'v2')
+    assert runtime.lowest_common_ancestor('v3', 'v4') == 'v2'
+    with pytest.raises(ValueError):
+        runtime.is_ancestor('main', 'missing')
+
+
+def test_effective_experiments_snapshot_parent_at_branch():
+    source = """
+    dataset customers v1
+        source "customers.csv"
+    end
+
+    pipeline baseline
+        from customers v1
+    end
+
+    model rf_v1
+        type random_forest
+    end
+
+    experiment shared
+        uses pipeline baseline
+        uses model rf_v1
+        metrics [accuracy]
+    end
+
+    timeline v2 "Branch"
+        experiment shared
+            uses pipeline baseline
+            uses model rf_v1
+            metrics [f1]
+        end
+        experiment only_v2
+            uses pipeline baseline
+            uses model rf_v1
+            metrics [f1]
+        end
+    end
+
+    experiment after_branch
+        uses pipeline baseline
+        uses model rf_v1
+        metrics [accuracy]
+    end
+    """
+
+    runtime = interpret(source)
+    v2 = runtime.effective_experiments('v2')
+
+    assert sorted(v2) == ['only_v2', 'shared']
+    assert v2['shared'].metrics == ['f1']
+    assert sorted(runtime.branch_base('v2')) == ['shared']
+    assert sorted(runtime.effective_experiments('main')) == ['after_branch', 'shared']
+
+    # Once built, the views are maintained: branching shares the parent's map.
+    runtime.create_timeline('v3', None, parent='v2')
+    assert runtime.effective_experiments('v3') is runtime.effective_experiments('v2')
+    assert runtime.timelines['v3'].forked_at == 2
@@ -0,0 +1,164 @@
+import json
+import socket
+import tempfile
+import threading
+from pathlib import Path
+
+import pytest
+
+from fusionflow import __main__ as cli
+from fusionflow import daemon as daemon_module
+from fusionflow.daemon import DISABLE_ENV, SOCKET_ENV, CompileDaemon, default_socket_path, forward
+
+
+SPEC = """
+dataset customers v1
+    source "customers.csv"
+end
+
+pipeline churn_features
+    from customers v1
+    derive spend_per_day = amount / days
+end
+"""
+
+
+@pytest.fixture
+def daemon(tmp_path: Path, monkeypatch):
+    socket_path = tmp_path / "ff.sock"
+    server = CompileDaemon(socket_path, cli.dispatch)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    monkeypatch.setenv(SOCKET_ENV, str(socket_path))
+    monkeypatch.delenv(DISABLE_ENV, raising=False)
+    yield server
+    server.shutdown()
+    server.server_close()
+    thread.join()
+
+
+def write_spec(tmp_path: Path) -> Path:
+    spec_path = tmp_path / "spec.ff"
+    spec_path.write_text(SPEC, encoding="utf-8")
+    return spec_path
+
+
+def test_compile_is_forwarded_and_served_warm(daemon, tmp_path: Path, monkeypatch, capsys):
+    spec_path = write_spec(tmp_path)
+    monkeypatch.chdir(tmp_path)
+
+    assert cli.main(["compile", "spec.ff"]) == 0
+    first = capsys.readouterr().out
+    assert cli.main(["compile", "spec.ff"]) == 0
+    second = capsys.readouterr().out
+
+    assert daemon.requests == 2
+    assert first == second
+    assert json.loads(first)["pipelines"]["churn_features"]["input"] == "customers:v1"
+
+    monkeypatch.setenv(DISABLE_ENV, "1")
+    assert cli.main(["compile", str(spec_path)]) == 0
+    assert capsys.readouterr().out == first
+    assert daemon.requests == 2
+
+
+def test_run_print_state_and_errors_are_forwarded(daemon, tmp_path: Path, capsys):
+    spec_path = write_spec(tmp_path)
+
+    assert cli.main([str(spec_path), "--print-state"]) == 0
+    assert "Pipelines: ['churn_features']" in capsys.readouterr().out
+
+    assert cli.main(["compile", str(tmp_path / "missing.ff")]) == 1
+    assert "not found" in capsys.readouterr().err
+    assert daemon.requests == 2
+
+
+def test_without_daemon_compiles_in_process(tmp_path: Path, monkeypatch, capsys):
+    monkeypatch.setenv(SOCKET_ENV, str(tmp_path / "nobody-listening.sock"))
+
+    assert cli.main(["compile", str(write_spec(tmp_path)), "--no-cache"]) == 0
+    assert json.loads(capsys.readouterr().out)["datasets"]
+
+
+def test_untrusted_fallback_directory_is_refused(tmp_path: Path, monkeypatch):
+    monkeypatch.setattr(tempfile, "tempdir", str(tmp_path))
+    monkeypatch.delenv(SOCKET_ENV, raising=False)
+    monkeypatch.delenv("XDG_RUNTIME_DIR", raising=False)
+    monkeypatch.delenv(DISABLE_ENV, raising=False)
+    socket_path = default_socket_path()
+    # Pre-created by someone else with the permissions they chose.
+    socket_path.parent.mkdir(mode=0o777)
+    socket_path.parent.chmod(0o777)
+
+    with pytest.raises(PermissionError):
+        CompileDaemon(socket_path, cli.dispatch)
+    listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    listener.bind(str(socket_path))
+    listener.listen(1)
+    try:
+        assert forward(["compile", "spec.ff"]) is None
+    finally:
+        listener.close()
+
+
+def test_non_socket_path_is_refused(tmp_path: Path, monkeypatch):
+    monkeypatch.delenv(DISABLE_ENV, raising=False)
+    path = tmp_path / "ff.sock"
+    path.write_text("not a socket", encoding="utf-8")
+
+    with pytest.raises(PermissionError):
+        CompileDaemon(path, cli.dispatch)
+    assert path.exists()
+    assert forward(["compile", "spec.ff"], path) is None
+
+
+@pytest.fixture
+def fake_daemon(tmp_path: Path, monkeypatch):
+    """A listener that reads one request and sends back the given bytes (or nothing)."""
+    socket_path = tmp_path / "ff.sock"
+    listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    listener.bind(str(socket_path))
+    listener.listen(1)
+    monkeypatch.setenv(SOCKET_ENV, str(socket_path))
+    monkeypatch.delenv(DISABLE_ENV, raising=False)
+    monkeypatch.setattr(daemon_module, "REQUEST_TIMEOUT", 0.2)
+    received = []
+
+    def serve(reply):
+        def answer():
+            connection, _ = listener.accept()
+            with connection, connection.makefile("rwb") as stream:
+                received.append(json.loads(stream.readline()))
+                if reply is not None:
+                    stream.write(reply)
+                    stream.flush()
+                else:
+                    stream.readline()  # hold the connection open until the client gives up
+
+        thread = threading.Thread(target=answer, daemon=True)
+        thread.start()
+        return received
+
+    yield serve
+    listener.close()
+
+
+def test_version_mismatch_falls_back_to_in_process(fake_daemon, tmp_path: Path, capsys):
+    received = fake_daemon(b'{"exit_code": null, "stdout": 0, "stderr": 0}\n')
+
+    assert cli.main(["compile", str(write_spec(tmp_path)), "--no-cache"]) == 0
+    assert received[0]["argv"][0] == "compile"
+    assert json.loads(capsys.readouterr().out)["datasets"]
+
+
+@pytest.mark.parametrize("reply", [None, b'{"exit_code": 0, "stdout": 10, "stderr": 0}\nshort', b"{}\n"])
+def test_request_taken_by_the_daemon_is_not_run_again(fake_daemon, tmp_path: Path, capsys, reply):
+    # No reply in time, a truncated one or a malformed one: the daemon may be
+    # compiling it, so running it here as well would race on the outputs.
+    received = fake_daemon(reply)
+
+    assert cli.main(["compile", str(write_spec(tmp_path)), "--no-cache"]) == 1
+    captured = capsys.readouterr()
+    assert captured.out == ""
+    assert "FusionFlow daemon" in captured.err and DISABLE_ENV in captured.err
+    assert len(received) == 1
@@ -152,6 +152,41 @@ def test_build_temporal_ir_payload():
     assert payload["merges"][0]["strategy"]["name"] == "prefer_metrics"
 
 
+def test_structural_hashes_follow_dependencies():
+    payload = build_temporal_ir(execute_source(FULL_SPEC))
+    assert list(payload)[-1] == "hash"
+    assert payload == build_temporal_ir(execute_source(FULL_SPEC))
+
+    def hashes(ir):
+        return {
+            "dataset": ir["datasets"]["customers:v1"]["hash"],
+            "pipeline": ir["pipelines"]["churn_features"]["hash"],
+            "model": ir["models"]["rf_v1"]["hash"],
+            "baseline": ir["experiments"]["churn_baseline"]["hash"],
+            "interaction": ir["timelines"]["v2"]["experiments"]["churn_interaction"]["hash"],
+            "timeline": ir["timelines"]["v2"]["hash"],
+            "root": ir["hash"],
+        }
+
+    original = hashes(payload)
+    schema_change = hashes(build_temporal_ir(execute_source(FULL_SPEC.replace("id: int", "id: float"))))
+    model_change = hashes(build_temporal_ir(execute_source(FULL_SPEC.replace("trees: 200", "trees: 300"))))
+
+    assert {key for key in original if original[key] != schema_change[key]} == set(original) - {"model"}
+    assert {key for key in original if original[key] != model_change[key]} == set(original) - {"dataset", "pipeline"}
+
+
+def test_structural_hashes_accept_non_ascii_names():
+    source = FULL_SPEC.replace("churn_interaction", "abwanderung_größe")
+    ir = build_temporal_ir(execute_source(source))
+
+    original = build_temporal_ir(execute_source(FULL_SPEC))
+    # The timeline hash covers its experiments' names as well as their hashes.
+    assert ir["timelines"]["v2"]["experiments"]["abwanderung_größe"]["hash"]
+    assert ir["timelines"]["v2"]["hash"] != original["timelines"]["v2"]["hash"]
+    assert ir["hash"] != original["hash"]
+
+
 def test_cli_compile_emits_json(tmp_path: Path):
     spec_path = tmp_path / "full_spec.ff"
     spec_path.write_text(FULL_SPEC, encoding="utf-8")
@@ -162,3 +197,65 @@ def test_cli_compile_emits_json(tmp_path: Path):
     assert exit_code == 0
     payload = json.loads(out_path.read_text(encoding="utf-8"))
     assert payload["pipelines"]["churn_features"]["operations"][0]["type"] == "derive"
+
+
+@pytest.mark.parametrize("indent", [None, 2])
+def test_streamed_ir_matches_json_dumps(indent):
+    import io
+
+    from fusionflow.ir_export import write_temporal_ir
+
+    runtime = execute_source(FULL_SPEC)
+    buffer = io.StringIO()
+    write_temporal_ir(runtime, buffer, indent=indent)
+
+    assert buffer.getvalue() == json.dumps(build_temporal_ir(runtime), indent=indent)
+
+
+def test_expression_rendering_parenthesizes_by_precedence():
+    from fusionflow.ir_export import ExpressionRenderer
+
+    source = """
+    pipeline churn_features
+        from customers v1
+        derive a = (amount + fee) * days / 2
+        derive b = not x and z.w == "yes"
+        derive c = a - b - c
+    end
+    """
+    steps = Parser(Lexer(source).tokenize()).parse().statements[0].steps
+    renderer = ExpressionRenderer()
+
+    assert renderer.render(steps[0].expression) == "(amount + fee) * days / 2"
+    assert renderer.render(steps[1].expression) == 'not x and z.w == "yes"'
+    assert renderer.render(steps[2].expression) == "a - b - c"
+
+
+def test_deep_expression_renders_without_recursion():
+    from fusionflow.ast_nodes import BinaryOp, Identifier
+    from fusionflow.ir_export import ExpressionRenderer
+
+    expr = Identifier("x0")
+    for index in range(1, 20000):
+        expr = BinaryOp(expr, "+" if index % 2 else "*", Identifier(f"x{index}"))
+
+    renderer = ExpressionRenderer()
+    text = renderer.render(expr)
+
+    assert text.startswith("(((")
+    assert text.endswith(") * x19998 + x19999")
+    assert renderer.render(BinaryOp(expr, "-", expr)) == f"{text} - ({text})"
+
+
+@pytest.mark.parametrize(
+    "text",
+    ["a - (b - c)", "a - b - c", "a / (b * c)", "x and (y or z)", "not (a > 1)", "not a > 1", "not (x > 1 and y)", "(a + 1) * 2"],
+)
+def test_rendered_expressions_parse_back_to_the_same_tree(text):
+    from fusionflow.ir_export import ExpressionRenderer
+
+    def parse(source):
+        return Parser(Lexer(source).tokenize()).parse_expression()
+
+    expr = parse(text)
+    assert parse(ExpressionRenderer().render(expr)) == expr
@@ -0,0 +1,114 @@
+import json
+
+import pytest
+
+from fusionflow import __main__ as cli
+from fusionflow.compiler import build_runtime, write_ir_file
+from fusionflow.incremental import IncrementalCompiler, SpecWatcher
+from fusionflow.ir_export import build_temporal_ir
+from fusionflow.lexer import Lexer
+from fusionflow.parser import Parser
+
+
+SPEC = """dataset customers v1
+    source "customers.csv"
+end
+
+pipeline churn_features
+    from customers v1
+    derive spend_per_day = amount / days
+end
+
+model rf
+    type random_forest
+end
+
+experiment baseline
+    uses pipeline churn_features
+    uses model rf
+    metrics [accuracy]
+end
+
+experiment tuned
+    description "Tuned"
+    uses pipeline churn_features
+    uses model rf
+    metrics [f1]
+end
+"""
+
+
+def full_parse(source):
+    return Parser(Lexer(source).tokenize_compact()).parse()
+
+
+@pytest.mark.parametrize(
+    "old, new",
+    [
+        ('description "Tuned"', 'description "Tuned twice"'),
+        ("experiment baseline", "# retired\nexperiment baseline"),
+        ("type random_forest", "type gradient_boosting"),
+        ('    description "Tuned"\n', ""),
+        ("end\n\nexperiment tuned", "end\n\nexperiment extra\n    uses pipeline churn_features\n"
+         "    uses model rf\n    metrics [f1]\nend\n\nexperiment tuned"),
+    ],
+)
+def test_incremental_update_matches_full_parse(old, new):
+    compiler = IncrementalCompiler()
+    first = compiler.update(SPEC)
+    edited = SPEC.replace(old, new, 1)
+    program = compiler.update(edited)
+
+    assert program == full_parse(edited)
+    assert compiler.reparsed < len(program.statements)
+    # Statements the edit did not touch keep their nodes.
+    assert program.statements[0] is first.statements[0]
+
+
+def test_syntax_errors_match_full_parse_and_keep_previous_version():
+    compiler = IncrementalCompiler()
+    compiler.update(SPEC)
+    broken = SPEC.replace('description "Tuned"', 'description "Tuned')
+    with pytest.raises(SyntaxError) as full_error:
+        full_parse(broken)
+    with pytest.raises(SyntaxError) as incremental_error:
+        compiler.update(broken)
+
+    assert str(incremental_error.value) == str(full_error.value)
+    assert compiler.source == SPEC
+
+
+def test_watcher_rebuilds_only_on_content_change(tmp_path):
+    spec_path = tmp_path / "spec.ff"
+    out_path = tmp_path / "spec.tir.json"
+    spec_path.write_text(SPEC, encoding="utf-8")
+    watcher = SpecWatcher(spec_path, out_path)
+
+    ok, message = watcher.poll()
+    assert ok and "5 of 5 blocks re-parsed" in message
+    assert watcher.poll() is None
+
+    edited = SPEC.replace("[f1]", "[f1, roc_auc]")
+    spec_path.write_text(edited, encoding="utf-8")
+    ok, message = watcher.poll()
+    assert ok and "1 of 5 blocks re-parsed" in message
+    assert watcher.compiler.ir_cache.hits == 1
+
+    expected = tmp_path / "expected.tir.json"
+    write_ir_file(build_runtime(edited)[0], expected)
+    assert out_path.read_bytes() == expected.read_bytes()
+
+    spec_path.write_text(edited.replace("uses model rf", "uses model missing", 1), encoding="utf-8")
+    ok, message = watcher.poll()
+    assert not ok and "missing" in message
+    assert out_path.read_bytes() == expected.read_bytes()
+
+
+def test_watch_once_cli(tmp_path, capsys):
+    spec_path = tmp_path / "spec.ff"
+    out_path = tmp_path / "spec.tir.json"
+    spec_path.write_text(SPEC, encoding="utf-8")
+
+    assert cli.dispatch(["watch", str(spec_path), "--out", str(out_path), "--once", "--compact"]) == 0
+    assert "Rebuilt" in capsys.readouterr().out
+    assert json.loads(out_path.read_text(encoding="utf-8")) == build_temporal_ir(build_runtime(SPEC)[0])
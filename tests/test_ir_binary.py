@@ -0,0 +1,116 @@
+import io
+import json
+from pathlib import Path
+
+import pytest
+
+from fusionflow import __main__ as cli
+from fusionflow.ir_binary import KIND_ARRAY, KIND_OBJECT, BinaryIRReader, BinaryIRWriter, _compile_shape
+from fusionflow.ir_export import load_ir
+
+
+SPEC = """
+dataset customers v1
+    source "customers.csv"
+    schema { id: int, amount: float }
+end
+
+pipeline churn_features
+    from customers v1
+    derive spend_per_day = amount / days
+    select [spend_per_day]
+    target churned
+end
+
+model rf_v1
+    type random_forest
+    params { trees: 200, depth: 0.5, bootstrap: true }
+end
+
+experiment churn_baseline
+    uses pipeline churn_features
+    uses model rf_v1
+    metrics [accuracy]
+end
+
+timeline v2 "Interaction features"
+    experiment churn_interaction
+        uses pipeline churn_features
+        uses model rf_v1
+        metrics [accuracy, f1]
+        extend {
+            derive age_spend = age * spend_per_day
+        }
+    end
+end
+
+merge v2 into main
+    because "Higher f1 with stable accuracy"
+    strategy prefer_metrics f1
+end
+"""
+
+
+def compile_spec(tmp_path: Path, fmt: str) -> Path:
+    spec_path = tmp_path / "spec.ff"
+    spec_path.write_text(SPEC, encoding="utf-8")
+    out_path = tmp_path / f"spec.{fmt}"
+    assert cli.main(["compile", str(spec_path), "--format", fmt, "--out", str(out_path), "--no-cache"]) == 0
+    return out_path
+
+
+def test_binary_ir_round_trips_to_json_payload(tmp_path: Path):
+    json_path = compile_spec(tmp_path, "json")
+    binary_path = compile_spec(tmp_path, "binary")
+
+    expected = json.loads(json_path.read_text(encoding="utf-8"))
+    loaded = load_ir(binary_path)
+
+    assert loaded == expected
+    assert list(loaded) == list(expected)
+    assert load_ir(json_path) == expected
+    assert binary_path.stat().st_size < json_path.stat().st_size
+
+
+def test_binary_values_and_random_access():
+    entries = [
+        ("a", {"n": -3, "big": 2 ** 70, "f": 1.5, "flags": [True, False, None], "text": "ünïcode\0"}),
+        ("b", {"nested": {"list": [[], {}, -(2 ** 64)]}}),
+    ]
+    buffer = io.BytesIO()
+    writer = BinaryIRWriter(buffer)
+    writer.write_section("objects", KIND_OBJECT, entries)
+    writer.write_section("items", KIND_ARRAY, [(None, "x"), (None, 7)])
+    writer.close()
+
+    reader = BinaryIRReader(buffer.getvalue())
+    assert reader.keys("objects") == ["a", "b"]
+    assert reader.entry_at("objects", 1) == entries[1][1]
+    assert reader.to_dict() == {"objects": dict(entries), "items": ["x", 7]}
+
+
+def test_truncated_binary_ir_is_rejected(tmp_path: Path):
+    data = compile_spec(tmp_path, "binary").read_bytes()
+
+    with pytest.raises(ValueError):
+        BinaryIRReader(data[:-3])
+
+
+def test_shapes_are_interpreted_not_executed():
+    builder, leaves = _compile_shape('{"a\\"]+__import__(\\"os\\")#":0,"b":[0,{"c":0}]}')
+    assert leaves == 3
+    assert builder(["x", "y", "z"], [9, 0, 1, 2], 1, None) == {'a"]+__import__("os")#': "x", "b": ["y", {"c": "z"}]}
+
+    for shape in ['{"a":"__import__(\'os\')"}', "[2]", '{"a":true}', '"0"', "[0,", "[" * 100 + "]" * 100]:
+        with pytest.raises(ValueError):
+            _compile_shape(shape)
+
+
+def test_timeline_experiments_are_a_nested_section(tmp_path: Path):
+    reader = BinaryIRReader(compile_spec(tmp_path, "binary").read_bytes())
+
+    assert reader.top_level() == ["datasets", "pipelines", "models", "experiments", "timelines", "merges", "hash"]
+    assert reader.keys("timelines") == ["v2"]
+    timeline = reader.entry_at("timelines", 0, resolve=lambda name: name)
+    assert timeline["experiments"] == "timelines/v2/experiments"
+    assert reader.keys(timeline["experiments"]) == ["churn_interaction"]
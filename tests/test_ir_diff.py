@@ -0,0 +1,143 @@
+import json
+from pathlib import Path
+
+from fusionflow import __main__ as cli
+from fusionflow.compile_cache import CompileCache
+from fusionflow.compiler import build_runtime, write_ir_file
+from fusionflow.ir_diff import Change, diff_files
+
+
+OLD = """dataset customers v1
+    source "customers.csv"
+end
+
+pipeline churn_features
+    from customers v1
+    derive spend_per_day = amount / days
+    select [spend_per_day]
+end
+
+model rf
+    type random_forest
+    params { trees: 200 }
+end
+
+experiment baseline
+    uses pipeline churn_features
+    uses model rf
+    metrics [accuracy]
+end
+
+timeline tuning "Tuning"
+    experiment tuned
+        uses pipeline churn_features
+        uses model rf
+        metrics [f1]
+    end
+end
+
+timeline frozen "Untouched"
+    experiment kept
+        uses pipeline churn_features
+        uses model rf
+        metrics [accuracy]
+    end
+end
+"""
+
+NEW = (
+    OLD.replace("amount / days", "amount * days")
+    .replace("trees: 200", "trees: 300")
+    .replace("metrics [f1]", "metrics [f1, auc]")
+    .replace('source "customers.csv"\nend\n', 'source "customers.csv"\nend\n\ndataset orders v1\n    source "o.csv"\nend\n')
+    + "\nmerge tuning into main\n    because \"Better\"\n    strategy prefer_source\nend\n"
+)
+
+EXPECTED = [
+    "+ datasets/orders:v1",
+    '~ pipelines/churn_features/operations[0].expression: "amount / days" -> "amount * days"',
+    "~ models/rf/params.trees: 200 -> 300",
+    '~ timelines/tuning/experiments/tuned/metrics: ["f1"] -> ["f1", "auc"]',
+    "+ merges[0]",
+]
+
+
+def _write(tmp_path: Path, name: str, source: str, ir_format: str = "") -> Path:
+    path = tmp_path / name
+    if ir_format:
+        write_ir_file(build_runtime(source)[0], str(path), ir_format=ir_format)
+    else:
+        path.write_text(source, encoding="utf-8")
+    return path
+
+
+def test_diff_reports_field_level_changes(tmp_path: Path):
+    old = _write(tmp_path, "old.ff", OLD)
+    new = _write(tmp_path, "new.ff", NEW)
+
+    # Experiments whose own fields are unchanged are not reported, even
+    # though their hashes moved with the pipeline they use.
+    assert [str(change) for change in diff_files(old, new)] == EXPECTED
+    assert [str(change) for change in diff_files(new, old)][0] == "- datasets/orders:v1"
+
+
+def test_diff_mixes_specs_and_ir_formats(tmp_path: Path):
+    cache = CompileCache(tmp_path / "cache")
+    old_json = _write(tmp_path, "old.tir.json", OLD, "json")
+    new_binary = _write(tmp_path, "new.tir.bin", NEW, "binary")
+    new_spec = _write(tmp_path, "new.ff", NEW)
+
+    assert [str(change) for change in diff_files(old_json, new_binary)] == EXPECTED
+    assert [str(change) for change in diff_files(old_json, new_spec, cache)] == EXPECTED
+    assert diff_files(new_binary, new_spec, cache) == []
+
+
+def _strip_hashes(value):
+    if isinstance(value, dict):
+        return {key: _strip_hashes(item) for key, item in value.items() if key != "hash"}
+    if isinstance(value, list):
+        return [_strip_hashes(item) for item in value]
+    return value
+
+
+def test_hashless_ir_is_compared_field_by_field(tmp_path: Path):
+    merge = '\nmerge tuning into main\n    because "Better"\n    strategy prefer_source\nend\n'
+    paths = []
+    for name, source in (("old", OLD + merge), ("new", NEW.replace('"Better"', '"Best"'))):
+        path = _write(tmp_path, f"{name}.tir.json", source, "json")
+        path.write_text(json.dumps(_strip_hashes(json.loads(path.read_text(encoding="utf-8")))), encoding="utf-8")
+        paths.append(path)
+
+    assert [str(change) for change in diff_files(*paths)] == EXPECTED[:-1] + ['~ merges[0]/justification: "Better" -> "Best"']
+    assert diff_files(paths[0], paths[0]) == []
+
+
+def test_timeline_changes(tmp_path: Path):
+    old = _write(tmp_path, "old.ff", OLD)
+    new = _write(
+        tmp_path,
+        "new.ff",
+        OLD.replace('"Untouched"', '"Renamed"').replace("experiment kept", "experiment replaced"),
+    )
+
+    assert diff_files(old, new) == [
+        Change("changed", "timelines/frozen/description", "Untouched", "Renamed"),
+        Change("removed", "timelines/frozen/experiments/kept"),
+        Change("added", "timelines/frozen/experiments/replaced"),
+    ]
+
+
+def test_diff_cli(tmp_path: Path, capsys):
+    old = _write(tmp_path, "old.ff", OLD)
+    new = _write(tmp_path, "new.ff", NEW)
+
+    assert cli.dispatch(["diff", str(old), str(new), "--no-cache"]) == 0
+    assert capsys.readouterr().out.splitlines() == EXPECTED
+
+    assert cli.dispatch(["diff", str(old), str(new), "--no-cache", "--exit-code"]) == 1
+    capsys.readouterr()
+    assert cli.dispatch(["diff", str(old), str(old), "--no-cache", "--exit-code"]) == 0
+    assert capsys.readouterr().out == ""
+
+    assert cli.dispatch(["diff", str(old), str(tmp_path / "missing.ff"), "--no-cache"]) == 1
+    assert "not found" in capsys.readouterr().err
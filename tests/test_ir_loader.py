@@ -0,0 +1,117 @@
+from pathlib import Path
+
+import pytest
+
+from fusionflow import __main__ as cli
+from fusionflow.ast_nodes import ExperimentDefinition
+from fusionflow.compiler import build_runtime
+from fusionflow.ir_export import build_temporal_ir
+from fusionflow.runtime import Runtime
+
+
+SPEC = """
+dataset customers v1
+    source "customers.csv"
+    schema { id: int, amount: float }
+end
+
+pipeline churn_features
+    from customers v1
+    derive spend_per_day = amount / (days - 1)
+    derive flagged = not churned and spend_per_day >= 2.5
+    select [spend_per_day, flagged]
+    target churned
+end
+
+model rf_v1
+    type random_forest
+    params { trees: 200, criterion: "gini" }
+end
+
+experiment churn_baseline
+    uses pipeline churn_features
+    uses model rf_v1
+    metrics [accuracy]
+end
+
+timeline v2 "Interaction features"
+    experiment churn_interaction
+        uses pipeline churn_features
+        uses model rf_v1
+        metrics [accuracy, f1]
+        extend {
+            derive age_spend = customer.age * spend_per_day
+        }
+    end
+end
+
+merge v2 into main
+    because "Higher f1 with stable accuracy"
+    strategy prefer_metrics f1
+end
+"""
+
+
+@pytest.fixture(params=["json", "binary"])
+def compiled(request, tmp_path: Path):
+    spec_path = tmp_path / "spec.ff"
+    spec_path.write_text(SPEC, encoding="utf-8")
+    out_path = tmp_path / f"spec.{request.param}"
+    assert cli.main(["compile", str(spec_path), "--format", request.param, "--out", str(out_path), "--no-cache"]) == 0
+    return out_path
+
+
+def test_from_ir_reproduces_the_compiled_ir(compiled: Path):
+    expected = build_temporal_ir(build_runtime(SPEC)[0])
+
+    assert build_temporal_ir(Runtime.from_ir(compiled)) == expected
+
+
+def test_from_ir_decodes_timelines_and_experiments_lazily(compiled: Path):
+    runtime = Runtime.from_ir(compiled)
+
+    assert runtime.models["rf_v1"].params == {"trees": 200, "criterion": "gini"}
+    assert list(runtime.timelines) == ["main", "v2"]
+    assert not runtime.timelines.is_loaded("v2")
+
+    experiments = runtime.timelines["v2"].experiments
+    assert runtime.timelines.is_loaded("v2")
+    assert not experiments.is_loaded("churn_interaction")
+    assert runtime.experiments_index[("v2", "churn_interaction")].metrics == ["accuracy", "f1"]
+    assert experiments.is_loaded("churn_interaction")
+    assert not runtime.timelines.is_loaded("main")
+
+
+def test_runtime_from_ir_accepts_new_registrations(compiled: Path):
+    runtime = Runtime.from_ir(compiled)
+    experiment = ExperimentDefinition("churn_retry", "churn_features", "rf_v1", ["f1"])
+
+    runtime.register_experiment("v2", experiment)
+
+    assert runtime.experiments_index[("v2", "churn_retry")] is experiment
+    assert sorted(runtime.experiments_index) == [
+        ("main", "churn_baseline"),
+        ("v2", "churn_interaction"),
+        ("v2", "churn_retry"),
+    ]
+    with pytest.raises(ValueError):
+        runtime.register_experiment("v2", experiment)
+
+
+def test_from_ir_rebuilds_reverse_indexes_on_first_query(compiled: Path):
+    runtime = Runtime.from_ir(compiled)
+
+    assert runtime.experiments_using_model("rf_v1") == [("main", "churn_baseline"), ("v2", "churn_interaction")]
+    assert runtime.pipelines_using_dataset("customers", "v1") == ["churn_features"]
+    assert runtime.lowest_common_ancestor("v2", "main") == "main"
+
+
+def test_from_ir_reproduces_effective_experiments(compiled: Path):
+    expected = build_runtime(SPEC)[0]
+    runtime = Runtime.from_ir(compiled)
+
+    for timeline in ("main", "v2"):
+        assert dict(runtime.effective_experiments(timeline).items()) == dict(
+            expected.effective_experiments(timeline).items()
+        )
+
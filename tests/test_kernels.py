@@ -0,0 +1,137 @@
+import warnings
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from fusionflow.ast_nodes import DeriveStep, Identifier, MemberAccess
+from fusionflow.backend_adapters import PandasBackend
+from fusionflow import kernels
+from fusionflow.kernels import compile_assignments, compile_expression
+from fusionflow.lexer import Lexer
+from fusionflow.parser import Parser
+
+
+def _expression(text):
+    source = f"pipeline p\n    from d v1\n    derive x = {text}\nend\n"
+    return Parser(Lexer(source).tokenize_compact()).parse().statements[0].steps[0].expression
+
+
+@pytest.fixture
+def columns():
+    rng = np.random.default_rng(7)
+    rows = 10_007
+    return {
+        "amount": rng.random(rows) * 100,
+        "days": rng.integers(0, 400, rows),
+        "age": rng.integers(18, 90, rows),
+        "churned": rng.random(rows) < 0.3,
+    }
+
+
+@pytest.mark.parametrize(
+    "text, reference",
+    [
+        ("amount / days", lambda c: c["amount"] / c["days"]),
+        ("age * (amount / days) + 3.5", lambda c: c["age"] * (c["amount"] / c["days"]) + 3.5),
+        ("(amount - 1) * (amount + 1) - age / 2", lambda c: (c["amount"] - 1) * (c["amount"] + 1) - c["age"] / 2),
+        ("days > 365 and not churned", lambda c: (c["days"] > 365) & ~c["churned"]),
+        ("age >= 30 or amount < 10", lambda c: (c["age"] >= 30) | (c["amount"] < 10)),
+        ("age - days", lambda c: c["age"] - c["days"]),
+        ("amount", lambda c: c["amount"]),
+        ("2 * 3", lambda c: np.full(len(c["age"]), 6)),
+    ],
+)
+@pytest.mark.parametrize("chunk_size", [1, 1000, 1 << 20])
+def test_kernel_matches_numpy(columns, text, reference, chunk_size):
+    with np.errstate(divide="ignore", invalid="ignore"):
+        expected = reference(columns)
+    result = compile_expression(_expression(text))(columns, chunk_size=chunk_size)
+
+    assert result.dtype == expected.dtype
+    np.testing.assert_array_equal(result, expected)
+
+
+def test_kernels_are_cached_per_expression_and_dtype(columns):
+    kernel = compile_expression(_expression("age * days + 1"))
+    assert compile_expression(_expression("age * days + 1")) is kernel
+
+    kernel(columns)
+    kernel({**columns, "age": columns["age"].astype(np.float32)})
+    assert len(kernel._variants) == 2
+
+    out = np.empty(len(columns["age"]), dtype=np.float64)
+    assert kernel(columns, out=out) is out
+
+
+def test_kernel_cache_is_bounded(monkeypatch):
+    monkeypatch.setattr(kernels, "MAX_KERNELS", 4)
+    monkeypatch.setattr(kernels, "_KERNELS", type(kernels._KERNELS)())
+    first = compile_expression(_expression("age + 0"))
+    for constant in range(1, 8):
+        compile_expression(_expression(f"age + {constant}"))
+        # Kept warm by use, so it outlives the others.
+        assert compile_expression(_expression("age + 0")) is first
+
+    assert len(kernels._KERNELS) == 4
+    assert "age + 1" not in kernels._KERNELS
+
+
+def test_constant_division_by_zero_does_not_warn(columns):
+    with warnings.catch_warnings():
+        warnings.simplefilter("error")
+        result = compile_expression(_expression("age + 1 / 0 - 0 / 0"))(columns)
+    assert np.isnan(result).all()
+
+
+def test_kernel_errors(columns):
+    with pytest.raises(ValueError, match="not defined"):
+        compile_expression(_expression("missing + 1"))(columns)
+    with pytest.raises(ValueError, match="cannot be compiled"):
+        compile_expression(MemberAccess(Identifier("a"), "b"))
+
+
+def test_pandas_backend_executes_derive_steps(columns):
+    frame = pd.DataFrame(columns)
+    step = DeriveStep("spend_per_day", _expression("amount / days"))
+    backend = PandasBackend()
+
+    assert backend.can_execute(step)
+    result = backend.execute(step, frame)
+
+    with np.errstate(divide="ignore"):
+        expected = frame["amount"] / frame["days"]
+    pd.testing.assert_series_equal(result["spend_per_day"], expected, check_names=False)
+
+
+@pytest.mark.parametrize("outputs", [None, ["score", "loyal"], ["amount"], ["older", "copy"], ["older", "squared"]])
+def test_fused_kernel_matches_separate_derives(columns, outputs):
+    assignments = [
+        ("per_day", _expression("amount / days")),
+        ("scaled", _expression("per_day * 3600 + age")),
+        ("alias", _expression("scaled")),
+        ("score", _expression("alias - 1 + per_day")),
+        ("loyal", _expression("days > 365 and not churned")),
+        ("amount", _expression("amount * 2")),
+        ("unused", _expression("score * 3")),
+        # An intermediate that reaches an output only through an alias, after
+        # later instructions could have reused its block buffer.
+        ("next_age", _expression("age + 1")),
+        ("older", _expression("next_age * 2 + 3")),
+        ("copy", _expression("next_age")),
+        # Reads one buffer twice; it must be released once.
+        ("squared", _expression("next_age * next_age + (age - 1) * 2")),
+    ]
+    expected = dict(columns)
+    for name, expression in assignments:
+        expected[name] = compile_expression(expression)(expected)
+
+    kernel = compile_assignments(assignments, outputs)
+    result = kernel(columns, chunk_size=1000)
+
+    assert list(result) == (outputs or [name for name, _ in assignments])
+    for name, values in result.items():
+        assert values.dtype == expected[name].dtype
+        np.testing.assert_array_equal(values, expected[name])
+    # Intermediates that are not outputs never get a full-length column.
+    assert len(kernel.results) == len(result)
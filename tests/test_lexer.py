@@ -89,3 +89,46 @@ def test_literal_tokenization():
     string_tokens = [t for t in tokens if t.type == TokenType.STRING]
     assert number_tokens and number_tokens[0].value == 200
     assert string_tokens and string_tokens[0].value == "fast"
+
+
+def test_token_positions():
+    source = 'dataset customers v1\n    source "a.csv"  # trailing comment\nend'
+    tokens = Lexer(source).tokenize()
+    positions = [(t.type, t.line, t.column) for t in tokens]
+    assert positions == [
+        (TokenType.DATASET, 1, 1),
+        (TokenType.IDENTIFIER, 1, 9),
+        (TokenType.IDENTIFIER, 1, 19),
+        (TokenType.NEWLINE, 1, 21),
+        (TokenType.SOURCE, 2, 5),
+        (TokenType.STRING, 2, 12),
+        (TokenType.NEWLINE, 2, 39),
+        (TokenType.END, 3, 1),
+        (TokenType.EOF, 3, 4),
+    ]
+
+
+def test_string_escapes_and_numbers():
+    tokens = Lexer(r'"a\"b\n" 1.5.2 7 # done').tokenize()
+    assert [(t.type, t.value) for t in tokens] == [
+        (TokenType.STRING, 'a"b\n'),
+        (TokenType.NUMBER, 1.5),
+        (TokenType.DOT, '.'),
+        (TokenType.NUMBER, 2),
+        (TokenType.NUMBER, 7),
+        (TokenType.EOF, None),
+    ]
+
+
+def test_unexpected_character_reports_position():
+    with pytest.raises(SyntaxError, match="line 2, column 3"):
+        Lexer("a\nb @").tokenize()
+
+
+def test_compact_buffer_matches_token_list():
+    source = 'model rf_v1\n    params { trees: 200, mode: "fa\\"st" }  # note\nend'
+    expected = [(t.type, t.value, t.line, t.column) for t in Lexer(source).tokenize()]
+    buffer = Lexer(source).tokenize_compact()
+    assert len(buffer) == len(expected)
+    assert [(t.type, t.value, t.line, t.column) for t in buffer] == expected
+    assert buffer.types[0] == TokenType.MODEL.value
@@ -0,0 +1,132 @@
+import pytest
+
+from fusionflow.ast_nodes import ExperimentDefinition, MergeStatement, MergeStrategy
+from fusionflow.compiler import build_runtime
+from fusionflow.merge_algorithm import three_way_merge
+from fusionflow.persistent import MISSING, PersistentMap
+
+
+SPEC = """
+dataset customers v1
+    source "customers.csv"
+end
+
+pipeline churn_features
+    from customers v1
+end
+
+model rf_v1
+    type random_forest
+end
+
+experiment shared
+    uses pipeline churn_features
+    uses model rf_v1
+    metrics [accuracy]
+end
+
+experiment stable
+    uses pipeline churn_features
+    uses model rf_v1
+    metrics [accuracy]
+end
+
+timeline v2 "Left"
+    experiment shared
+        uses pipeline churn_features
+        uses model rf_v1
+        metrics [f1]
+    end
+    experiment stable
+        uses pipeline churn_features
+        uses model rf_v1
+        metrics [accuracy]
+    end
+    experiment left_only
+        uses pipeline churn_features
+        uses model rf_v1
+        metrics [f1]
+    end
+end
+
+timeline v3 "Right"
+    experiment shared
+        uses pipeline churn_features
+        uses model rf_v1
+        metrics [roc_auc]
+    end
+end
+
+experiment main_after_fork
+    uses pipeline churn_features
+    uses model rf_v1
+    metrics [accuracy]
+end
+"""
+
+
+@pytest.fixture
+def runtime():
+    return build_runtime(SPEC)[0]
+
+
+def test_merge_into_parent_applies_branch_changes(runtime):
+    result = three_way_merge(runtime, "v2", "main")
+
+    assert result.base_timeline == "main"
+    # "stable" was re-declared identically, so it is not a change.
+    assert result.applied == ["left_only", "shared"]
+    assert result.conflicts == []
+    assert sorted(result.merged) == ["left_only", "main_after_fork", "shared", "stable"]
+    assert result.merged["shared"].metrics == ["f1"]
+
+    statement = MergeStatement("v2", "main", "Better f1", MergeStrategy("prefer_metrics", ["f1"]))
+    assert runtime.evaluate_merge(statement).applied == result.applied
+
+
+def test_sibling_changes_to_the_same_experiment_conflict(runtime):
+    result = three_way_merge(runtime, "v2", "v3")
+
+    assert result.base_timeline == "main"
+    assert [conflict.experiment for conflict in result.unresolved] == ["shared"]
+    conflict = result.conflicts[0]
+    assert (conflict.base.metrics, conflict.source.metrics, conflict.target.metrics) == (
+        ["accuracy"], ["f1"], ["roc_auc"]
+    )
+    assert result.merged["shared"].metrics == ["roc_auc"]
+    assert "left_only" in result.merged
+
+
+def test_strategies_resolve_conflicts(runtime):
+    scores = {("v2", "shared"): {"f1": 0.8}, ("v3", "shared"): {"f1": 0.7}}
+
+    by_metric = three_way_merge(runtime, "v2", "v3", MergeStrategy("prefer_metrics", ["f1"]), scores)
+    assert by_metric.conflicts[0].resolution == "source"
+    assert by_metric.merged["shared"].metrics == ["f1"]
+
+    assert three_way_merge(runtime, "v2", "v3", MergeStrategy("prefer_metrics", ["f1"])).unresolved
+    kept = three_way_merge(runtime, "v2", "v3", MergeStrategy("prefer_target", []))
+    assert kept.merged["shared"].metrics == ["roc_auc"] and not kept.unresolved
+    with pytest.raises(ValueError):
+        three_way_merge(runtime, "v2", "v3", MergeStrategy("coin_flip", []))
+
+
+def test_merge_from_nested_branch(runtime):
+    runtime.create_timeline("v4", None, parent="v2")
+    runtime.register_experiment("v4", ExperimentDefinition("deep", "churn_features", "rf_v1", ["f1"]))
+
+    result = three_way_merge(runtime, "v4", "v3", MergeStrategy("prefer_source", []))
+    assert result.base_timeline == "main"
+    assert result.applied == ["deep", "left_only"]
+    assert result.conflicts[0].resolution == "source"
+
+
+def test_diff_skips_shared_structure():
+    base = PersistentMap((f"exp_{index}", index) for index in range(5000))
+    changed = base.set("exp_7", -7).set("new", 1).delete("exp_9")
+
+    assert sorted(base.diff(changed), key=lambda change: change[0]) == [
+        ("exp_7", 7, -7),
+        ("exp_9", 9, MISSING),
+        ("new", MISSING, 1),
+    ]
@@ -1,7 +1,7 @@
 import pytest
 
 from fusionflow.lexer import Lexer
-from fusionflow.parser import Parser
+from fusionflow.parser import Parser, StreamingParser
 from fusionflow.ast_nodes import (
     Program,
     DatasetDeclaration,
@@ -139,3 +139,90 @@ def test_parse_merge_statement():
     assert isinstance(merge_stmt.strategy, MergeStrategy)
     assert merge_stmt.strategy.name == "prefer_metrics"
     assert merge_stmt.strategy.arguments == ["f1"]
+
+
+def test_streaming_and_compact_parsers_match_list_parser():
+    source = """
+    dataset customers v1
+        source "customers.csv"
+        schema { id: int }
+    end
+
+    timeline v2 "Feature exploration"
+        experiment churn_interaction
+            uses pipeline churn_features
+            uses model rf_v1
+            metrics [accuracy]
+            extend {
+                derive bonus = (spend_per_day + 1) * 0.1
+            }
+        end
+    end
+    """
+    parser = StreamingParser(Lexer(source).iter_tokens())
+    assert parser.parse() == parse_source(source)
+    assert len(parser.tokens) <= 2
+    assert Parser(Lexer(source).tokenize_compact()).parse() == parse_source(source)
+
+
+def test_nodes_are_slotted_and_names_interned():
+    source = """
+    experiment first
+        uses pipeline churn_features
+        uses model rf_v1
+        metrics [accuracy]
+    end
+
+    experiment second
+        uses pipeline churn_features
+        uses model rf_v1
+        metrics [accuracy]
+    end
+    """
+    first, second = parse_source(source).statements
+    assert not hasattr(first, "__dict__")
+    assert first.pipeline is second.pipeline
+    assert first.metrics[0] is second.metrics[0]
+
+
+def parse_derive_expression(expression: str):
+    source = f"""
+    pipeline churn_features
+        from customers v1
+        derive value = {expression}
+    end
+    """
+    return parse_source(source).statements[0].steps[0].expression
+
+
+def test_expression_precedence_and_associativity():
+    expr = parse_derive_expression("a - b - c * d < e and not f or g")
+    assert expr.operator == "or"
+    conjunction = expr.left
+    assert conjunction.operator == "and"
+    comparison = conjunction.left
+    assert comparison.operator == "<"
+    difference = comparison.left
+    assert difference.operator == "-"
+    assert difference.left.operator == "-"
+    assert difference.right.operator == "*"
+    assert conjunction.right.operator == "not"
+
+
+def test_equality_binds_looser_than_ordering():
+    expr = parse_derive_expression("a == b < c")
+    assert expr.operator == "=="
+    assert expr.right.operator == "<"
+
+
+def test_ten_thousand_term_expression():
+    operators = ["+", "*", "-", "/"]
+    expression = "x0" + "".join(f" {operators[i % 4]} x{i}" for i in range(1, 10000))
+    expr = parse_derive_expression(expression)
+
+    depth = 0
+    while isinstance(expr, BinaryOp):
+        depth += 1
+        expr = expr.left
+    assert depth > 4000
+    assert expr.name == "x0"
@@ -0,0 +1,51 @@
+import pickle
+import random
+
+import pytest
+
+from fusionflow import persistent
+from fusionflow.persistent import PersistentMap
+
+
+def test_versions_stay_independent():
+    rng = random.Random(3)
+    current, expected = PersistentMap(), {}
+    versions = []
+    for step in range(3000):
+        key = f"exp_{rng.randrange(500)}"
+        if expected and rng.random() < 0.3:
+            key = rng.choice(sorted(expected))
+            current = current.delete(key)
+            del expected[key]
+        else:
+            current = current.set(key, step)
+            expected[key] = step
+        if step % 250 == 0:
+            versions.append((current, dict(expected)))
+
+    assert dict(current.items()) == expected
+    for version, snapshot in versions:
+        assert len(version) == len(snapshot)
+        assert dict(version.items()) == snapshot
+    assert pickle.loads(pickle.dumps(current)) == current
+
+
+def test_full_hash_collisions(monkeypatch):
+    monkeypatch.setattr(persistent, "_key_hash", lambda key: 7)
+    shared = PersistentMap({"a": 1, "b": 2, "c": 3})
+
+    assert shared["b"] == 2
+    assert dict(shared.set("b", 20).items()) == {"a": 1, "b": 20, "c": 3}
+    assert dict(shared.delete("a").items()) == {"b": 2, "c": 3}
+    assert "d" not in shared
+
+
+def test_set_and_delete_share_structure():
+    base = PersistentMap((f"exp_{index}", index) for index in range(1000))
+
+    assert base.set("exp_1", 1) is base
+    with pytest.raises(KeyError):
+        base.delete("missing")
+    changed = base.set("exp_1", -1)
+    assert changed["exp_1"] == -1 and base["exp_1"] == 1
+    assert len(changed) == len(base) == 1000
@@ -0,0 +1,138 @@
+from pathlib import Path
+
+import pytest
+
+from fusionflow import __main__ as cli
+from fusionflow.compile_cache import CompileCache
+from fusionflow.compiler import build_runtime, write_ir_file
+from fusionflow.query import RegistryIndex, load_index, parse_query
+
+
+SPEC = """dataset customers v2
+    source "customers_v2.csv"
+end
+
+dataset customers v10
+    source "customers_v10.csv"
+end
+
+dataset orders v1
+    source "orders.csv"
+end
+
+pipeline churn_features
+    from customers v10
+    derive spend_per_day = amount / days
+end
+
+pipeline order_features
+    from orders v1
+    derive total = amount * 2
+end
+
+model rf
+    type random_forest
+end
+
+model lr
+    type logistic_regression
+end
+
+experiment baseline
+    uses pipeline churn_features
+    uses model rf
+    metrics [accuracy]
+end
+
+timeline tuning "Tuning"
+    experiment tuned
+        uses pipeline churn_features
+        uses model lr
+        metrics [accuracy, f1]
+    end
+
+    experiment orders_f1
+        uses pipeline order_features
+        uses model rf
+        metrics [f1]
+    end
+end
+"""
+
+
+@pytest.fixture(scope="module")
+def index():
+    runtime, _, _ = build_runtime(SPEC)
+    return RegistryIndex(runtime)
+
+
+@pytest.mark.parametrize(
+    "query, expected",
+    [
+        ("experiments where pipeline = churn_features", ["main/baseline", "tuning/tuned"]),
+        ("experiments where metric = f1 and model = rf", ["tuning/orders_f1"]),
+        ("experiments where dataset = customers", ["main/baseline", "tuning/tuned"]),
+        ("experiments where model != rf", ["tuning/tuned"]),
+        ("timelines where metric = f1", ["tuning"]),
+        ("timelines where metric = accuracy and model = lr", ["tuning"]),
+        ("pipelines where dataset = customers:v10", ["churn_features"]),
+        ("datasets where name = customers and version >= v3", ["customers:v10"]),
+        ("datasets where version < v10", ["customers:v2", "orders:v1"]),
+        ("models where type = \"logistic_regression\"", ["lr"]),
+        ("model", ["rf", "lr"]),
+        ("experiments where metric = recall", []),
+    ],
+)
+def test_queries(index, query, expected):
+    assert index.query(query) == expected
+
+
+def test_parse_query_keeps_versions_whole():
+    assert parse_query("datasets where version >= v1.10 and name = a") == (
+        "datasets",
+        [("version", ">=", "v1.10"), ("name", "=", "a")],
+    )
+
+
+@pytest.mark.parametrize(
+    "query, error",
+    [
+        ("experiments pipeline = x", SyntaxError),
+        ("experiments where pipeline x", SyntaxError),
+        ("experiments where pipeline = x or model = y", SyntaxError),
+        ("widgets", ValueError),
+        ("experiments where colour = red", ValueError),
+        ("experiments where model > rf", ValueError),
+    ],
+)
+def test_invalid_queries(index, query, error):
+    with pytest.raises(error):
+        index.query(query)
+
+
+def test_index_is_cached_for_specs_and_ir(tmp_path: Path):
+    spec_path = tmp_path / "spec.ff"
+    spec_path.write_text(SPEC, encoding="utf-8")
+    ir_path = tmp_path / "spec.tir.bin"
+    write_ir_file(build_runtime(SPEC)[0], str(ir_path), ir_format="binary")
+
+    for path in (spec_path, ir_path):
+        first = load_index(path, CompileCache(tmp_path / "cache"))
+        cached = load_index(path, CompileCache(tmp_path / "cache"))
+        assert cached is not first
+        assert cached.query("timelines where metric = f1") == ["tuning"]
+
+
+def test_query_cli(tmp_path: Path, capsys):
+    spec_path = tmp_path / "spec.ff"
+    spec_path.write_text(SPEC, encoding="utf-8")
+    args = ["--cache-dir", str(tmp_path / "cache")]
+
+    assert cli.dispatch(["query", str(spec_path), "experiments where metric = f1", *args]) == 0
+    assert capsys.readouterr().out.splitlines() == ["tuning/tuned", "tuning/orders_f1"]
+
+    assert cli.dispatch(["query", str(spec_path), "experiments", "--count", *args]) == 0
+    assert capsys.readouterr().out.strip() == "3"
+
+    assert cli.dispatch(["query", str(spec_path), "experiments where", *args]) == 1
+    assert "Syntax Error" in capsys.readouterr().err
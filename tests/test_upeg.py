@@ -0,0 +1,224 @@
+import pytest
+
+from fusionflow.compiler import build_runtime, write_ir_file
+from fusionflow.ir_export import ExpressionRenderer
+from fusionflow.runtime import Runtime
+from fusionflow.upeg_lowering import lower_runtime
+from fusionflow.upeg_optimizer import fold_expression, optimize, parse_expression
+
+
+HEADER = """dataset customers v1
+    source "customers.csv"
+    schema {
+        amount: float
+        days: int
+        churned: bool
+    }
+end
+
+pipeline churn_features
+    from customers v1
+    derive spend_per_day = amount / days
+    derive is_loyal = days > 365
+    select [spend_per_day, is_loyal]
+    target churned
+end
+
+pipeline spend_only
+    from customers v1
+    derive spend_per_day = amount / days
+    select [spend_per_day]
+end
+
+model rf
+    type random_forest
+    params { trees: 200 }
+end
+
+model rf_copy
+    type random_forest
+    params { trees: 200 }
+end
+"""
+
+
+def _spec(experiments):
+    return HEADER + "".join(
+        f"""
+experiment exp_{index}
+    uses pipeline churn_features
+    uses model {"rf" if index % 2 else "rf_copy"}
+    metrics [accuracy]
+end
+"""
+        for index in range(experiments)
+    )
+
+
+def test_experiments_sharing_a_pipeline_lower_it_once():
+    lowered = lower_runtime(build_runtime(_spec(10))[0])
+    graph, report = lowered.graph, lowered.report
+
+    operations = [node.operation for node in graph.nodes]
+    # One read, shared by both pipelines, and the derive they both start with.
+    assert operations.count("read") == 1
+    assert operations.count("derive") == 2
+    assert operations.count("select") == 2
+    # rf and rf_copy are the same fit, and all ten experiments are the same evaluation.
+    assert operations.count("fit") == 1
+    assert operations.count("evaluate") == 1
+    assert len(set(lowered.experiments.values())) == 1
+
+    # 10 x (read, 2 derives, select, target, fit, evaluate) plus spend_only's 3 nodes.
+    assert report.total_requested == 73
+    assert report.total_created == len(graph.nodes) == 8
+    assert report.deduplicated == 65
+    assert report.requested["derive"] == 21 and report.created["derive"] == 2
+    assert report.summary().startswith("73 nodes requested, 8 created, 65 deduplicated")
+
+    fit = graph.get_node(graph.get_node(lowered.experiments["main", "exp_0"]).inputs[0])
+    assert fit.operation == "fit" and fit.inputs == [lowered.pipelines["churn_features"]]
+    assert len(graph.edges) == len(graph.nodes) - 1
+
+
+def test_extensions_branch_off_the_shared_pipeline():
+    source = _spec(1) + """
+experiment extended
+    uses pipeline churn_features
+    uses model rf
+    metrics [accuracy]
+    extend {
+        derive bonus = spend_per_day * 0.1
+    }
+end
+"""
+    lowered = lower_runtime(build_runtime(source)[0])
+    evaluate = lowered.graph.get_node(lowered.experiments["main", "extended"])
+    fit = lowered.graph.get_node(evaluate.inputs[0])
+    bonus = lowered.graph.get_node(fit.inputs[0])
+
+    assert bonus.operation == "derive" and bonus.outputs == ["bonus"]
+    assert bonus.metadata == {"target": "bonus", "expression": "spend_per_day * 0.1"}
+    assert bonus.inputs == [lowered.pipelines["churn_features"]]
+    assert lowered.experiments["main", "extended"] != lowered.experiments["main", "exp_0"]
+
+
+def test_node_ids_are_stable_across_spec_and_ir(tmp_path):
+    runtime = build_runtime(_spec(3))[0]
+    path = tmp_path / "spec.tir.bin"
+    write_ir_file(runtime, str(path), ir_format="binary")
+
+    from_spec = lower_runtime(runtime)
+    from_ir = lower_runtime(Runtime.from_ir(path))
+
+    assert [node.id for node in from_ir.graph.nodes] == [node.id for node in from_spec.graph.nodes]
+    assert from_ir.experiments == from_spec.experiments
+
+
+UNOPTIMIZED = """dataset customers v1
+    source "customers.csv"
+end
+
+pipeline churn_features
+    from customers v1
+    derive per_day = amount / days
+    derive unused = amount * (2 * 3)
+    derive scaled = per_day * (60 * 60) + age
+    derive score = scaled - 1
+    derive also_unused = score + 1
+    select [score]
+    target churned
+end
+
+pipeline tidy
+    from customers v1
+    derive per_day = amount / days
+    derive scaled = per_day * 3600 + age
+    derive score = scaled - 1
+    select [score]
+    target churned
+end
+
+model rf
+    type random_forest
+    params { trees: 200 }
+end
+
+experiment extended
+    uses pipeline churn_features
+    uses model rf
+    metrics [accuracy]
+    extend {
+        derive bonus = score * (1 / 4)
+    }
+end
+"""
+
+
+@pytest.mark.parametrize(
+    "text, folded",
+    [
+        ("a * (2 * 3)", "a * 6"),
+        ("a * (1 / 4) + (10 - 4) / 2", "a * 0.25 + 3.0"),
+        ("not (a > 1 + 1)", "not (a > 2)"),
+        # No literal syntax for negative numbers or booleans: left as written.
+        ("a + (2 - 3)", "a + (2 - 3)"),
+        ("a and 1 < 2", "a and 1 < 2"),
+        ("a * 2 * 3", "a * 2 * 3"),
+    ],
+)
+def test_fold_expression(text, folded):
+    assert ExpressionRenderer().render(fold_expression(parse_expression(text))) == folded
+
+
+def _derives(lowered):
+    return [node.metadata for node in lowered.graph.nodes if node.operation == "derive"]
+
+
+def test_passes_can_be_enabled_one_at_a_time():
+    lowered = lower_runtime(build_runtime(UNOPTIMIZED)[0])
+
+    folded, report = optimize(lowered, dead_columns=False, derive_fusion=False)
+    assert [stats.name for stats in report.passes] == ["constant_folding"]
+    assert report.passes[0].rewrites == 3
+    assert {"target": "unused", "expression": "amount * 6"} in _derives(folded)
+    assert _derives(folded).count({"target": "scaled", "expression": "per_day * 3600 + age"}) == 2
+
+    pruned, report = optimize(lowered, constant_folding=False, derive_fusion=False)
+    assert report.passes[0].rewrites == 2
+    assert {derive["target"] for derive in _derives(pruned)} == {"per_day", "scaled", "score", "bonus"}
+
+    fused, report = optimize(lowered, constant_folding=False, dead_columns=False)
+    assert [stats.name for stats in report.passes] == ["derive_fusion"]
+    kernels = [node for node in fused.graph.nodes if node.operation == "kernel"]
+    # per_day feeds both pipelines, so it stays a derive of its own.
+    assert sorted(len(node.metadata["assignments"]) for node in kernels) == [2, 4]
+    assert all(node.outputs == ["score"] for node in kernels)
+
+
+def test_optimize_rewires_pipelines_and_experiments():
+    lowered = lower_runtime(build_runtime(UNOPTIMIZED)[0])
+    optimized, report = optimize(lowered)
+    graph = optimized.graph
+
+    assert [stats.name for stats in report.passes] == ["constant_folding", "dead_columns", "derive_fusion"]
+    # Once folded and pruned, both pipelines are the same graph.
+    assert optimized.pipelines["churn_features"] == optimized.pipelines["tidy"]
+    assert [node.operation for node in graph.nodes] == [
+        "read", "kernel", "select", "target", "derive", "fit", "evaluate"
+    ]
+
+    kernel = graph.nodes[1]
+    assert kernel.outputs == ["score"]
+    assert kernel.metadata["assignments"] == [
+        {"target": "per_day", "expression": "amount / days"},
+        {"target": "scaled", "expression": "per_day * 3600 + age"},
+        {"target": "score", "expression": "scaled - 1"},
+    ]
+    evaluate = graph.get_node(optimized.experiments["main", "extended"])
+    fit = graph.get_node(evaluate.inputs[0])
+    bonus = graph.get_node(fit.inputs[0])
+    assert bonus.metadata == {"target": "bonus", "expression": "score * 0.25"}
+    assert bonus.inputs == [optimized.pipelines["churn_features"]]
+    # The lowered graph is left untouched.
+    assert len(lowered.graph.nodes) == 15